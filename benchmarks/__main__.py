@@ -0,0 +1,79 @@
+"""
+Run the benchmark suite and write every result to one JSON document
+
+    python -m benchmarks                      # everything, to stdout
+    python -m benchmarks codec device         # just these
+    python -m benchmarks -o results/0.1.0.json
+
+Output is keyed by benchmark name alongside some environment details,
+so two runs can be diffed directly
+"""
+import argparse
+import importlib
+import json
+import platform
+import sys
+import time
+from importlib import metadata
+
+BENCHMARKS = (
+    "codec",
+    "dispatch",
+    "device",
+    "fader_soak",
+    "meter",
+    "meter_audio",
+)
+
+
+def environment() -> dict:
+    try:
+        version = metadata.version("pymcu")
+    except metadata.PackageNotFoundError:
+        version = None
+
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+
+    return {
+        "pymcu": version,
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "numpy": numpy_version,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="pyMCU benchmark suite")
+    parser.add_argument("names", nargs="*", metavar="name", help=f"benchmarks to run: {', '.join(BENCHMARKS)}")
+    parser.add_argument("-o", "--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    results = {"environment": environment(), "benchmarks": {}}
+    for name in args.names or BENCHMARKS:
+        print(f"Running {name}...", file=sys.stderr)
+        module = importlib.import_module(f".bench_{name}", __package__)
+        start = time.perf_counter()
+        results["benchmarks"][name] = module.run()
+        print(f"  {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
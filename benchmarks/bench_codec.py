@@ -0,0 +1,85 @@
+"""
+Encode / decode cost for every message class in `pymcu.messages`
+
+Classes whose `encode()` or `from_midi()` isn't implemented (device-only or host-only messages)
+are reported as such rather than skipped, so new implementations show up in the diff
+"""
+from functools import partial
+
+from pymcu.messages.sysex import *
+from pymcu.messages.button import SetLED, ButtonPressEvent
+from pymcu.messages.fader import FaderMoveEvent
+from pymcu.messages.meter import UpdateMeter
+from pymcu.messages.vpot import VPotMoveEvent, ScrollWheelMoveEvent, SetVPotLED, VPOT_CC_BASE, SCROLL_WHEEL_CC
+
+from .common import emit, measure_rate
+
+SERIAL = [ord(x) for x in "XTOUCH1"]
+CHALLENGE = [0x12, 0x34, 0x56, 0x78]
+LCD_TEXT = "Track 1 Track 2 Track 3 Track 4 Track 5 Track 6 Track 7 "
+
+
+def sample_messages() -> list[tuple[type, object, list[int]]]:
+    """
+    One (class, instance, wire bytes) sample per message class
+    """
+    header = SOX + MCU_HEADER
+    return [
+        (DeviceQuery, DeviceQuery(), header + [0x00] + EOX),
+        (HostConnectionQuery, HostConnectionQuery(), header + [0x01] + SERIAL + CHALLENGE + EOX),
+        (
+            HostConnectionReply,
+            HostConnectionReply(serial_number="XTOUCH1", challenge_code=CHALLENGE),
+            header + [0x02] + SERIAL + [0, 0, 0, 0] + EOX
+        ),
+        (HostConnectionConfirmation, HostConnectionConfirmation(), header + [0x03] + SERIAL + EOX),
+        (HostConnectionError, HostConnectionError(), header + [0x04] + SERIAL + EOX),
+        (ConfigTransportButtonClick, ConfigTransportButtonClick(), header + [0x0A, 0x01] + EOX),
+        (ConfigLCDBacklightSaver, ConfigLCDBacklightSaver(), header + [0x0B, 0x0F] + EOX),
+        (ConfigTouchlessFaders, ConfigTouchlessFaders(state=True), header + [0x0C, 0x01] + EOX),
+        (ConfigFaderTouchSensitivity, ConfigFaderTouchSensitivity(index=2), header + [0x0E, 0x02, 0x03] + EOX),
+        (
+            UpdateLCD,
+            UpdateLCD(text=LCD_TEXT, display_offset=0),
+            header + [0x12, 0x00] + [ord(x) for x in LCD_TEXT] + EOX
+        ),
+        (UpdateLCDColour, UpdateLCDColour(colours=[LCD_RED] * 8), header + [0x72] + [LCD_RED] * 8 + EOX),
+        (FirmwareVersionRequest, FirmwareVersionRequest(), header + [0x13, 0x00] + EOX),
+        (FirmwareVersionResponse, FirmwareVersionResponse(), header + [0x14] + [ord(x) for x in "1.00 "] + EOX),
+        (ConfigChannelMeterMode, ConfigChannelMeterMode(), header + [0x15, 0x07] + EOX),
+        (ConfigLCDMeterMode, ConfigLCDMeterMode(), header + [0x16, 0x00] + EOX),
+        (Reset, Reset(), header + [0x63] + EOX),
+        (UpdateTimecodeChar, UpdateTimecodeChar(char="5", display_offset=3), [0xB0, 0x43, 0x35]),
+        (SetLED, SetLED(index=0x5E, state=0x7F), [0x90, 0x5E, 0x7F]),
+        (ButtonPressEvent, ButtonPressEvent(index=0x5E, state=0x7F), [0x90, 0x5E, 0x7F]),
+        (FaderMoveEvent, FaderMoveEvent(index=4, position=0x2ABC), [0xE4, 0x3C, 0x55]),
+        (UpdateMeter, UpdateMeter(index=3, value=-8), [0xD0, 0x37]),
+        (VPotMoveEvent, VPotMoveEvent(index=1, delta=-3), [0xB0, VPOT_CC_BASE | 1, 0x43]),
+        (ScrollWheelMoveEvent, ScrollWheelMoveEvent(index=0, delta=1), [0xB0, SCROLL_WHEEL_CC, 0x01]),
+        (SetVPotLED, SetVPotLED(index=2, mode=1, value=6, extra=True), [0xB0, 0x32, 0x56]),
+    ]
+
+
+def _bench(func, iterations: int) -> dict:
+    if func is None:
+        return {"implemented": False, "error": "missing"}
+    try:
+        func()
+    except NotImplementedError as e:
+        return {"implemented": False, "error": type(e).__name__}
+    return measure_rate(func, iterations)
+
+
+def run(iterations: int = 50_000) -> dict:
+    results = {}
+    for cls, message, wire in sample_messages():
+        from_midi = getattr(cls, "from_midi", None)
+        results[cls.__name__] = {
+            "encode": _bench(getattr(message, "encode", None), iterations),
+            "decode": _bench(from_midi and partial(from_midi, wire), iterations),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    emit(run())
@@ -0,0 +1,155 @@
+"""
+End-to-end throughput & latency through `MCUDevice`, talking to a `VirtualMCU` instead of hardware
+
+- rx: inbound messages per second through `_rx_handler` to the user callbacks, for both rx modes
+- tx: outbound messages per second from `tx_queue` through `_tx_consumer` to the port
+- fader round trip: surface fader move -> host callback -> `set_fader()` -> motor message at the surface
+"""
+import asyncio
+import statistics
+import time
+
+from pymcu.mcu import MCUDevice, RX_MODE_CALLBACK, RX_MODE_POLL
+from pymcu.messages.button import SetLED
+from pymcu.messages.fader import FaderMoveEvent
+from pymcu.messages.vpot import SetVPotLED
+from pymcu.helpers.virtual_device import VirtualMCU
+
+from .bench_dispatch import sample_traffic
+from .common import emit
+
+# Device -> host messages delivered per event loop iteration
+RX_BATCH = 64
+
+
+async def _start(rx_mode: str = RX_MODE_CALLBACK, touchless: bool = False) -> tuple[MCUDevice, VirtualMCU]:
+    surface = VirtualMCU(touchless=touchless, seed=0)
+    device = MCUDevice(surface.midi_in, surface.midi_out, rx_mode=rx_mode)
+    asyncio.create_task(device.run())
+
+    # Let the handshake & resync finish so they don't land in the measurement
+    while not device.connected_status:
+        await asyncio.sleep(0.001)
+    await device.tx_queue.join()
+    return device, surface
+
+
+async def _rx_throughput(rx_mode: str, n_messages: int) -> dict:
+    device, surface = await _start(rx_mode)
+
+    handled = 0
+    done = asyncio.Event()
+
+    def count(event) -> None:
+        nonlocal handled
+        handled += 1
+        if handled == n_messages:
+            done.set()
+
+    device.on_button_event = count
+    device.on_raw_fader_event = count
+    device.on_vpot_event = count
+    device.on_scrollwheel_event = count
+
+    traffic = sample_traffic()
+    start = time.perf_counter()
+    for i in range(n_messages):
+        surface.send(traffic[i % len(traffic)])
+        if i % RX_BATCH == RX_BATCH - 1:
+            await asyncio.sleep(0)
+    await done.wait()
+    elapsed = time.perf_counter() - start
+
+    device.close()
+    return {
+        "messages": n_messages,
+        "seconds": elapsed,
+        "messages_per_sec": n_messages / elapsed,
+        "decode_errors": device.rx_decode_errors,
+    }
+
+
+async def _tx_throughput(n_messages: int) -> dict:
+    device, surface = await _start()
+
+    messages = [
+        FaderMoveEvent(index=3, position=0x1234),
+        SetLED(index=0x5E, state=0x7F),
+        SetVPotLED(index=2, mode=1, value=6, extra=False),
+    ]
+    received_before = surface.messages_received
+
+    start = time.perf_counter()
+    for i in range(n_messages):
+        await device.tx_queue.put(messages[i % len(messages)])
+    await device.tx_queue.join()
+    elapsed = time.perf_counter() - start
+
+    device.close()
+    return {
+        "messages": n_messages,
+        # NoteOn is followed by a NoteOff, so there are more port writes than messages
+        "port_writes": surface.messages_received - received_before,
+        "seconds": elapsed,
+        "messages_per_sec": n_messages / elapsed,
+    }
+
+
+async def _fader_round_trip(n_moves: int, rate: float) -> dict:
+    device, surface = await _start(touchless=True)
+
+    sent_at: dict[tuple[int, int], float] = {}
+    latencies: list[float] = []
+    done = asyncio.Event()
+
+    def echo(event: FaderMoveEvent) -> None:
+        device.set_fader(event.index, event.position)
+
+    def arrived(message: list[int]) -> None:
+        if message[0] & 0xF0 != 0xE0:
+            return
+        key = (message[0] & 0x0F, message[2] << 7 | message[1])
+        if key in sent_at:
+            latencies.append(time.perf_counter() - sent_at.pop(key))
+            if len(latencies) == n_moves:
+                done.set()
+
+    device.on_raw_fader_event = echo
+    surface.on_receive = arrived
+
+    period = 1.0 / rate
+    for i in range(n_moves):
+        index, position = i % 9, (i * 37) & 0x3FFF
+        sent_at[(index, position)] = time.perf_counter()
+        surface.move_fader(index, position)
+        await asyncio.sleep(period)
+
+    try:
+        await asyncio.wait_for(done.wait(), timeout=1.0)
+    except asyncio.TimeoutError:
+        pass
+
+    device.close()
+    cuts = statistics.quantiles(latencies, n=100)
+    return {
+        "moves": n_moves,
+        "echoed": len(latencies),
+        "p50_us": cuts[49] * 1e6,
+        "p99_us": cuts[98] * 1e6,
+        "max_us": max(latencies) * 1e6,
+    }
+
+
+def run(rx_messages: int = 100_000, tx_messages: int = 100_000, fader_moves: int = 2000, fader_rate: float = 1000.0) -> dict:
+    return {
+        "rx": {
+            mode: asyncio.run(_rx_throughput(mode, rx_messages))
+            for mode in (RX_MODE_CALLBACK, RX_MODE_POLL)
+        },
+        "tx": asyncio.run(_tx_throughput(tx_messages)),
+        "fader_round_trip": asyncio.run(_fader_round_trip(fader_moves, fader_rate)),
+    }
+
+
+if __name__ == "__main__":
+    emit(run())
@@ -0,0 +1,102 @@
+"""
+Inbound decode rate: the original `match` chain from `MCUDevice._rx_handler`
+versus the precompiled `DispatchTable`
+"""
+import asyncio
+import time
+
+from pymcu.messages.button import ButtonPressEvent
+from pymcu.messages.fader import FaderMoveEvent
+from pymcu.messages.vpot import VPotMoveEvent, ScrollWheelMoveEvent, VPOT_CC_BASE, SCROLL_WHEEL_CC
+from pymcu.helpers.dispatch_table import DispatchTable
+
+from .common import emit
+
+
+def sample_traffic() -> list[list[int]]:
+    """
+    A representative mix of inbound surface traffic
+    """
+    traffic = []
+    for i in range(9):
+        traffic.append([0xE0 | i, i * 13 & 0x7F, i * 7 & 0x7F])
+    for note in (0x00, 0x18, 0x5E, 0x68, 0x70):
+        traffic.append([0x90, note, 0x7F])
+    for i in range(8):
+        traffic.append([0xB0, VPOT_CC_BASE | i, 0x41])
+    traffic.append([0xB0, SCROLL_WHEEL_CC, 0x01])
+    return traffic
+
+
+async def _noop(event) -> None:
+    pass
+
+
+async def match_chain(message: list[int]) -> None:
+    """
+    Reference copy of the original classifier, including the double button decode
+    """
+    match message[0]:
+        case _ if message[0] & 0xF0 == 0xE0:
+            event = FaderMoveEvent.from_midi(message)
+            await _noop(event)
+        case _ if message[0] & 0xF0 == 0x90:
+            event = ButtonPressEvent.from_midi(message)
+            if event.index in range(104, 113):
+                await _noop(event)
+            await _noop(ButtonPressEvent.from_midi(message))
+        case _ if message[0] & 0xF0 == 0xB0:
+            if message[1] & 0x0F == 12:
+                await _noop(ScrollWheelMoveEvent.from_midi(message))
+            else:
+                await _noop(VPotMoveEvent.from_midi(message))
+
+
+def build_table() -> DispatchTable:
+    table = DispatchTable()
+    table.register_channel_message(0xE0, FaderMoveEvent.from_midi, _noop)
+    table.register_channel_message(0x90, ButtonPressEvent.from_midi, _noop)
+    for i in range(8):
+        table.register_cc(VPOT_CC_BASE | i, VPotMoveEvent.from_midi, _noop)
+    table.register_cc(SCROLL_WHEEL_CC, ScrollWheelMoveEvent.from_midi, _noop)
+    return table
+
+
+async def _time_match(traffic: list[list[int]], rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in traffic:
+            await match_chain(message)
+    return time.perf_counter() - start
+
+
+async def _time_table(traffic: list[list[int]], rounds: int) -> float:
+    table = build_table()
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for message in traffic:
+            decoder, handler = table.lookup(message)
+            await handler(decoder(message))
+    return time.perf_counter() - start
+
+
+def run(rounds: int = 20000) -> dict:
+    traffic = sample_traffic()
+    n_messages = rounds * len(traffic)
+
+    results = {}
+    for name, bench in (("match_chain", _time_match), ("dispatch_table", _time_table)):
+        elapsed = asyncio.run(bench(traffic, rounds))
+        results[name] = {
+            "messages": n_messages,
+            "seconds": elapsed,
+            "messages_per_sec": n_messages / elapsed,
+        }
+    results["speedup"] = (
+        results["dispatch_table"]["messages_per_sec"] / results["match_chain"]["messages_per_sec"]
+    )
+    return results
+
+
+if __name__ == "__main__":
+    emit(run())
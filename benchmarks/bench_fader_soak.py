@@ -0,0 +1,85 @@
+"""
+Soak test for the managed fader update path: task count and traced memory
+while driving millions of `set_position` calls through a `FaderUpdateChannel`,
+compared with the original wait-on-nine-new-tasks producer
+"""
+import asyncio
+import time
+import tracemalloc
+
+from pymcu.helpers.managed_fader import ManagedFader, FaderUpdateChannel
+
+from .common import emit
+
+N_FADERS = 9
+BATCH = 64
+
+
+async def _channel_producer(channel: FaderUpdateChannel, faders: list[ManagedFader], sent: list[int]) -> None:
+    while True:
+        for index in await channel.wait():
+            faders[index].update_trigger.clear()
+            sent[0] += 1
+
+
+async def _legacy_producer(faders: list[ManagedFader], sent: list[int]) -> None:
+    while True:
+        await asyncio.wait(
+            [asyncio.create_task(fader.update_trigger.wait()) for fader in faders],
+            return_when=asyncio.FIRST_COMPLETED
+        )
+        for fader in faders:
+            if fader.update_trigger.is_set():
+                fader.update_trigger.clear()
+                sent[0] += 1
+
+
+async def _soak(legacy: bool, updates: int, samples: int) -> dict:
+    channel = FaderUpdateChannel()
+    faders = [ManagedFader(index=i, channel=None if legacy else channel) for i in range(N_FADERS)]
+    sent = [0]
+    producer = asyncio.create_task(
+        _legacy_producer(faders, sent) if legacy else _channel_producer(channel, faders, sent)
+    )
+
+    # Only the first fader moves, as it would while riding a single channel
+    tracemalloc.start()
+    trace = []
+    checkpoint = max(updates // samples, BATCH)
+    start = time.perf_counter()
+    for n in range(0, updates, BATCH):
+        for position in range(BATCH):
+            faders[0].set_position(position)
+        await asyncio.sleep(0)
+        if n % checkpoint < BATCH:
+            trace.append({
+                "updates": n + BATCH,
+                "tasks": len(asyncio.all_tasks()),
+                "traced_bytes": tracemalloc.get_traced_memory()[0],
+            })
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    producer.cancel()
+    return {
+        "updates": updates,
+        "producer_wakeups": sent[0],
+        "seconds": elapsed,
+        "updates_per_sec": updates / elapsed,
+        "tasks_first": trace[0]["tasks"],
+        "tasks_last": trace[-1]["tasks"],
+        "traced_bytes_first": trace[0]["traced_bytes"],
+        "traced_bytes_last": trace[-1]["traced_bytes"],
+        "trace": trace,
+    }
+
+
+def run(updates: int = 2_000_000, legacy_updates: int = 100_000, samples: int = 10) -> dict:
+    return {
+        "channel": asyncio.run(_soak(False, updates, samples)),
+        "legacy": asyncio.run(_soak(True, legacy_updates, samples)),
+    }
+
+
+if __name__ == "__main__":
+    emit(run())
@@ -0,0 +1,86 @@
+"""
+Meter encoding: per-object `UpdateMeter` construction through the original
+dict-of-lambdas, through the lookup table, and `MeterFrameEncoder` batches
+
+Every path does the same work per frame: encode each strip, then keep only the bytes
+that changed since the previous frame, like `MeterFrameEncoder.encode()` does
+"""
+import random
+import time
+
+from pymcu.messages import meter
+from pymcu.messages.meter import UpdateMeter, MeterFrameEncoder, np
+
+from .common import emit
+
+N_CHANNELS = 8
+
+
+def _legacy_nibble(value: float) -> int:
+    for nibble, condition in UpdateMeter.METER_THRESHOLDS.items():
+        if condition(value):
+            return nibble
+    return 0
+
+
+def _frames(n_frames: int) -> list[list[float]]:
+    rng = random.Random(0)
+    return [[rng.uniform(-70, 2) for _ in range(N_CHANNELS)] for _ in range(n_frames)]
+
+
+def _skip_unchanged(encode_strip):
+    """
+    Frame encoder from a per-strip one, returning only the data bytes that changed
+    """
+    last = [0xFF] * N_CHANNELS
+
+    def encode(frame):
+        changed = bytearray()
+        for index, value in enumerate(frame):
+            data_byte = encode_strip(index, value)
+            if last[index] != data_byte:
+                last[index] = data_byte
+                changed.append(data_byte)
+        return bytes(changed)
+
+    return encode
+
+
+def _time(func, frames) -> dict:
+    start = time.perf_counter()
+    for frame in frames:
+        func(frame)
+    elapsed = time.perf_counter() - start
+    return {"frames": len(frames), "seconds": elapsed, "frames_per_sec": len(frames) / elapsed}
+
+
+def run(n_frames: int = 50_000) -> dict:
+    frames = _frames(n_frames)
+
+    legacy = _skip_unchanged(lambda index, value: index << 4 | _legacy_nibble(value))
+    per_object = _skip_unchanged(lambda index, value: UpdateMeter(index=index, value=value).data_byte)
+
+    encoder = MeterFrameEncoder(N_CHANNELS)
+
+    results = {
+        "numpy": np is not None,
+        "legacy_thresholds": _time(legacy, frames),
+        "update_meter_objects": _time(per_object, frames),
+        "frame_encoder": _time(encoder.encode, frames),
+    }
+    if np is not None:
+        arrays = [np.array(frame) for frame in frames]
+        encoder.reset()
+        results["frame_encoder_ndarray"] = _time(encoder.encode, arrays)
+
+        # The same encoder on its per-strip `METER_LUT` fallback
+        meter.np = None
+        try:
+            results["frame_encoder_lut"] = _time(MeterFrameEncoder(N_CHANNELS).encode, frames)
+        finally:
+            meter.np = np
+    return results
+
+
+if __name__ == "__main__":
+    emit(run())
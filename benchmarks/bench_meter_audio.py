@@ -0,0 +1,45 @@
+"""
+Audio-block meter feed: cost of turning 48 kHz x 8 channel blocks into meter bytes,
+as a fraction of real time
+"""
+import time
+
+from pymcu.messages.meter import MeterFrameEncoder, np
+from pymcu.messages.meter_audio import block_meter_levels
+
+from .common import emit
+
+SAMPLE_RATE = 48_000
+N_CHANNELS = 8
+
+
+def run(seconds_of_audio: float = 10.0, block_sizes: tuple[int, ...] = (64, 256, 1024)) -> dict:
+    if np is None:
+        return {"skipped": "numpy not installed"}
+
+    rng = np.random.default_rng(0)
+    results = {}
+    for block_size in block_sizes:
+        n_blocks = int(seconds_of_audio * SAMPLE_RATE / block_size)
+        blocks = [
+            (rng.standard_normal((block_size, N_CHANNELS)) * 0.1).astype(np.float32)
+            for _ in range(min(n_blocks, 64))
+        ]
+        encoder = MeterFrameEncoder(N_CHANNELS)
+
+        start = time.perf_counter()
+        for n in range(n_blocks):
+            encoder.encode(block_meter_levels(blocks[n % len(blocks)], n_channels=N_CHANNELS))
+        elapsed = time.perf_counter() - start
+
+        results[f"block_{block_size}"] = {
+            "blocks": n_blocks,
+            "seconds": elapsed,
+            "us_per_block": elapsed / n_blocks * 1e6,
+            "realtime_fraction": elapsed / seconds_of_audio,
+        }
+    return results
+
+
+if __name__ == "__main__":
+    emit(run())
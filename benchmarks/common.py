@@ -0,0 +1,40 @@
+"""
+Shared helpers for the benchmark scripts
+
+Every benchmark module exposes `run(**kwargs) -> dict` and prints its results as JSON
+when executed directly, e.g. `python -m benchmarks.bench_dispatch`
+"""
+import json
+import sys
+import time
+from typing import Callable
+
+
+def measure_rate(func: Callable[[], None], iterations: int) -> dict:
+    """
+    Time `iterations` calls of `func`
+
+    Args:
+        func (Callable[[], None]): the operation under test
+        iterations (int): how many times to call it
+
+    Returns:
+        dict: iteration count, elapsed seconds and operations per second
+    """
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "seconds": elapsed,
+        "ops_per_sec": iterations / elapsed if elapsed else float("inf"),
+    }
+
+
+def emit(results: dict) -> None:
+    """
+    Write results to stdout as JSON
+    """
+    json.dump(results, sys.stdout, indent=2)
+    sys.stdout.write("\n")
@@ -0,0 +1,152 @@
+import asyncio
+from collections import Counter, deque
+from typing import Any, Hashable, Optional
+
+
+class CoalescingQueue():
+    """
+    FIFO queue with latest-value-wins slots, a drop-in for the subset of `asyncio.Queue`
+    that `MCUDevice` uses.
+
+    Items put without a key are queued as normal. Items put with a key (e.g. `("fader", 3)`)
+    occupy a single slot: while that slot is still waiting to be sent, a new item with the
+    same key replaces the pending one in place rather than queueing behind it.
+    So the consumer only ever sees the most recent value, at the position the first one was queued.
+
+    `maxsize` bounds the number of pending slots, replacing a pending keyed item never raises `QueueFull`.
+    """
+
+    def __init__(self, maxsize: int = 0):
+        self.maxsize = maxsize
+        self._order: deque[Hashable] = deque()
+        self._items: dict[Hashable, Any] = {}
+
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._not_full.set()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
+        self._unfinished = 0
+
+        self.queued = 0
+        self.collapsed = 0
+        self.collapsed_by_kind: Counter = Counter()
+
+
+    def qsize(self) -> int:
+        return len(self._order)
+
+
+    def empty(self) -> bool:
+        return not self._order
+
+
+    def full(self) -> bool:
+        return 0 < self.maxsize <= len(self._order)
+
+
+    def pending(self, key: Hashable) -> Any:
+        """
+        The item waiting in `key`'s slot, None if there isn't one
+        """
+        return self._items.get(key)
+
+
+    def put_nowait(self, item: Any, key: Optional[Hashable] = None) -> bool:
+        """
+        Queue an item, or replace the pending item with the same key
+
+        Args:
+            item (Any): message to send
+            key (Optional[Hashable], optional): coalescing key. Defaults to None (never coalesced).
+
+        Raises:
+            asyncio.QueueFull: no free slot for a new item
+
+        Returns:
+            bool: True if the item took a new slot, False if it replaced a pending one
+        """
+        if key is not None and key in self._items:
+            self._items[key] = item
+            self.collapsed += 1
+            self.collapsed_by_kind[key[0] if type(key) is tuple else key] += 1
+            return False
+
+        if self.full():
+            raise asyncio.QueueFull
+
+        if key is None:
+            key = object()
+
+        self._order.append(key)
+        self._items[key] = item
+        self.queued += 1
+        self._unfinished += 1
+        self._all_done.clear()
+        self._not_empty.set()
+        if self.full():
+            self._not_full.clear()
+        return True
+
+
+    async def put(self, item: Any, key: Optional[Hashable] = None) -> bool:
+        """
+        Queue an item, waiting for a free slot if needed
+
+        Args:
+            item (Any): message to send
+            key (Optional[Hashable], optional): coalescing key. Defaults to None (never coalesced).
+
+        Returns:
+            bool: True if the item took a new slot, False if it replaced a pending one
+        """
+        while self.full() and key not in self._items:
+            await self._not_full.wait()
+        return self.put_nowait(item, key=key)
+
+
+    def get_nowait(self) -> Any:
+        """
+        Take the item at the head of the queue
+
+        Raises:
+            asyncio.QueueEmpty: nothing pending
+        """
+        if not self._order:
+            raise asyncio.QueueEmpty
+
+        item = self._items.pop(self._order.popleft())
+        if not self._order:
+            self._not_empty.clear()
+        self._not_full.set()
+        return item
+
+
+    async def get(self) -> Any:
+        """
+        Take the item at the head of the queue, waiting for one if needed
+        """
+        while not self._order:
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+
+    def task_done(self) -> None:
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._all_done.set()
+
+
+    async def join(self) -> None:
+        await self._all_done.wait()
+
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._order),
+            "queued": self.queued,
+            "collapsed": self.collapsed,
+            "collapsed_by_kind": dict(self.collapsed_by_kind),
+        }
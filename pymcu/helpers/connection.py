@@ -0,0 +1,228 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+STATE_DISCONNECTED = "disconnected" # not tried yet, or the surface refused the handshake
+STATE_CONNECTING = "connecting" # pinging until a handshake completes
+STATE_CONNECTED = "connected"
+
+PING_TIMEOUT = 0.25 # seconds for a DeviceQuery to be confirmed
+KEEPALIVE_INTERVAL = 5.0 # seconds of silence from a connected surface before a keepalive ping
+MAX_MISSED_PINGS = 2 # unanswered keepalives in a row before a connected surface is declared lost
+# So a lost surface is noticed within KEEPALIVE_INTERVAL + MAX_MISSED_PINGS * PING_TIMEOUT = 5.5 s of going quiet
+RETRY_MIN_INTERVAL = 0.1 # seconds, first retry while not connected
+RETRY_MAX_INTERVAL = 5.0 # seconds, retries back off to this (the old fixed ping interval)
+RETRY_BACKOFF = 2.0
+
+
+@dataclass
+class ConnectionStateChange():
+    """
+    Published whenever the connection moves between states
+
+    Args:
+        state: new state
+        previous: state before
+        latency: DeviceQuery -> HostConnectionConfirmation time in seconds, on connecting
+        reason: what caused the change ("ping", "confirmed", "refused", "timeout")
+    """
+    state: str
+    previous: str
+    latency: Optional[float]
+    reason: str
+
+
+class ConnectionMonitor():
+    """
+    State machine around the MCU handshake: DeviceQuery -> HostConnectionQuery -> HostConnectionReply
+    -> HostConnectionConfirmation (or HostConnectionError)
+
+    Until connected, a ping goes out straight away and again each time one goes unconfirmed for
+    `ping_timeout`, with the gap between attempts backing off exponentially from `retry_min` to `retry_max`.
+    Once connected it stays quiet while the surface is talking: anything heard (see `activity()`) proves
+    it's there, and a keepalive ping only goes out after `keepalive_interval` of silence.
+    Each keepalive is a full handshake, a 7 byte DeviceQuery, the surface's 18 byte HostConnectionQuery,
+    our 18 byte HostConnectionReply and its 14 byte HostConnectionConfirmation, so an idle surface costs
+    about 57 bytes per `keepalive_interval`. The default of 5 s keeps that to ~11 bytes/s, lower it
+    to notice a lost surface sooner.
+    A keepalive that isn't confirmed within `ping_timeout` is retried straight away, and after `max_missed`
+    in a row the surface is declared lost and the connection goes back to connecting. So a surface that
+    stops answering is noticed within `detection_time` = `keepalive_interval` + `max_missed` * `ping_timeout`
+    of the last message heard (5.5 s with the defaults).
+
+    `latency` & `latency_max` time the handshakes that (re)connect, routine keepalives don't touch them.
+
+    `pending_pings` counts pings sent since the last confirmation.
+
+    Args:
+        ping_timeout: seconds for a ping to be confirmed
+        keepalive_interval: seconds of silence before pinging a connected surface
+        max_missed: unanswered keepalives before the surface counts as lost
+        retry_min: first retry interval while not connected
+        retry_max: longest retry interval while not connected
+    """
+
+    def __init__(
+        self,
+        ping_timeout: float = PING_TIMEOUT,
+        keepalive_interval: float = KEEPALIVE_INTERVAL,
+        max_missed: int = MAX_MISSED_PINGS,
+        retry_min: float = RETRY_MIN_INTERVAL,
+        retry_max: float = RETRY_MAX_INTERVAL
+    ):
+        self.ping_timeout = ping_timeout
+        self.keepalive_interval = keepalive_interval
+        self.max_missed = max_missed
+        self.retry_min = retry_min
+        self.retry_max = retry_max
+
+        self.state = STATE_DISCONNECTED
+        self.pending_pings = 0
+        self.retry_interval = retry_min
+        self.last_heard = 0.0 # `time.perf_counter()` of the last message from the surface
+        self._ping_time: Optional[float] = None
+        self._confirmed = asyncio.Event()
+
+        self.pings = 0
+        self.connects = 0
+        self.disconnects = 0
+        self.refusals = 0
+        self.latency: Optional[float] = None
+        self.latency_max = 0.0
+
+
+    @property
+    def connected(self) -> bool:
+        return self.state == STATE_CONNECTED
+
+
+    def activity(self, now: Optional[float] = None) -> None:
+        """
+        The surface sent something, so there's no need to ping it for another `keepalive_interval`
+        """
+        self.last_heard = time.perf_counter() if now is None else now
+
+
+    @property
+    def detection_time(self) -> float:
+        """
+        Longest time, in seconds, between a connected surface going quiet and the state changing
+        """
+        return self.keepalive_interval + self.max_missed * self.ping_timeout
+
+
+    def _change(self, state: str, reason: str, latency: Optional[float] = None) -> Optional[ConnectionStateChange]:
+        if state == self.state:
+            return None
+        change = ConnectionStateChange(state=state, previous=self.state, latency=latency, reason=reason)
+        self.state = state
+        if state == STATE_CONNECTED:
+            self.connects += 1
+        elif change.previous == STATE_CONNECTED:
+            self.disconnects += 1
+        return change
+
+
+    def ping_sent(self, now: Optional[float] = None) -> Optional[ConnectionStateChange]:
+        self.pings += 1
+        self.pending_pings += 1
+        self._ping_time = time.perf_counter() if now is None else now
+        self._confirmed.clear()
+        if self.state == STATE_DISCONNECTED:
+            return self._change(STATE_CONNECTING, "ping")
+        return None
+
+
+    def confirmed(self, now: Optional[float] = None) -> Optional[ConnectionStateChange]:
+        """
+        The surface sent HostConnectionConfirmation
+
+        Returns:
+            Optional[ConnectionStateChange]: the change if this completed a (re)connection
+        """
+        latency = None
+        if self._ping_time is not None and self.state != STATE_CONNECTED:
+            latency = (time.perf_counter() if now is None else now) - self._ping_time
+            self.latency = latency
+            self.latency_max = max(self.latency_max, latency)
+        self._ping_time = None
+
+        self.pending_pings = 0
+        self.retry_interval = self.retry_min
+        self.activity(now)
+        self._confirmed.set()
+        return self._change(STATE_CONNECTED, "confirmed", latency)
+
+
+    def refused(self) -> Optional[ConnectionStateChange]:
+        """
+        The surface sent HostConnectionError
+        """
+        self.refusals += 1
+        self._ping_time = None
+        return self._change(STATE_DISCONNECTED, "refused")
+
+
+    def timed_out(self) -> Optional[ConnectionStateChange]:
+        """
+        A ping went unconfirmed for `ping_timeout`
+        """
+        self._ping_time = None
+        if self.state != STATE_CONNECTED or self.pending_pings < self.max_missed:
+            return None
+        return self._change(STATE_CONNECTING, "timeout")
+
+
+    async def run(
+        self,
+        send_ping: Callable[[], None],
+        notify: Callable[[ConnectionStateChange], Awaitable[None]]
+    ) -> None:
+        """
+        Drive the pings
+
+        Args:
+            send_ping (Callable[[], None]): queue a DeviceQuery
+            notify (Callable[[ConnectionStateChange], Awaitable[None]]): awaited with every state change made here
+        """
+        while True:
+            if self.state == STATE_CONNECTED and self.pending_pings == 0:
+                quiet = time.perf_counter() - self.last_heard
+                if quiet < self.keepalive_interval:
+                    # Heard from recently, check again once it could have gone quiet for long enough
+                    await asyncio.sleep(self.keepalive_interval - quiet)
+                    continue
+
+            change = self.ping_sent()
+            send_ping()
+            if change is not None:
+                await notify(change)
+
+            try:
+                await asyncio.wait_for(self._confirmed.wait(), self.ping_timeout)
+                continue
+            except asyncio.TimeoutError:
+                pass
+
+            change = self.timed_out()
+            if change is not None:
+                await notify(change)
+
+            if self.state != STATE_CONNECTED:
+                await asyncio.sleep(self.retry_interval)
+                self.retry_interval = min(self.retry_interval * RETRY_BACKOFF, self.retry_max)
+
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "pending_pings": self.pending_pings,
+            "pings": self.pings,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "refusals": self.refusals,
+            "latency": self.latency,
+            "latency_max": self.latency_max,
+            "detection_time": self.detection_time,
+        }
@@ -0,0 +1,129 @@
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Optional
+
+from ..messages.sysex import MCU_HEADER
+
+MIDIMessage = list[int]
+Decoder_T = Callable[[MIDIMessage], Any]
+Handler_T = Callable[[Any], Awaitable]
+Entry_T = tuple[Decoder_T, Handler_T]
+
+STATUS_CONTROL_CHANGE = 0xB0
+STATUS_SYSEX = 0xF0
+
+# Position of the MCU command byte in a SysEx message: F0 00 00 66 14 <command> ...
+SYSEX_COMMAND_INDEX = 5
+
+
+@dataclass
+class SubTable():
+    """
+    Second-level lookup for status bytes that multiplex several message types,
+    keyed on the data byte at `key_index` (CC number, SysEx command byte)
+    If `header` is set, the bytes between the status byte and the key must match it
+    """
+    key_index: int = field()
+    header: Optional[list[int]] = field(default=None)
+    entries: list[Optional[Entry_T]] = field(default_factory=lambda: [None] * 128)
+
+
+class DispatchTable():
+    """
+    Precompiled lookup for inbound MIDI
+
+    256 entries indexed directly by status byte, each resolving to a prebound
+    (decoder, handler) pair. Control Change and SysEx resolve through a second
+    128-entry table keyed on CC number / MCU command byte respectively.
+
+    Each message costs at most two list lookups before it is decoded exactly once.
+    """
+
+    def __init__(self):
+        self.status_table: list[Optional[Entry_T | SubTable]] = [None] * 256
+        self.unhandled = 0
+
+        self.cc_table = SubTable(key_index=1)
+        # Only our own SysEx, another manufacturer's message can share the command byte
+        self.sysex_table = SubTable(key_index=SYSEX_COMMAND_INDEX, header=MCU_HEADER)
+
+        for channel in range(16):
+            self.status_table[STATUS_CONTROL_CHANGE | channel] = self.cc_table
+        self.status_table[STATUS_SYSEX] = self.sysex_table
+
+
+    def register_status(self, status: int, decoder: Decoder_T, handler: Handler_T) -> None:
+        """
+        Register a decoder / handler pair for a single status byte
+
+        Args:
+            status (int): Status byte (0x80..0xFF)
+            decoder (Decoder_T): Turns raw MIDI into a message object
+            handler (Handler_T): Coroutine function called with the decoded object
+        """
+        if status < 0x80 or status > 0xFF:
+            raise ValueError(f"Status byte {status:02X} out of range (0x80..0xFF)")
+        if isinstance(self.status_table[status], SubTable):
+            raise ValueError(f"Status byte {status:02X} is multiplexed, register on its sub-table")
+        self.status_table[status] = (decoder, handler)
+
+
+    def register_channel_message(self, kind: int, decoder: Decoder_T, handler: Handler_T) -> None:
+        """
+        Register a decoder / handler pair for a channel message on all 16 channels
+
+        Args:
+            kind (int): Message type in the high nibble (0x80, 0x90, 0xD0, 0xE0, ...)
+            decoder (Decoder_T): Turns raw MIDI into a message object
+            handler (Handler_T): Coroutine function called with the decoded object
+        """
+        for channel in range(16):
+            self.register_status((kind & 0xF0) | channel, decoder, handler)
+
+
+    def register_cc(self, cc: int, decoder: Decoder_T, handler: Handler_T) -> None:
+        """
+        Register a decoder / handler pair for a Control Change number
+
+        Args:
+            cc (int): CC number (0x00..0x7F)
+            decoder (Decoder_T): Turns raw MIDI into a message object
+            handler (Handler_T): Coroutine function called with the decoded object
+        """
+        self.cc_table.entries[cc & 0x7F] = (decoder, handler)
+
+
+    def register_sysex(self, command: int, decoder: Decoder_T, handler: Handler_T) -> None:
+        """
+        Register a decoder / handler pair for an MCU SysEx command byte
+
+        Args:
+            command (int): Command byte (see `MESSAGE_CLASSES`)
+            decoder (Decoder_T): Turns raw MIDI into a message object
+            handler (Handler_T): Coroutine function called with the decoded object
+        """
+        self.sysex_table.entries[command & 0x7F] = (decoder, handler)
+
+
+    def lookup(self, message: MIDIMessage) -> Optional[Entry_T]:
+        """
+        Resolve the decoder / handler pair for a raw message
+
+        Args:
+            message (MIDIMessage): incoming raw MIDI
+
+        Returns:
+            Optional[Entry_T]: (decoder, handler), or None if nothing is registered
+        """
+        entry = self.status_table[message[0]]
+
+        if type(entry) is SubTable:
+            if len(message) <= entry.key_index:
+                entry = None
+            elif entry.header is not None and message[1:entry.key_index] != entry.header:
+                entry = None
+            else:
+                entry = entry.entries[message[entry.key_index] & 0x7F]
+
+        if entry is None:
+            self.unhandled += 1
+        return entry
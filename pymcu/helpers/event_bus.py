@@ -0,0 +1,349 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatchcase
+from typing import Any, Callable, Iterable, Optional, Union
+
+from ..messages.hardware_mapping import NOTE_MAP
+from .coalescing_queue import CoalescingQueue
+
+EVENT_BUTTON = "button"
+EVENT_FADER = "fader"
+EVENT_MANAGED_FADER = "managed_fader"
+EVENT_VPOT = "vpot"
+EVENT_MANAGED_VPOT = "managed_vpot"
+EVENT_WHEEL = "wheel"
+EVENT_SCRUB = "scrub"
+EVENT_METER = "meter"
+EVENT_CONNECTION = "connection"
+
+# Number of addressable controls per event kind
+EVENT_KINDS = {
+    EVENT_BUTTON: 128,
+    EVENT_FADER: 9,
+    EVENT_MANAGED_FADER: 9,
+    EVENT_VPOT: 8,
+    EVENT_MANAGED_VPOT: 8,
+    EVENT_WHEEL: 1,
+    EVENT_SCRUB: 1,
+    EVENT_METER: 16,
+    EVENT_CONNECTION: 1,
+}
+
+ControlSpec = Union[None, int, str, range, Iterable]
+
+# Where a subscription's handler runs
+MODE_INLINE = "inline" # directly in the receive loop, in order with everything else
+MODE_TASK = "task" # in its own task on the event loop, behind a bounded queue
+MODE_THREAD = "thread" # in the bus's thread pool, behind a bounded queue (sync handlers only)
+
+# What a queued subscription does with a new event when its queue is full
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_DROP_NEWEST = "drop_newest"
+OVERFLOW_COALESCE = "coalesce" # one pending event per control, the latest replaces any still waiting
+
+DEFAULT_QUEUE_SIZE = 256
+DEFAULT_THREAD_WORKERS = 4
+
+
+def resolve_controls(kind: str, controls: ControlSpec) -> frozenset[int]:
+    """
+    Turn a control specification into a set of indices
+
+    Args:
+        kind (str): event kind, one of `EVENT_KINDS`
+        controls (ControlSpec): None for every control, an index, a range, a `NOTE_MAP` name
+            or shell-style pattern (buttons only, e.g. "Mute *"), or any iterable of those
+
+    Raises:
+        ValueError: unknown kind, name or out of range index
+
+    Returns:
+        frozenset[int]: control indices
+    """
+    size = EVENT_KINDS.get(kind)
+    if size is None:
+        raise ValueError(f"Unknown event kind: {kind}")
+
+    if controls is None:
+        return frozenset(range(size))
+
+    if isinstance(controls, int):
+        if not 0 <= controls < size:
+            raise ValueError(f"{kind} index out of range: {controls}")
+        return frozenset((controls,))
+
+    if isinstance(controls, str):
+        if kind != EVENT_BUTTON:
+            raise ValueError(f"Only buttons can be subscribed to by name, not {kind}")
+        pattern = controls.lower()
+        indices = frozenset(note for note, name in NOTE_MAP.items() if fnmatchcase(name.lower(), pattern))
+        if not indices:
+            raise ValueError(f"No button matches {controls!r}")
+        return indices
+
+    indices = frozenset()
+    for item in controls:
+        indices |= resolve_controls(kind, item)
+    return indices
+
+
+@dataclass(eq=False)
+class Subscription():
+    """
+    A handler bound to some controls of one event kind, returned by `EventBus.subscribe()`
+
+    Inline subscriptions are called straight from `publish()`. Task & thread subscriptions
+    get a bounded queue and a worker, so a slow handler only ever delays itself:
+    once `maxsize` events are waiting, `overflow` decides what is dropped.
+
+    Latency is measured from `publish()` to the handler returning.
+    """
+    kind: str
+    handler: Callable
+    indices: frozenset[int]
+    mode: str = field(default=MODE_INLINE)
+    maxsize: int = field(default=DEFAULT_QUEUE_SIZE)
+    overflow: str = field(default=OVERFLOW_DROP_OLDEST)
+
+    is_async: bool = field(default=False, init=False)
+    queue: Optional[CoalescingQueue] = field(default=None, init=False, repr=False)
+    worker: Optional[asyncio.Task] = field(default=None, init=False, repr=False)
+
+    delivered: int = field(default=0, init=False)
+    dropped: int = field(default=0, init=False)
+    coalesced: int = field(default=0, init=False)
+    errors: int = field(default=0, init=False)
+    last_error: Optional[BaseException] = field(default=None, init=False, repr=False)
+    latency_total: float = field(default=0.0, init=False)
+    latency_max: float = field(default=0.0, init=False)
+
+    def __post_init__(self):
+        if self.mode not in (MODE_INLINE, MODE_TASK, MODE_THREAD):
+            raise ValueError(f"Unknown subscription mode: {self.mode}")
+        if self.overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_COALESCE):
+            raise ValueError(f"Unknown overflow policy: {self.overflow}")
+
+        self.is_async = asyncio.iscoroutinefunction(self.handler)
+        if self.mode == MODE_THREAD and self.is_async:
+            raise ValueError("Async handlers can't run in a thread, use MODE_TASK")
+        if self.mode != MODE_INLINE:
+            self.queue = CoalescingQueue(maxsize=self.maxsize)
+
+    def offer(self, index: int, event: Any) -> None:
+        """
+        Queue an event for the worker, applying the overflow policy
+        """
+        item = (time.perf_counter(), event)
+        queue = self.queue
+
+        if self.overflow == OVERFLOW_COALESCE:
+            try:
+                if not queue.put_nowait(item, key=index):
+                    self.coalesced += 1
+            except asyncio.QueueFull:
+                self.dropped += 1
+            return
+
+        if queue.full():
+            if self.overflow == OVERFLOW_DROP_NEWEST:
+                self.dropped += 1
+                return
+            queue.get_nowait()
+            queue.task_done()
+            self.dropped += 1
+        queue.put_nowait(item)
+
+    def record(self, published_at: float) -> None:
+        latency = time.perf_counter() - published_at
+        self.delivered += 1
+        self.latency_total += latency
+        if latency > self.latency_max:
+            self.latency_max = latency
+
+    async def run(self, executor: Optional[ThreadPoolExecutor]) -> None:
+        """
+        Worker: hand queued events to the handler one at a time, in order
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            published_at, event = await self.queue.get()
+            try:
+                if self.mode == MODE_THREAD:
+                    await loop.run_in_executor(executor, self.handler, event)
+                elif self.is_async:
+                    await self.handler(event)
+                else:
+                    self.handler(event)
+            except Exception as e:
+                # The worker outlives a failing handler, the error is kept for inspection
+                self.errors += 1
+                self.last_error = e
+            self.record(published_at)
+            self.queue.task_done()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "controls": len(self.indices),
+            "delivered": self.delivered,
+            "pending": self.queue.qsize() if self.queue is not None else 0,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "mean_latency": self.latency_total / self.delivered if self.delivered else 0.0,
+            "max_latency": self.latency_max,
+        }
+
+
+class EventBus():
+    """
+    Any number of subscribers per event kind, each only called for the controls it asked for
+
+    Every kind has a precompiled table with one tuple of subscriptions per control index,
+    so publishing an event costs one lookup plus the handlers for that control.
+
+    Subscribing / unsubscribing builds a new table and swaps it in (copy-on-write):
+    publishers never take a lock, and an event that is mid-dispatch finishes with the handlers
+    it started with. Safe to call from other threads.
+
+    Slow handlers should subscribe with `MODE_TASK` or `MODE_THREAD`, then publishing to them
+    is just a queue put and the receive loop never waits on user code.
+
+    Args:
+        thread_workers: size of the thread pool shared by `MODE_THREAD` subscriptions
+    """
+
+    def __init__(self, thread_workers: int = DEFAULT_THREAD_WORKERS):
+        self.thread_workers = thread_workers
+        self._executor: ThreadPoolExecutor = None
+        self._lock = threading.Lock()
+        self._subscriptions: dict[str, tuple[Subscription, ...]] = {kind: () for kind in EVENT_KINDS}
+        self._tables: dict[str, tuple[tuple[Subscription, ...], ...]] = {
+            kind: ((),) * size for kind, size in EVENT_KINDS.items()
+        }
+
+
+    def subscribe(
+        self,
+        kind: str,
+        handler: Callable,
+        controls: ControlSpec = None,
+        mode: str = MODE_INLINE,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        overflow: str = OVERFLOW_DROP_OLDEST
+    ) -> Subscription:
+        """
+        Call `handler` with every `kind` event from the given controls
+
+        Args:
+            kind (str): event kind, one of `EVENT_KINDS`
+            handler (Callable): sync or async callable taking the event
+            controls (ControlSpec, optional): see `resolve_controls()`. Defaults to None (all controls).
+            mode (str, optional): MODE_INLINE, MODE_TASK or MODE_THREAD. Defaults to MODE_INLINE.
+            maxsize (int, optional): queue bound for task / thread modes. Defaults to DEFAULT_QUEUE_SIZE.
+            overflow (str, optional): OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST or OVERFLOW_COALESCE. Defaults to OVERFLOW_DROP_OLDEST.
+
+        Returns:
+            Subscription: handle for `unsubscribe()`
+        """
+        subscription = Subscription(
+            kind=kind,
+            handler=handler,
+            indices=resolve_controls(kind, controls),
+            mode=mode,
+            maxsize=maxsize,
+            overflow=overflow
+        )
+        with self._lock:
+            self._subscriptions[kind] += (subscription,)
+            self._rebuild(kind)
+        return subscription
+
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            remaining = tuple(s for s in self._subscriptions[subscription.kind] if s is not subscription)
+            if len(remaining) == len(self._subscriptions[subscription.kind]):
+                return
+            self._subscriptions[subscription.kind] = remaining
+            self._rebuild(subscription.kind)
+
+        if subscription.worker is not None:
+            subscription.worker.cancel()
+            subscription.worker = None
+
+
+    def _rebuild(self, kind: str) -> None:
+        table = [[] for _ in range(EVENT_KINDS[kind])]
+        for subscription in self._subscriptions[kind]:
+            for index in subscription.indices:
+                table[index].append(subscription)
+        # Single reference swap, publishers see either the old table or the new one
+        self._tables[kind] = tuple(tuple(handlers) for handlers in table)
+
+
+    def subscribers(self, kind: str, index: int) -> tuple[Subscription, ...]:
+        return self._tables[kind][index]
+
+
+    async def publish(self, kind: str, index: int, event: Any) -> None:
+        """
+        Pass an event to everything subscribed to this control
+
+        Args:
+            kind (str): event kind
+            index (int): control index
+            event (Any): decoded event
+        """
+        for subscription in self._tables[kind][index]:
+            if subscription.queue is not None:
+                if subscription.worker is None:
+                    if subscription not in self._subscriptions[kind]:
+                        # Unsubscribed by an earlier handler for this event, a worker now would never be stopped
+                        continue
+                    executor = self._get_executor() if subscription.mode == MODE_THREAD else None
+                    subscription.worker = asyncio.create_task(subscription.run(executor))
+                subscription.offer(index, event)
+                continue
+
+            published_at = time.perf_counter()
+            if subscription.is_async:
+                await subscription.handler(event)
+            else:
+                subscription.handler(event)
+            subscription.record(published_at)
+
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.thread_workers, thread_name_prefix="pymcu-callback"
+            )
+        return self._executor
+
+
+    def close(self) -> None:
+        """
+        Stop every queued subscription's worker & the thread pool
+        """
+        for subscriptions in self._subscriptions.values():
+            for subscription in subscriptions:
+                if subscription.worker is not None:
+                    subscription.worker.cancel()
+                    subscription.worker = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+    def stats(self) -> dict[str, list[dict]]:
+        """
+        Delivery, drop & latency figures for every subscription, by event kind
+        """
+        return {
+            kind: [subscription.stats() for subscription in subscriptions]
+            for kind, subscriptions in self._subscriptions.items()
+        }
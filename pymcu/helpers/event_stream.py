@@ -0,0 +1,197 @@
+import asyncio
+import time
+import weakref
+from typing import Any, Iterable, Optional
+
+from .event_bus import EVENT_KINDS
+
+EVENT_LOG_SIZE = 4096
+DEFAULT_MAX_BATCH = 64
+DEFAULT_MAX_LATENCY = 0.005 # seconds
+
+
+class EventLog():
+    """
+    Fixed-size ring of decoded events, shared by every `EventStream`
+
+    Each event is stored once however many streams are reading, and every stream keeps its own cursor
+    (a sequence number) into the ring. A stream that falls more than `capacity` events behind skips
+    ahead to the oldest event still held, and counts what it missed.
+
+    With no streams open, `append()` returns straight away.
+
+    Args:
+        capacity: number of events held
+    """
+
+    def __init__(self, capacity: int = EVENT_LOG_SIZE):
+        self.capacity = capacity
+        self.kinds: list[Optional[str]] = [None] * capacity
+        self.events: list[Any] = [None] * capacity
+        self.times: list[float] = [0.0] * capacity
+        # Sequence number of the next event, i.e. the number appended so far
+        self.head = 0
+
+        self._streams: weakref.WeakSet[EventStream] = weakref.WeakSet()
+
+
+    def append(self, kind: str, event: Any) -> None:
+        if not self._streams:
+            return
+
+        slot = self.head % self.capacity
+        self.kinds[slot] = kind
+        self.events[slot] = event
+        self.times[slot] = time.perf_counter()
+        self.head += 1
+
+        for stream in self._streams:
+            stream.wake()
+
+
+    def stream(
+        self,
+        kinds: Optional[Iterable[str]] = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_latency: float = DEFAULT_MAX_LATENCY
+    ) -> "EventStream":
+        stream = EventStream(self, kinds=kinds, max_batch=max_batch, max_latency=max_latency)
+        self._streams.add(stream)
+        return stream
+
+
+    def remove(self, stream: "EventStream") -> None:
+        self._streams.discard(stream)
+
+
+class EventStream():
+    """
+    Async iterator over batches of events from an `EventLog`
+
+        async for batch in device.events(kinds=[EVENT_FADER], max_batch=32, max_latency=0.01):
+            ...
+
+    Each iteration waits for the first matching event, then gathers more until either
+    `max_batch` are collected or `max_latency` has passed since the first one arrived.
+    Streams only see events appended after they were opened.
+
+    Args:
+        log: shared event log
+        kinds: event kinds to include (see `EVENT_KINDS`), None for all
+        max_batch: most events per batch
+        max_latency: longest a batch is held open waiting to fill, in seconds (0 to yield as soon as possible)
+    """
+
+    def __init__(
+        self,
+        log: EventLog,
+        kinds: Optional[Iterable[str]] = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_latency: float = DEFAULT_MAX_LATENCY
+    ):
+        if kinds is not None:
+            kinds = frozenset(kinds)
+            for kind in kinds:
+                if kind not in EVENT_KINDS:
+                    raise ValueError(f"Unknown event kind: {kind}")
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+
+        self.log = log
+        self.kinds = kinds
+        self.max_batch = max_batch
+        self.max_latency = max_latency
+
+        self.cursor = log.head
+        self.closed = False
+        self._wakeup = asyncio.Event()
+        self._first_time = 0.0
+
+        self.delivered = 0
+        self.batches = 0
+        self.dropped = 0
+
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+
+    def _collect(self, batch: list) -> None:
+        log = self.log
+        head = log.head
+
+        behind = head - self.cursor
+        if behind > log.capacity:
+            # Overwritten before we got to them
+            self.dropped += behind - log.capacity
+            self.cursor = head - log.capacity
+
+        kinds = self.kinds
+        while self.cursor < head and len(batch) < self.max_batch:
+            slot = self.cursor % log.capacity
+            self.cursor += 1
+            if kinds is None or log.kinds[slot] in kinds:
+                if not batch:
+                    self._first_time = log.times[slot]
+                batch.append(log.events[slot])
+
+
+    def __aiter__(self) -> "EventStream":
+        return self
+
+
+    async def __anext__(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = []
+
+        while not self.closed:
+            self._wakeup.clear()
+            self._collect(batch)
+
+            if len(batch) >= self.max_batch:
+                break
+
+            timer = None
+            if batch:
+                remaining = self._first_time + self.max_latency - time.perf_counter()
+                if remaining <= 0:
+                    break
+                timer = loop.call_later(remaining, self._wakeup.set)
+
+            await self._wakeup.wait()
+            if timer is not None:
+                timer.cancel()
+
+        if not batch:
+            raise StopAsyncIteration
+
+        self.batches += 1
+        self.delivered += len(batch)
+        return batch
+
+
+    def close(self) -> None:
+        """
+        Stop the stream, a pending iteration returns what it has gathered so far
+        """
+        self.closed = True
+        self.log.remove(self)
+        self._wakeup.set()
+
+
+    async def __aenter__(self) -> "EventStream":
+        return self
+
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+
+    def stats(self) -> dict:
+        return {
+            "kinds": sorted(self.kinds) if self.kinds is not None else None,
+            "batches": self.batches,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "pending": self.log.head - self.cursor,
+        }
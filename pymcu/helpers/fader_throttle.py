@@ -0,0 +1,160 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from ..messages.fader import FaderMoveEvent
+
+N_FADERS = 9
+DEFAULT_FADER_RATE = 50.0 # updates per second, per fader
+
+
+class FaderThrottle():
+    """
+    Per-fader rate limit for raw fader events, between decoding and the user callbacks
+
+    A touched fader streams pitch bend as fast as the surface can send it. The throttle passes
+    at most `max_rate` updates per second for each fader. Anything arriving in between replaces
+    the held value (latest wins), and the held value goes out when its fader's window reopens.
+
+    Moves smaller than `deadband` (in 14-bit steps) from the last delivered position are treated as
+    jitter and dropped. On touch release, `release()` always delivers the fader's final position
+    if it hasn't been delivered yet, deadband or not.
+
+    Held values go out from one stored flush task per fader, and every delivery for a fader
+    holds that fader's lock, so deliveries are never reordered and the release value always goes out last.
+    Errors raised by `deliver` from a flush task are counted and kept in `last_error`.
+
+    Args:
+        deliver: async callable that passes an event on to the callbacks
+        max_rate: most updates per second per fader
+        deadband: smallest change in position worth delivering (0 to deliver every change)
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[FaderMoveEvent], Awaitable[None]],
+        max_rate: float = DEFAULT_FADER_RATE,
+        deadband: int = 0
+    ):
+        if max_rate <= 0:
+            raise ValueError("max_rate must be positive")
+
+        self.deliver = deliver
+        self.max_rate = max_rate
+        self.interval = 1.0 / max_rate
+        self.deadband = deadband
+
+        self._last_time = [-self.interval] * N_FADERS
+        self._last_position: list[Optional[int]] = [None] * N_FADERS
+        self._latest: list[Optional[FaderMoveEvent]] = [None] * N_FADERS
+        self._pending: list[Optional[FaderMoveEvent]] = [None] * N_FADERS
+        self._flushes: list[Optional[asyncio.Task]] = [None] * N_FADERS
+        self._flushing = [False] * N_FADERS # True while a flush task is delivering
+        self._locks = [asyncio.Lock() for _ in range(N_FADERS)]
+
+        self.received = 0
+        self.delivered = 0
+        self.coalesced = 0
+        self.filtered = 0
+        self.errors = 0
+        self.last_error: Optional[BaseException] = None
+
+
+    async def offer(self, event: FaderMoveEvent) -> None:
+        """
+        Pass a freshly decoded move through the throttle
+        """
+        index = event.index
+        self.received += 1
+        self._latest[index] = event
+
+        last = self._last_position[index]
+        if last is not None and abs(event.position - last) < self.deadband:
+            # Back within the deadband, so anything still held is stale
+            self._pending[index] = None
+            self.filtered += 1
+            return
+
+        wait = self._last_time[index] + self.interval - time.perf_counter()
+        if wait <= 0 and self._pending[index] is None:
+            await self._send(event)
+            return
+
+        if self._pending[index] is not None:
+            self.coalesced += 1
+        self._pending[index] = event
+        if self._flushes[index] is None:
+            self._flushes[index] = asyncio.create_task(self._flush(index))
+
+
+    async def _flush(self, index: int) -> None:
+        """
+        Flush task: deliver the held value each time the fader's window reopens, until nothing is held
+        """
+        try:
+            while self._pending[index] is not None:
+                wait = self._last_time[index] + self.interval - time.perf_counter()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+
+                event, self._pending[index] = self._pending[index], None
+                if event is None:
+                    continue
+                self._flushing[index] = True
+                try:
+                    await self._send(event)
+                except Exception as e:
+                    self.errors += 1
+                    self.last_error = e
+                finally:
+                    self._flushing[index] = False
+        finally:
+            if self._flushes[index] is asyncio.current_task():
+                self._flushes[index] = None
+
+
+    async def release(self, index: int) -> None:
+        """
+        Touch released: deliver the final position now, unless it already went out
+        A flush that is still waiting is dropped, one that is mid-delivery is finished first
+        """
+        self._pending[index] = None
+        flush = self._flushes[index]
+        if flush is not None:
+            if self._flushing[index]:
+                await flush
+            else:
+                flush.cancel()
+                self._flushes[index] = None
+
+        event = self._latest[index]
+        if event is not None and event.position != self._last_position[index]:
+            await self._send(event)
+
+
+    async def _send(self, event: FaderMoveEvent) -> None:
+        async with self._locks[event.index]:
+            self._last_time[event.index] = time.perf_counter()
+            self._last_position[event.index] = event.position
+            self.delivered += 1
+            await self.deliver(event)
+
+
+    def close(self) -> None:
+        for index, flush in enumerate(self._flushes):
+            if flush is not None:
+                flush.cancel()
+                self._flushes[index] = None
+        self._pending = [None] * N_FADERS
+
+
+    def stats(self) -> dict:
+        return {
+            "max_rate": self.max_rate,
+            "deadband": self.deadband,
+            "received": self.received,
+            "delivered": self.delivered,
+            "coalesced": self.coalesced,
+            "filtered": self.filtered,
+            "errors": self.errors,
+        }
@@ -0,0 +1,171 @@
+from ..messages.sysex import UpdateLCD, SOX, MCU_HEADER, EOX
+
+LCD_LINE_WIDTH = 0x38
+LCD_SIZE = LCD_LINE_WIDTH * 2
+
+# Fixed cost of every UpdateLCD: SOX, header, command, display offset, EOX
+LCD_SYSEX_OVERHEAD = len(SOX) + len(MCU_HEADER) + 2 + len(EOX)
+
+# Never a valid 7-bit character, so the first write to every cell differs from it
+UNKNOWN_CHAR = 0xFF
+
+
+class LCDFramebuffer():
+    """
+    Host-side shadow of the 2x56 character LCD
+
+    `pending` holds what the display should show, `sent` what we last transmitted.
+    Writes only touch `pending` and widen the dirty window; `flush()` diffs the window
+    and produces the fewest `UpdateLCD` messages covering every changed character.
+
+    Changed spans separated by fewer unchanged characters than the SysEx overhead
+    are merged, since re-sending the gap is cheaper than starting a new message.
+    """
+
+    def __init__(self, merge_gap: int = LCD_SYSEX_OVERHEAD):
+        self.merge_gap = merge_gap
+        self.pending = bytearray(b" " * LCD_SIZE)
+        self.sent = bytearray([UNKNOWN_CHAR] * LCD_SIZE)
+
+        self._dirty_start = LCD_SIZE
+        self._dirty_end = 0
+
+        self.bytes_requested = 0
+        self.bytes_sent = 0
+        self.messages_requested = 0
+        self.messages_sent = 0
+
+
+    @property
+    def bytes_saved(self) -> int:
+        """
+        SysEx bytes avoided compared to sending every write as-is
+        """
+        return self.bytes_requested - self.bytes_sent
+
+
+    @property
+    def dirty(self) -> bool:
+        return self._dirty_start < self._dirty_end
+
+
+    def write(self, display_offset: int, raw_text: bytes) -> None:
+        """
+        Write raw characters into the shadow buffer, wrapping lines like the device does
+
+        Args:
+            display_offset (int): Offset to write to (0x00..0x37 upper line, 0x38..0x6F lower line)
+            raw_text (bytes): Character codes
+        """
+        self.bytes_requested += LCD_SYSEX_OVERHEAD + len(raw_text)
+        self.messages_requested += 1
+
+        end = min(display_offset + len(raw_text), LCD_SIZE)
+        if display_offset < 0 or display_offset >= end:
+            return
+
+        self.pending[display_offset:end] = bytes(x & 0x7F for x in raw_text[:end - display_offset])
+        self._dirty_start = min(self._dirty_start, display_offset)
+        self._dirty_end = max(self._dirty_end, end)
+
+
+    def write_text(self, display_offset: int, text: str) -> None:
+        """
+        Write ASCII text into the shadow buffer
+
+        Args:
+            display_offset (int): Offset to write to
+            text (str): Text to write
+        """
+        self.write(display_offset, [ord(x) for x in text])
+
+
+    def changed_spans(self) -> list[tuple[int, int]]:
+        """
+        Find the (start, end) spans within the dirty window that differ from what was sent,
+        merging spans separated by no more than `merge_gap` unchanged characters
+        """
+        pending, sent = self.pending, self.sent
+        spans: list[list[int]] = []
+
+        i, end = self._dirty_start, self._dirty_end
+        while i < end:
+            if pending[i] == sent[i]:
+                i += 1
+                continue
+
+            start = i
+            while i < end and pending[i] != sent[i]:
+                i += 1
+
+            if spans and start - spans[-1][1] <= self.merge_gap:
+                spans[-1][1] = i
+            else:
+                spans.append([start, i])
+
+        return [(start, end) for start, end in spans]
+
+
+    def flush(self) -> list[UpdateLCD]:
+        """
+        Produce the messages needed to bring the device in line with the shadow buffer
+
+        Returns:
+            list[UpdateLCD]: one message per merged changed span
+        """
+        messages = []
+        for start, end in self.changed_spans():
+            self.sent[start:end] = self.pending[start:end]
+            messages.append(
+                UpdateLCD(raw_text=list(self.pending[start:end]), display_offset=start)
+            )
+            self.bytes_sent += LCD_SYSEX_OVERHEAD + (end - start)
+
+        self.messages_sent += len(messages)
+        self._dirty_start = LCD_SIZE
+        self._dirty_end = 0
+        return messages
+
+
+    def resync(self) -> list[UpdateLCD]:
+        """
+        Re-send the whole display regardless of what we think the device shows,
+        e.g. after it has reconnected with a blank screen
+
+        Returns:
+            list[UpdateLCD]: one message per line
+        """
+        messages = []
+        for start in range(0, LCD_SIZE, LCD_LINE_WIDTH):
+            end = start + LCD_LINE_WIDTH
+            messages.append(
+                UpdateLCD(raw_text=list(self.pending[start:end]), display_offset=start)
+            )
+            self.bytes_sent += LCD_SYSEX_OVERHEAD + LCD_LINE_WIDTH
+
+        self.sent[:] = self.pending
+        self.messages_sent += len(messages)
+        self._dirty_start = LCD_SIZE
+        self._dirty_end = 0
+        return messages
+
+
+    def line(self, index: int) -> str:
+        """
+        Current (pending) text of one line
+
+        Args:
+            index (int): 0 upper, 1 lower
+        """
+        start = index * LCD_LINE_WIDTH
+        return self.pending[start:start + LCD_LINE_WIDTH].decode("ascii")
+
+
+    def stats(self) -> dict:
+        return {
+            "messages_requested": self.messages_requested,
+            "messages_sent": self.messages_sent,
+            "bytes_requested": self.bytes_requested,
+            "bytes_sent": self.bytes_sent,
+            "bytes_saved": self.bytes_saved,
+        }
@@ -1,9 +1,83 @@
+import math
+import time
 from dataclasses import dataclass, field
 from asyncio import Event
+from typing import Callable, Optional
 
 from ..messages.fader import FaderMoveEvent
 from ..messages.button import ButtonPressEvent
 
+FADER_MAX = 0x3FFF
+RAMP_FRAME_RATE = 100 # motor frames per second while any ramp is running
+
+RAMP_LINEAR = "linear"
+RAMP_EXPONENTIAL = "exponential"
+RAMP_S_CURVE = "s_curve"
+
+# Steepness of the exponential curve, higher starts slower & finishes faster
+RAMP_EXPONENTIAL_K = 5.0
+
+# Progress (0..1) -> fraction of the distance covered (0..1)
+RAMP_CURVES: dict[str, Callable[[float], float]] = {
+    RAMP_LINEAR: lambda t: t,
+    RAMP_EXPONENTIAL: lambda t: math.expm1(RAMP_EXPONENTIAL_K * t) / math.expm1(RAMP_EXPONENTIAL_K),
+    RAMP_S_CURVE: lambda t: t * t * (3.0 - 2.0 * t),
+}
+
+
+class FaderUpdateChannel():
+    """
+    Change notification shared by a bank of `ManagedFader`s
+    Faders mark their index as dirty, a single consumer wakes once and collects all of them
+    """
+
+    def __init__(self):
+        self.dirty: set[int] = set()
+        self.event = Event()
+        # Set while any fader on the channel has a ramp running
+        self.ramps = Event()
+
+    def notify(self, index: int) -> None:
+        self.dirty.add(index)
+        self.event.set()
+
+    async def wait(self) -> set[int]:
+        """
+        Wait for at least one fader to change
+
+        Returns:
+            set[int]: indices of every fader changed since the last call
+        """
+        await self.event.wait()
+        self.event.clear()
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+    def ramp_started(self) -> None:
+        self.ramps.set()
+
+
+@dataclass
+class FaderRamp():
+    """
+    A timed move from one position to another along a curve
+    """
+    start: int
+    target: int
+    start_time: float
+    duration: float
+    curve: Callable[[float], float]
+
+    def position_at(self, now: float) -> int:
+        if self.duration <= 0 or now >= self.start_time + self.duration:
+            return self.target
+        t = max(0.0, (now - self.start_time) / self.duration)
+        return round(self.start + (self.target - self.start) * self.curve(t))
+
+    def finished(self, now: float) -> bool:
+        return now >= self.start_time + self.duration
+
+
 @dataclass
 class ManagedFader():
     index: int = field()
@@ -11,22 +85,78 @@ class ManagedFader():
     latched_value: int = 0
     raw_value: int = 0
     is_touched: bool = False
+    channel: FaderUpdateChannel = field(default=None, repr=False, compare=False)
+    ramp: Optional[FaderRamp] = field(default=None, repr=False, compare=False)
 
     def __post_init__(self):
         self.update_trigger = Event()
 
+    def _notify(self) -> None:
+        self.update_trigger.set()
+        if self.channel is not None:
+            self.channel.notify(self.index)
+
     def touch(self, event: ButtonPressEvent) -> None:
         if event.state:
             self.is_touched = True
+            # A hand on the fader wins over any automation move
+            self.ramp = None
         else:
             self.is_touched = False
             self.latched_value = self.raw_value
-            self.update_trigger.set()
+            self._notify()
     
     def update(self, event: FaderMoveEvent) -> None:
         if self.is_touched or not self.touchless_mode:
             self.raw_value = event.position
         
     def set_position(self, position: int) -> None:
+        self.ramp = None
         self.latched_value = position
-        self.update_trigger.set()
+        self._notify()
+
+    def ramp_to(self, position: int, duration: float, curve: str = RAMP_LINEAR, now: Optional[float] = None) -> None:
+        """
+        Move smoothly to `position` over `duration` seconds, replacing any ramp already running
+        Frames are generated by the shared ramp clock, touching the fader stops the ramp where it is
+
+        Args:
+            position (int): target position (0 .. 0x3FFF)
+            duration (float): seconds
+            curve (str, optional): RAMP_LINEAR, RAMP_EXPONENTIAL or RAMP_S_CURVE. Defaults to RAMP_LINEAR.
+            now (Optional[float], optional): `time.perf_counter()` start time. Defaults to now.
+        """
+        if curve not in RAMP_CURVES:
+            raise ValueError(f"Unknown ramp curve: {curve}")
+
+        self.ramp = FaderRamp(
+            start=self.latched_value,
+            target=max(0, min(FADER_MAX, position)),
+            start_time=time.perf_counter() if now is None else now,
+            duration=duration,
+            curve=RAMP_CURVES[curve]
+        )
+        if self.channel is not None:
+            self.channel.ramp_started()
+
+    def step(self, now: float) -> bool:
+        """
+        Advance the ramp to `now`
+
+        Returns:
+            bool: True if the 14-bit position changed and needs sending
+        """
+        ramp = self.ramp
+        if ramp is None:
+            return False
+        if self.is_touched:
+            self.ramp = None
+            return False
+
+        position = ramp.position_at(now)
+        if ramp.finished(now):
+            self.ramp = None
+        if position == self.latched_value:
+            return False
+        self.latched_value = position
+        return True
@@ -0,0 +1,179 @@
+import math
+from dataclasses import dataclass, field
+from asyncio import Event
+from typing import Callable, Optional
+
+from ..messages.vpot import VPotMoveEvent, RING_MODE_SINGLE, RING_MODE_FILL_CENTRE, RING_MODE_FILL_LEFT, RING_MODE_WIDTH
+
+N_VPOTS = 8
+VPOT_TICK_INTERVAL = 0.01 # seconds, encoder messages within this window are merged into one change
+
+VPOT_ACCEL_NONE = "none"
+VPOT_ACCEL_LINEAR = "linear"
+VPOT_ACCEL_POWER = "power"
+
+# Exponent of the power curve, higher makes fast turns cover more ground
+VPOT_ACCEL_EXPONENT = 1.5
+
+# Detents turned in one tick (signed) -> steps to move the value
+VPOT_ACCEL_CURVES: dict[str, Callable[[int], float]] = {
+    VPOT_ACCEL_NONE: lambda d: math.copysign(1, d),
+    VPOT_ACCEL_LINEAR: lambda d: d,
+    VPOT_ACCEL_POWER: lambda d: math.copysign(abs(d) ** VPOT_ACCEL_EXPONENT, d),
+}
+
+# Ring positions (1-based ring value) used by each mode, width only lights up to half the ring
+RING_POSITIONS = {
+    RING_MODE_SINGLE: 11,
+    RING_MODE_FILL_CENTRE: 11,
+    RING_MODE_FILL_LEFT: 11,
+    RING_MODE_WIDTH: 6,
+}
+
+
+def ring_table(mode: int, extra: bool) -> bytes:
+    """
+    Precompute the ring CC value byte for every ring position in a mode
+    Index 0 is the ring switched off, 1 .. `RING_POSITIONS[mode]` light it up
+
+    Args:
+        mode (int): LED ring mode (single, fill-centre, fill-left, width)
+        extra (bool): Bonus LED underneath the encoder
+
+    Returns:
+        bytes: value byte per position, laid out as in `SetVPotLED`
+    """
+    if mode not in RING_POSITIONS:
+        raise ValueError(f"Unknown ring mode: {mode}")
+    return bytes(position | (mode << 4) | (extra << 6) for position in range(RING_POSITIONS[mode] + 1))
+
+
+class VPotUpdateChannel():
+    """
+    Change notification shared by a bank of `ManagedVPot`s
+    Pots mark their index as dirty as encoder messages arrive, a single consumer collects them once per tick
+    """
+
+    def __init__(self):
+        self.dirty: set[int] = set()
+        self.event = Event()
+
+    def notify(self, index: int) -> None:
+        self.dirty.add(index)
+        self.event.set()
+
+    async def wait(self) -> set[int]:
+        """
+        Wait for at least one pot to be turned
+
+        Returns:
+            set[int]: indices of every pot turned since the last call
+        """
+        await self.event.wait()
+        self.event.clear()
+        dirty, self.dirty = self.dirty, set()
+        return dirty
+
+
+@dataclass
+class ManagedVPot():
+    """
+    Value behind a VPot, with its LED ring rendered from it
+
+    Encoder deltas are only accumulated as they arrive. Once per tick, `apply()` runs the total
+    through the acceleration curve, moves the value by that many `step`s and clamps it to the range,
+    so a fast spin becomes one value change rather than one per message.
+
+    With `show_ring` set, the value is drawn on the ring through a table precomputed for the ring mode,
+    and `render()` only returns a byte when it differs from the last one sent. It is off by default,
+    so rings set by the app with `set_vpot_led()` are left alone unless a pot is configured to draw its own.
+    """
+    index: int = field()
+    minimum: float = 0.0
+    maximum: float = 1.0
+    step: float = 0.01
+    value: float = 0.0
+    acceleration: str = VPOT_ACCEL_LINEAR
+    mode: int = RING_MODE_SINGLE
+    extra: bool = False
+    # Draw the value on the LED ring, see `MCUDevice.configure_vpot()`
+    show_ring: bool = False
+    channel: VPotUpdateChannel = field(default=None, repr=False, compare=False)
+
+    pending: int = field(default=0, init=False)
+    sent_ring: Optional[int] = field(default=None, init=False, repr=False)
+    received: int = field(default=0, init=False)
+    changes: int = field(default=0, init=False)
+
+    def __post_init__(self):
+        if self.maximum <= self.minimum:
+            raise ValueError("maximum must be greater than minimum")
+        if self.step <= 0:
+            raise ValueError("step must be positive")
+        if self.acceleration not in VPOT_ACCEL_CURVES:
+            raise ValueError(f"Unknown acceleration curve: {self.acceleration}")
+        self.value = self._clamp(self.value)
+        self._table = ring_table(self.mode, self.extra)
+
+    def _clamp(self, value: float) -> float:
+        # Snap to the step grid, so repeated small moves never drift
+        value = self.minimum + round((value - self.minimum) / self.step) * self.step
+        return max(self.minimum, min(self.maximum, value))
+
+    def accumulate(self, event: VPotMoveEvent) -> None:
+        self.received += 1
+        self.pending += event.delta
+        if self.channel is not None:
+            self.channel.notify(self.index)
+
+    def apply(self) -> bool:
+        """
+        Fold the deltas accumulated since the last tick into the value
+
+        Returns:
+            bool: True if the value changed
+        """
+        pending, self.pending = self.pending, 0
+        if not pending:
+            return False
+        steps = VPOT_ACCEL_CURVES[self.acceleration](pending)
+        return self.set_value(self.value + steps * self.step)
+
+    def set_value(self, value: float) -> bool:
+        value = self._clamp(value)
+        if value == self.value:
+            return False
+        self.value = value
+        self.changes += 1
+        return True
+
+    def set_ring_style(self, mode: int, extra: bool = False) -> None:
+        self._table = ring_table(mode, extra)
+        self.mode = mode
+        self.extra = extra
+
+    @property
+    def ring_byte(self) -> int:
+        positions = len(self._table) - 1
+        fraction = (self.value - self.minimum) / (self.maximum - self.minimum)
+        return self._table[1 + round(fraction * (positions - 1))]
+
+    def render(self) -> Optional[int]:
+        """
+        Returns:
+            Optional[int]: ring value byte to send, or None if the ring already shows it
+        """
+        if not self.show_ring:
+            return None
+        ring = self.ring_byte
+        if ring == self.sent_ring:
+            return None
+        self.sent_ring = ring
+        return ring
+
+    def stats(self) -> dict:
+        return {
+            "value": self.value,
+            "received": self.received,
+            "changes": self.changes,
+        }
@@ -0,0 +1,177 @@
+import asyncio
+import math
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+
+from ..messages.vpot import ScrollWheelMoveEvent
+
+DEFAULT_SCRUB_RATE = 60.0 # scrub updates per second while the wheel is moving
+DEFAULT_WHEEL_SMOOTHING = 0.05 # seconds, time constant of the velocity filter
+WHEEL_IDLE_TIMEOUT = 0.25 # seconds without a message before the wheel counts as stopped
+WHEEL_MIN_INTERVAL = 0.002 # seconds, shortest gap trusted between two messages
+
+WHEEL_ACCEL_NONE = "none"
+WHEEL_ACCEL_LINEAR = "linear"
+WHEEL_ACCEL_QUADRATIC = "quadratic"
+
+# Speed (detents per second) at which the linear curve doubles each detent
+WHEEL_ACCEL_REFERENCE = 40.0
+
+# Speed (detents per second) -> multiplier applied to each detent
+WHEEL_ACCEL_CURVES: dict[str, Callable[[float], float]] = {
+    WHEEL_ACCEL_NONE: lambda speed: 1.0,
+    WHEEL_ACCEL_LINEAR: lambda speed: 1.0 + speed / WHEEL_ACCEL_REFERENCE,
+    WHEEL_ACCEL_QUADRATIC: lambda speed: 1.0 + (speed / WHEEL_ACCEL_REFERENCE) ** 2,
+}
+
+
+@dataclass
+class WheelScrub():
+    """
+    One fixed-rate update from the `ScrollWheel` engine
+
+    Args:
+        delta: accelerated movement since the last update
+        detents: raw detents counted since the last update
+        velocity: smoothed speed in detents per second, signed, 0 once the wheel stops
+        position: running total of `delta`
+    """
+    delta: float
+    detents: int
+    velocity: float
+    position: float
+
+
+class ScrollWheel():
+    """
+    Velocity & acceleration engine for the jog / scroll wheel
+
+    Each CC 0x3C message is timestamped when fed in. Detents per second are estimated from the gaps
+    between messages and smoothed with an exponential filter whose weight depends on the gap,
+    so irregular message timing doesn't show up as jumpy speed. If the next detent is late,
+    the estimate falls to what the gap allows, and to 0 after `WHEEL_IDLE_TIMEOUT`.
+
+    `run()` hands out a `WheelScrub` at a fixed rate while the wheel is moving,
+    with the detents scaled by the acceleration curve at the current speed.
+
+    Args:
+        rate: scrub updates per second
+        smoothing: velocity filter time constant in seconds (0 for no smoothing)
+        acceleration: WHEEL_ACCEL_NONE, WHEEL_ACCEL_LINEAR or WHEEL_ACCEL_QUADRATIC
+        sensitivity: multiplier applied to every detent
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_SCRUB_RATE,
+        smoothing: float = DEFAULT_WHEEL_SMOOTHING,
+        acceleration: str = WHEEL_ACCEL_LINEAR,
+        sensitivity: float = 1.0
+    ):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if acceleration not in WHEEL_ACCEL_CURVES:
+            raise ValueError(f"Unknown acceleration curve: {acceleration}")
+
+        self.rate = rate
+        self.smoothing = smoothing
+        self.acceleration = acceleration
+        self.curve = WHEEL_ACCEL_CURVES[acceleration]
+        self.sensitivity = sensitivity
+
+        self.velocity = 0.0
+        self.position = 0.0
+        self.pending = 0
+        self._last_time: Optional[float] = None
+        self._active = asyncio.Event()
+
+        self.received = 0
+        self.updates = 0
+
+
+    def feed(self, event: ScrollWheelMoveEvent, now: Optional[float] = None) -> None:
+        """
+        Take one wheel message, as it arrives
+        """
+        now = time.perf_counter() if now is None else now
+        self.received += 1
+        self.pending += event.delta
+
+        last, self._last_time = self._last_time, now
+        if last is None or now - last >= WHEEL_IDLE_TIMEOUT or (self.velocity and (self.velocity > 0) != (event.delta > 0)):
+            # Starting off, or reversing: nothing to smooth against
+            self.velocity = event.delta / WHEEL_IDLE_TIMEOUT
+        else:
+            gap = max(now - last, WHEEL_MIN_INTERVAL)
+            weight = 1.0 - math.exp(-gap / self.smoothing) if self.smoothing > 0 else 1.0
+            self.velocity += weight * (event.delta / gap - self.velocity)
+        self._active.set()
+
+
+    def frame(self, now: Optional[float] = None) -> Optional[WheelScrub]:
+        """
+        Produce the scrub update for one frame
+
+        Returns:
+            Optional[WheelScrub]: the update, or None if the wheel is, and was, standing still
+        """
+        now = time.perf_counter() if now is None else now
+        if self._last_time is None:
+            return None
+
+        velocity = self.velocity
+        gap = now - self._last_time
+        if gap >= WHEEL_IDLE_TIMEOUT:
+            velocity = 0.0
+        elif velocity and gap * abs(velocity) > 1.0:
+            # Overdue: the wheel can't be moving faster than one detent per `gap`
+            velocity = math.copysign(1.0 / gap, velocity)
+
+        detents, self.pending = self.pending, 0
+        if not detents and velocity == self.velocity:
+            return None
+        self.velocity = velocity
+
+        delta = detents * self.sensitivity * self.curve(abs(velocity))
+        self.position += delta
+        self.updates += 1
+        return WheelScrub(delta=delta, detents=detents, velocity=velocity, position=self.position)
+
+
+    @property
+    def moving(self) -> bool:
+        return self.pending != 0 or self.velocity != 0.0
+
+
+    async def run(self, send: Callable[[WheelScrub], Awaitable[None]]) -> None:
+        """
+        Drive `frame()` on a fixed clock while the wheel is moving, idle otherwise
+
+        Args:
+            send (Callable[[WheelScrub], Awaitable[None]]): awaited with every update
+        """
+        period = 1.0 / self.rate
+        while True:
+            await self._active.wait()
+
+            next_frame = time.perf_counter()
+            while self.moving:
+                scrub = self.frame(next_frame)
+                if scrub is not None:
+                    await send(scrub)
+                next_frame += period
+                await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
+
+            self._active.clear()
+
+
+    def stats(self) -> dict:
+        return {
+            "rate": self.rate,
+            "acceleration": self.acceleration,
+            "velocity": self.velocity,
+            "position": self.position,
+            "received": self.received,
+            "updates": self.updates,
+        }
@@ -0,0 +1,304 @@
+import asyncio
+import mmap
+import os
+import struct
+import time
+from array import array
+from bisect import bisect_left
+from typing import Awaitable, Callable, Iterator, Optional
+
+MIDIMessage = list[int]
+
+# File header: magic, format version, session start (wall clock, seconds since the epoch)
+LOG_MAGIC = b"PYMCULOG"
+LOG_VERSION = 1
+LOG_HEADER = struct.Struct("<8sHxxd")
+
+# Record header: microseconds since the previous record, direction, message length
+RECORD_HEADER = struct.Struct("<IBH")
+MAX_RECORD_DELTA = 0xFFFFFFFF
+
+DIRECTION_RX = 0 # device -> host
+DIRECTION_TX = 1 # host -> device
+DIRECTION_GAP = 0xFF # no message, just moves the clock on past a > ~71 minute silence
+
+# Sidecar index: (session time in us before the record, file offset of the record)
+INDEX_SUFFIX = ".idx"
+INDEX_INTERVAL = 1.0
+
+
+class SessionRecorder():
+    """
+    Append-only binary log of MIDI traffic in both directions
+
+    Each record is a 7 byte header (delta time in microseconds, direction, length) followed by the raw bytes,
+    so a busy session costs ~10 bytes per message. Every `index_interval` seconds of session time a
+    (time, offset) entry goes into a sidecar `.idx` file, so `SessionLog` can seek without scanning.
+
+    Not thread safe: record from the event loop only.
+
+    Args:
+        path: log file to create (overwritten if it exists)
+        index_interval: seconds of session time between index entries
+    """
+
+    def __init__(self, path: str, index_interval: float = INDEX_INTERVAL):
+        self.path = path
+        self.index_interval = index_interval
+
+        self._file = open(path, "wb")
+        self._index = open(path + INDEX_SUFFIX, "wb")
+        self._file.write(LOG_HEADER.pack(LOG_MAGIC, LOG_VERSION, time.time()))
+        self._offset = LOG_HEADER.size
+
+        self._start = time.perf_counter()
+        self._last_us = 0
+        self._next_index_us = 0
+        self._index_step_us = int(index_interval * 1e6)
+
+        self.records = 0
+
+
+    def record(self, direction: int, message: MIDIMessage) -> None:
+        """
+        Append one message to the log
+
+        Args:
+            direction (int): `DIRECTION_RX` or `DIRECTION_TX`
+            message (MIDIMessage): raw MIDI, any sequence of ints / bytes-like
+        """
+        now_us = int((time.perf_counter() - self._start) * 1e6)
+
+        while now_us - self._last_us > MAX_RECORD_DELTA:
+            self._write(MAX_RECORD_DELTA, DIRECTION_GAP, b"")
+
+        if now_us >= self._next_index_us:
+            self._index.write(struct.pack("<QQ", self._last_us, self._offset))
+            self._next_index_us = now_us + self._index_step_us
+
+        self._write(now_us - self._last_us, direction, bytes(message))
+        self.records += 1
+
+
+    def _write(self, delta_us: int, direction: int, data: bytes) -> None:
+        self._file.write(RECORD_HEADER.pack(delta_us, direction, len(data)))
+        self._file.write(data)
+        self._offset += RECORD_HEADER.size + len(data)
+        self._last_us += delta_us
+
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._index.flush()
+
+
+    def close(self) -> None:
+        self._file.close()
+        self._index.close()
+
+
+    def __enter__(self) -> "SessionRecorder":
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SessionLog():
+    """
+    Read-only view of a session log, memory-mapped so multi-hour logs aren't loaded into RAM
+
+    Seeking uses the `.idx` sidecar if there is one, or builds the index with a single scan if not.
+
+    Args:
+        path: log file written by `SessionRecorder`
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.start_time = LOG_HEADER.unpack_from(self._map, 0)
+        if magic != LOG_MAGIC:
+            raise ValueError(f"Not a session log: {path}")
+        if version != LOG_VERSION:
+            raise ValueError(f"Unsupported session log version: {version}")
+
+        self._index_times = array("Q")
+        self._index_offsets = array("Q")
+        if os.path.exists(path + INDEX_SUFFIX):
+            self._load_index(path + INDEX_SUFFIX)
+        else:
+            self._build_index()
+
+
+    def _load_index(self, path: str) -> None:
+        entries = array("Q")
+        with open(path, "rb") as f:
+            entries.frombytes(f.read())
+        self._index_times = entries[0::2]
+        self._index_offsets = entries[1::2]
+
+
+    def _build_index(self, interval: float = INDEX_INTERVAL) -> None:
+        step_us = int(interval * 1e6)
+        next_us = 0
+        before_us = 0
+        for offset, now_us, _, _ in self._scan(LOG_HEADER.size, 0):
+            if now_us >= next_us:
+                self._index_times.append(before_us)
+                self._index_offsets.append(offset)
+                next_us = now_us + step_us
+            before_us = now_us
+
+
+    def _scan(self, offset: int, now_us: int) -> Iterator[tuple[int, int, int, bytes]]:
+        """
+        Walk the records from `offset`, where the session clock reads `now_us`
+
+        Yields:
+            (record offset, session time in us, direction, raw bytes)
+        """
+        log = self._map
+        end = len(log)
+        header_size = RECORD_HEADER.size
+        while offset + header_size <= end:
+            delta_us, direction, length = RECORD_HEADER.unpack_from(log, offset)
+            data_start = offset + header_size
+            if data_start + length > end:
+                # Truncated final record, e.g. the recorder was killed mid-write
+                return
+            now_us += delta_us
+            yield offset, now_us, direction, log[data_start:data_start + length]
+            offset = data_start + length
+
+
+    def _offset_for(self, time_us: int) -> tuple[int, int]:
+        # Last entry strictly before `time_us`, so nothing at exactly `time_us` is skipped
+        i = bisect_left(self._index_times, time_us) - 1
+        if i < 0:
+            return LOG_HEADER.size, 0
+        return self._index_offsets[i], self._index_times[i]
+
+
+    def records(
+        self,
+        start: float = 0.0,
+        end: Optional[float] = None,
+        directions: tuple[int, ...] = (DIRECTION_RX, DIRECTION_TX)
+    ) -> Iterator[tuple[float, int, bytes]]:
+        """
+        Iterate over the messages in a time window
+
+        Args:
+            start (float, optional): session time in seconds to start at. Defaults to the beginning.
+            end (Optional[float], optional): session time in seconds to stop at. Defaults to the end.
+            directions (tuple[int, ...], optional): which directions to include. Defaults to both.
+
+        Yields:
+            (session time in seconds, direction, raw bytes)
+        """
+        start_us = int(start * 1e6)
+        end_us = None if end is None else int(end * 1e6)
+        offset, now_us = self._offset_for(start_us)
+
+        for _, now_us, direction, data in self._scan(offset, now_us):
+            if end_us is not None and now_us > end_us:
+                return
+            if now_us >= start_us and direction in directions:
+                yield now_us / 1e6, direction, data
+
+
+    def duration(self) -> float:
+        """
+        Session time of the last record in seconds, found by scanning on from the last index entry
+        """
+        if self._index_times:
+            offset, now_us = self._index_offsets[-1], self._index_times[-1]
+        else:
+            offset, now_us = LOG_HEADER.size, 0
+        for _, now_us, _, _ in self._scan(offset, now_us):
+            pass
+        return now_us / 1e6
+
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+
+    def __enter__(self) -> "SessionLog":
+        return self
+
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class SessionReplayer():
+    """
+    Feed a recorded session back through a message handler (e.g. `MCUDevice`'s decode & dispatch)
+
+    Args:
+        log: session to replay
+        handle: async callable taking one raw MIDI message
+        speed: playback rate, 1.0 is real time, 10.0 is ten times faster, None is as fast as possible
+    """
+
+    def __init__(
+        self,
+        log: SessionLog,
+        handle: Callable[[MIDIMessage], Awaitable[None]],
+        speed: Optional[float] = 1.0
+    ):
+        if speed is not None and speed <= 0:
+            raise ValueError("Replay speed must be positive")
+
+        self.log = log
+        self.handle = handle
+        self.speed = speed
+
+        self.replayed = 0
+        self.max_lag = 0.0 # seconds behind schedule, worst case
+
+
+    async def run(
+        self,
+        start: float = 0.0,
+        end: Optional[float] = None,
+        directions: tuple[int, ...] = (DIRECTION_RX,)
+    ) -> int:
+        """
+        Replay a time window of the session
+
+        Args:
+            start (float, optional): session time in seconds to start at. Defaults to the beginning.
+            end (Optional[float], optional): session time in seconds to stop at. Defaults to the end.
+            directions (tuple[int, ...], optional): which directions to replay. Defaults to device -> host.
+
+        Returns:
+            int: number of messages replayed
+        """
+        replayed = 0
+        wall_start = time.perf_counter()
+
+        for session_time, _, data in self.log.records(start, end, directions):
+            if self.speed is None:
+                # Still yield now and then so other tasks (consumers, producers) get to run
+                if replayed % 64 == 0:
+                    await asyncio.sleep(0)
+            else:
+                due = wall_start + (session_time - start) / self.speed
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.max_lag = max(self.max_lag, -delay)
+
+            await self.handle(list(data))
+            replayed += 1
+
+        self.replayed += replayed
+        return replayed
@@ -1,19 +1,177 @@
-from ..messages import *
-from dataclasses import dataclass, field
+from array import array
+
+from ..messages.hardware_mapping import NOTE_MAP
+from ..messages.vpot import VPOT_RING_CC_BASE
+from ..messages.sysex import LCD_WHITE
+from .lcd_framebuffer import LCD_SIZE, LCD_LINE_WIDTH
 
 MIDIMessage = list[int]
 
-@dataclass
+N_NOTES = 128
+N_FADERS = 9
+N_STRIPS = 8
+
+# Timecode / assignment display digits are CC 0x40..0x4B
+TIMECODE_CC_BASE = 0x40
+N_TIMECODE_DIGITS = 12
+
+SYSEX_UPDATE_LCD = 0x12
+SYSEX_UPDATE_LCD_COLOUR = 0x72
+
+MODEL_FIELDS = (
+    "leds", "buttons", "faders", "vpot_rings", "meters", "meter_overloads", "lcd", "lcd_colours", "timecode"
+)
+
+
 class MCUSurfaceModel():
     """
-    Represents the current state of LEDs / pots / faders
+    Represents the current state of LEDs / pots / faders / displays
+
+    Everything lives in flat `bytearray` / `array` buffers indexed by control number,
+    so applying a message is a couple of index operations and a snapshot is a handful of buffer copies.
+
+    Outbound messages (host -> device) update the host-side state: LEDs, fader positions,
+    VPot rings, meters, LCD text & colours, timecode digits.
+    Inbound messages (device -> host) update button states and fader positions.
+    Truncated messages are ignored.
     """
 
     def __init__(self):
-        pass
+        self.leds = bytearray(N_NOTES)
+        self.buttons = bytearray(N_NOTES)
+        self.faders = array("H", bytes(2 * N_FADERS))
+        self.vpot_rings = bytearray(N_STRIPS)
+        self.meters = bytearray(N_STRIPS)
+        self.meter_overloads = bytearray(N_STRIPS)
+        self.lcd = bytearray(b" " * LCD_SIZE)
+        self.lcd_colours = bytearray([LCD_WHITE] * N_STRIPS)
+        self.timecode = bytearray(N_TIMECODE_DIGITS)
+
+        self.messages_applied = 0
+
+        # Indexed by the message type nibble
+        self._handlers = [None] * 16
+        self._handlers[0x9] = self._apply_note
+        self._handlers[0xB] = self._apply_cc
+        self._handlers[0xD] = self._apply_channel_pressure
+        self._handlers[0xE] = self._apply_pitch_bend
+        self._handlers[0xF] = self._apply_sysex
+
 
-    def update(self, message: MIDIMessage):
+    def update(self, message: MIDIMessage, outbound: bool = True) -> None:
         """
         Update the surface model with a MIDI message
+
+        Args:
+            message (MIDIMessage): raw MIDI
+            outbound (bool, optional): True for host -> device, False for device -> host. Defaults to True.
+        """
+        handler = self._handlers[message[0] >> 4]
+        if handler is not None:
+            handler(message, outbound)
+            self.messages_applied += 1
+
+
+    def _apply_note(self, message: MIDIMessage, outbound: bool) -> None:
+        if len(message) < 3:
+            return
+        if outbound:
+            self.leds[message[1]] = message[2]
+        else:
+            self.buttons[message[1]] = message[2]
+
+
+    def _apply_cc(self, message: MIDIMessage, outbound: bool) -> None:
+        # Inbound CCs are relative VPot / wheel moves, there's no state to keep
+        if not outbound or len(message) < 3:
+            return
+
+        cc = message[1]
+        if VPOT_RING_CC_BASE <= cc < VPOT_RING_CC_BASE + N_STRIPS:
+            self.vpot_rings[cc - VPOT_RING_CC_BASE] = message[2]
+        elif TIMECODE_CC_BASE <= cc < TIMECODE_CC_BASE + N_TIMECODE_DIGITS:
+            self.timecode[cc - TIMECODE_CC_BASE] = message[2]
+
+
+    def _apply_channel_pressure(self, message: MIDIMessage, outbound: bool) -> None:
+        if len(message) < 2:
+            return
+        strip, nibble = message[1] >> 4, message[1] & 0x0F
+        if strip >= N_STRIPS:
+            return
+
+        # 0x0E / 0x0F set / clear the overload LED without touching the level
+        if nibble >= 0x0E:
+            self.meter_overloads[strip] = nibble == 0x0E
+        else:
+            self.meters[strip] = nibble
+
+
+    def _apply_pitch_bend(self, message: MIDIMessage, outbound: bool) -> None:
+        index = message[0] & 0x0F
+        if index < N_FADERS and len(message) >= 3:
+            self.faders[index] = (message[2] & 0x7F) << 7 | (message[1] & 0x7F)
+
+
+    def _apply_sysex(self, message: MIDIMessage, outbound: bool) -> None:
+        if not outbound or len(message) < 7:
+            return
+
+        command = message[5]
+        if command == SYSEX_UPDATE_LCD:
+            offset = message[6]
+            end = min(offset + len(message) - 8, LCD_SIZE)
+            if offset < end:
+                self.lcd[offset:end] = bytes(message[7:7 + end - offset])
+        elif command == SYSEX_UPDATE_LCD_COLOUR:
+            self.lcd_colours[:] = bytes(message[6:6 + N_STRIPS])
+
+
+    # ===== #
+
+    def led_states(self) -> dict[str, int]:
+        """
+        LED state for every named control in `NOTE_MAP`
+        """
+        return {name: self.leds[note] for note, name in NOTE_MAP.items()}
+
+
+    def lcd_line(self, index: int) -> str:
+        start = index * LCD_LINE_WIDTH
+        return self.lcd[start:start + LCD_LINE_WIDTH].decode("ascii", errors="replace")
+
+
+    def copy(self) -> "MCUSurfaceModel":
+        """
+        Snapshot of the current state, sharing nothing with this model
+        """
+        snapshot = MCUSurfaceModel()
+        for name in MODEL_FIELDS:
+            getattr(snapshot, name)[:] = getattr(self, name)
+        snapshot.messages_applied = self.messages_applied
+        return snapshot
+
+
+    def diff(self, other: "MCUSurfaceModel") -> dict[str, list[int]]:
         """
-        pass
+        Find every control whose state differs between two models
+
+        Args:
+            other (MCUSurfaceModel): model to compare against
+
+        Returns:
+            dict[str, list[int]]: changed indices, keyed by field name (unchanged fields are omitted)
+        """
+        changes = {}
+        for name in MODEL_FIELDS:
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if mine == theirs:
+                continue
+            changes[name] = [i for i, (a, b) in enumerate(zip(mine, theirs)) if a != b]
+        return changes
+
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MCUSurfaceModel):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in MODEL_FIELDS)
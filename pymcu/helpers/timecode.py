@@ -0,0 +1,273 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Optional
+
+from ..messages.sysex import UpdateTimecodeChar, SEGMENT_CHARS, SEGMENT_TABLE, SEGMENT_DOT
+
+# 12 cells in total: 2 assignment characters then 10 timecode digits, left to right.
+# Cells are numbered here by CC offset from 0x40, which counts from the right hand end.
+N_TIMECODE_CELLS = 12
+N_TIMECODE_DIGITS = 10
+
+DEFAULT_TIMECODE_RATE = 30.0 # display frames per second
+
+_CHARS_BY_SEGMENT = {code: char for char, code in SEGMENT_CHARS.items() if code != SEGMENT_DOT}
+
+
+def segment_codes(text: str) -> bytes:
+    """
+    Translate text to 7-segment codes through the precompiled `SEGMENT_TABLE`
+    """
+    return text.encode("latin-1", errors="replace").translate(SEGMENT_TABLE)
+
+
+def dot_mask(positions: tuple[int, ...], width: int = N_TIMECODE_DIGITS) -> int:
+    """
+    Build an integer mask that sets the decimal point after the digits at `positions` (left to right)
+    OR it with `int.from_bytes(codes, "big")` to apply every dot at once
+    """
+    mask = 0
+    for position in positions:
+        mask |= SEGMENT_DOT << (8 * (width - 1 - position))
+    return mask
+
+
+class TimecodeDisplay():
+    """
+    Diffs writes to the 12 timecode / assignment display cells, indexed by CC offset from 0x40
+
+    Writes are compared against the cell shadow and only the changed cells become messages,
+    so a clock display running at 30 fps mostly sends the frames digits.
+
+    `MCUDevice` passes in `MCUSurfaceModel.timecode`, so the surface model's copy is the only shadow.
+    Cells are written to it as messages are queued; the queue keeps one pending message per cell,
+    so what is eventually transmitted is what the shadow already holds.
+
+    Args:
+        cells: shadow to diff against and update, defaults to a new blank one
+    """
+
+    def __init__(self, cells: Optional[bytearray] = None):
+        self.cells = bytearray(N_TIMECODE_CELLS) if cells is None else cells
+        self.written = 0
+        self.sent = 0
+
+
+    def write_codes(self, offset: int, codes: bytes, left_to_right: bool = True) -> list[UpdateTimecodeChar]:
+        """
+        Write raw 7-segment codes
+
+        Args:
+            offset (int): first cell, counted from the left (left_to_right) or from the right (not left_to_right)
+            codes (bytes): one segment code per cell
+            left_to_right (bool, optional): direction to write in. Defaults to True.
+
+        Returns:
+            list[UpdateTimecodeChar]: one message per cell that changed
+        """
+        messages = []
+        cells = self.cells
+        for i, code in enumerate(codes):
+            cell = N_TIMECODE_CELLS - 1 - (offset + i) if left_to_right else offset + i
+            if not 0 <= cell < N_TIMECODE_CELLS:
+                continue
+            self.written += 1
+            if cells[cell] != code:
+                cells[cell] = code
+                messages.append(UpdateTimecodeChar(raw_char=code, display_offset=cell))
+        self.sent += len(messages)
+        return messages
+
+
+    def write_text(self, offset: int, text: str, left_to_right: bool = True) -> list[UpdateTimecodeChar]:
+        return self.write_codes(offset, segment_codes(text), left_to_right=left_to_right)
+
+
+    def text(self) -> str:
+        """
+        Best-effort readback of the display, left to right
+        """
+        return "".join(
+            _CHARS_BY_SEGMENT.get(code & ~SEGMENT_DOT, " ") + ("." if code & SEGMENT_DOT else "")
+            for code in reversed(self.cells)
+        )
+
+
+    @property
+    def messages_saved(self) -> int:
+        return self.written - self.sent
+
+
+class TimecodeClock(ABC):
+    """
+    Base for the clock sources: a position that runs from `start()` and can be stopped & located
+
+    Subclasses turn the position in seconds into the 10 display digits and say where the dots go.
+    """
+    DOTS: tuple[int, ...] = ()
+    frame_rate: float = DEFAULT_TIMECODE_RATE
+
+    def __init__(self, position: float = 0.0):
+        self.position = position
+        self._started: Optional[float] = None
+        self.dots = dot_mask(self.DOTS)
+
+
+    @property
+    def running(self) -> bool:
+        return self._started is not None
+
+
+    def start(self, now: Optional[float] = None) -> None:
+        if self._started is None:
+            self._started = time.perf_counter() if now is None else now
+
+
+    def stop(self, now: Optional[float] = None) -> None:
+        if self._started is not None:
+            self.position = self.elapsed(now)
+            self._started = None
+
+
+    def locate(self, position: float, now: Optional[float] = None) -> None:
+        self.position = position
+        if self._started is not None:
+            self._started = time.perf_counter() if now is None else now
+
+
+    def elapsed(self, now: Optional[float] = None) -> float:
+        if self._started is None:
+            return self.position
+        return self.position + (time.perf_counter() if now is None else now) - self._started
+
+
+    @abstractmethod
+    def digits(self, now: Optional[float] = None) -> str:
+        """
+        Exactly `N_TIMECODE_DIGITS` characters for the display
+        """
+
+
+class SMPTEClock(TimecodeClock):
+    """
+    Hours / minutes / seconds / frames: ` HH MM SS  FF` -> `HHHMMSSFFF` on the display
+
+    Args:
+        fps: frames per second (non-drop)
+        position: start position in seconds
+    """
+    DOTS = (2, 4, 6)
+
+    def __init__(self, fps: float = 30.0, position: float = 0.0):
+        super().__init__(position)
+        self.fps = fps
+        self.frame_rate = fps
+
+
+    def digits(self, now: Optional[float] = None) -> str:
+        total = int(self.elapsed(now) * self.fps + 1e-9)
+        frames_per_second = round(self.fps)
+        seconds, frames = divmod(total, frames_per_second)
+        minutes, seconds = divmod(seconds, 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours % 1000:3d}{minutes:02d}{seconds:02d}{frames:3d}"
+
+
+class BBTClock(TimecodeClock):
+    """
+    Bars / beats / subdivisions / ticks, 1-based like a DAW: `BBBbbSSTTT` on the display
+
+    Args:
+        bpm: tempo
+        beats_per_bar: time signature numerator
+        subdivisions: subdivisions per beat (4 for sixteenths in 4/4)
+        ticks: ticks per subdivision (at most 1000 to fit 3 digits)
+        position: start position in seconds
+    """
+    DOTS = (2, 4, 6)
+
+    def __init__(
+        self,
+        bpm: float = 120.0,
+        beats_per_bar: int = 4,
+        subdivisions: int = 4,
+        ticks: int = 240,
+        position: float = 0.0
+    ):
+        super().__init__(position)
+        self.bpm = bpm
+        self.beats_per_bar = beats_per_bar
+        self.subdivisions = subdivisions
+        self.ticks = ticks
+
+
+    def digits(self, now: Optional[float] = None) -> str:
+        total = int(self.elapsed(now) * self.bpm / 60.0 * self.subdivisions * self.ticks)
+        subdivisions, ticks = divmod(total, self.ticks)
+        beats, subdivision = divmod(subdivisions, self.subdivisions)
+        bars, beat = divmod(beats, self.beats_per_bar)
+        return f"{(bars + 1) % 1000:3d}{beat + 1:2d}{subdivision + 1:2d}{ticks:3d}"
+
+
+class WallClock(TimecodeClock):
+    """
+    Time of day: `  HHMMSScc` (hundredths) on the display, always running
+
+    Reads the system clock on every frame, so `digits()` ignores `now`:
+    the other clocks' timestamps come from `time.perf_counter()`, which isn't a time of day
+    """
+    DOTS = (3, 5, 7)
+
+    def __init__(self):
+        super().__init__()
+        self.start()
+
+
+    def digits(self, now: Optional[float] = None) -> str:
+        wall = time.time()
+        local = time.localtime(wall)
+        hundredths = int(wall * 100) % 100
+        return f"  {local.tm_hour:02d}{local.tm_min:02d}{local.tm_sec:02d}{hundredths:02d}"
+
+
+class TimecodeDriver():
+    """
+    Runs a clock source onto a `TimecodeDisplay` at a fixed frame rate, sending only changed digits
+
+    Args:
+        display: shadow to diff against
+        clock: position source
+        frame_rate: display updates per second, defaults to the clock's own rate
+    """
+
+    def __init__(self, display: TimecodeDisplay, clock: TimecodeClock, frame_rate: Optional[float] = None):
+        self.display = display
+        self.clock = clock
+        self.frame_rate = frame_rate or clock.frame_rate
+        self.frames = 0
+
+
+    def frame(self, now: Optional[float] = None) -> list[UpdateTimecodeChar]:
+        codes = segment_codes(self.clock.digits(now))
+        if self.clock.dots:
+            codes = (int.from_bytes(codes, "big") | self.clock.dots).to_bytes(N_TIMECODE_DIGITS, "big")
+        self.frames += 1
+        # The timecode digits sit to the right of the 2 assignment characters
+        return self.display.write_codes(N_TIMECODE_CELLS - N_TIMECODE_DIGITS, codes)
+
+
+    async def run(self, send: Callable[[UpdateTimecodeChar], None]) -> None:
+        """
+        Drive `frame()` on a fixed clock
+
+        Args:
+            send (Callable[[UpdateTimecodeChar], None]): called with every message to transmit
+        """
+        period = 1.0 / self.frame_rate
+        next_frame = time.perf_counter()
+        while True:
+            for message in self.frame(next_frame):
+                send(message)
+            next_frame += period
+            await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
@@ -0,0 +1,303 @@
+import asyncio
+import time
+from typing import Any, Hashable, Optional
+
+from ..messages.sysex import *
+from ..messages.fader import FaderMoveEvent
+from ..messages.button import SetLED
+from ..messages.vpot import SetVPotLED
+from ..messages.meter import UpdateMeter
+from .coalescing_queue import CoalescingQueue
+
+# Lanes, in strict priority order
+LANE_CONNECTION = 0
+LANE_FADER = 1
+LANE_LED = 2
+LANE_METER = 3
+LANE_DISPLAY = 4
+LANE_NAMES = ("connection", "fader", "led", "meter", "display")
+
+LANE_BY_TYPE = {
+    DeviceQuery: LANE_CONNECTION,
+    HostConnectionReply: LANE_CONNECTION,
+    ConfigTransportButtonClick: LANE_CONNECTION,
+    ConfigLCDBacklightSaver: LANE_CONNECTION,
+    ConfigTouchlessFaders: LANE_CONNECTION,
+    ConfigFaderTouchSensitivity: LANE_CONNECTION,
+    FirmwareVersionRequest: LANE_CONNECTION,
+    ConfigChannelMeterMode: LANE_CONNECTION,
+    ConfigLCDMeterMode: LANE_CONNECTION,
+    Reset: LANE_CONNECTION,
+    FaderMoveEvent: LANE_FADER,
+    SetLED: LANE_LED,
+    SetVPotLED: LANE_LED,
+    UpdateMeter: LANE_METER,
+    UpdateLCD: LANE_DISPLAY,
+    UpdateLCDColour: LANE_DISPLAY,
+    UpdateTimecodeChar: LANE_DISPLAY,
+}
+
+SCHEDULE_STRICT = "strict"
+SCHEDULE_WEIGHTED = "weighted"
+DEFAULT_LANE_WEIGHTS = (8, 4, 4, 2, 1)
+
+# DIN MIDI is 31250 baud with 10 bits on the wire per byte (start + 8 data + stop)
+MIDI_DIN_BYTES_PER_SECOND = 31250 / 10
+# USB MIDI is effectively unlimited at the rates a control surface can use
+MIDI_USB_BYTES_PER_SECOND = None
+
+
+class TokenBucket():
+    """
+    Bytes-per-second budget for the outbound link
+
+    `acquire()` sleeps until enough budget has built up, then spends it.
+    A single message larger than `burst` is allowed through by going into debt.
+    """
+
+    def __init__(self, bytes_per_second: Optional[float], burst: int = 128):
+        self.bytes_per_second = bytes_per_second
+        self.burst = burst
+        self.tokens = float(burst)
+        self._last = time.perf_counter()
+        self.throttled_time = 0.0
+
+
+    def _refill(self) -> None:
+        now = time.perf_counter()
+        self.tokens = min(self.burst, self.tokens + (now - self._last) * self.bytes_per_second)
+        self._last = now
+
+
+    async def acquire(self, n_bytes: int) -> None:
+        """
+        Spend `n_bytes` of budget, waiting for it to become available
+
+        Args:
+            n_bytes (int): size of the message about to be sent
+        """
+        if self.bytes_per_second is None:
+            return
+
+        self._refill()
+        if self.tokens < min(n_bytes, self.burst):
+            delay = (min(n_bytes, self.burst) - self.tokens) / self.bytes_per_second
+            self.throttled_time += delay
+            await asyncio.sleep(delay)
+            self._refill()
+        self.tokens -= n_bytes
+
+
+class TxScheduler():
+    """
+    Outbound queue split into priority lanes: connection/handshake, fader motors,
+    LEDs & rings, meters, LCD & timecode.
+
+    Each lane is a `CoalescingQueue`, so keyed state updates stay latest-value-wins.
+    `get()` picks the next message either by strict priority (default) or smooth weighted
+    round robin, and `throttle()` spends link budget through a `TokenBucket`, so a saturated
+    display can't delay a handshake reply or a fader move by more than one message.
+
+    Drop-in for the `asyncio.Queue` methods `MCUDevice` uses.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        policy: str = SCHEDULE_STRICT,
+        weights: tuple[int, ...] = DEFAULT_LANE_WEIGHTS,
+        bytes_per_second: Optional[float] = MIDI_USB_BYTES_PER_SECOND,
+        burst: int = 128
+    ):
+        if policy not in (SCHEDULE_STRICT, SCHEDULE_WEIGHTED):
+            raise ValueError(f"Unknown scheduling policy: {policy}")
+        if len(weights) != len(LANE_NAMES):
+            raise ValueError(f"Need {len(LANE_NAMES)} lane weights")
+
+        self.policy = policy
+        self.weights = weights
+        self.lanes = [CoalescingQueue(maxsize=maxsize) for _ in LANE_NAMES]
+        self.bucket = TokenBucket(bytes_per_second, burst=burst)
+
+        self._not_empty = asyncio.Event()
+        self._all_done = asyncio.Event()
+        self._all_done.set()
+        self._unfinished = 0
+        self._credit = [0] * len(LANE_NAMES)
+
+        self._sent = [0] * len(LANE_NAMES)
+        self._wait_total = [0.0] * len(LANE_NAMES)
+        self._wait_max = [0.0] * len(LANE_NAMES)
+
+
+    def qsize(self) -> int:
+        return sum(lane.qsize() for lane in self.lanes)
+
+
+    def empty(self) -> bool:
+        return not any(lane.qsize() for lane in self.lanes)
+
+
+    def full(self) -> bool:
+        return any(lane.full() for lane in self.lanes)
+
+
+    def put_nowait(self, item: Any, key: Optional[Hashable] = None, lane: Optional[int] = None) -> None:
+        """
+        Queue a message on its lane
+
+        Args:
+            item (Any): message to send
+            key (Optional[Hashable], optional): coalescing key. Defaults to None (never coalesced).
+            lane (Optional[int], optional): lane override. Defaults to None (chosen by message type).
+
+        Raises:
+            asyncio.QueueFull: no free slot on the lane
+        """
+        if lane is None:
+            lane = LANE_BY_TYPE.get(type(item), LANE_DISPLAY)
+        self._queued(self.lanes[lane].put_nowait(self._stamp(lane, item, key), key=key))
+
+
+    async def put(self, item: Any, key: Optional[Hashable] = None, lane: Optional[int] = None) -> None:
+        """
+        Queue a message on its lane, waiting for a free slot if needed
+
+        Args:
+            item (Any): message to send
+            key (Optional[Hashable], optional): coalescing key. Defaults to None (never coalesced).
+            lane (Optional[int], optional): lane override. Defaults to None (chosen by message type).
+        """
+        if lane is None:
+            lane = LANE_BY_TYPE.get(type(item), LANE_DISPLAY)
+        self._queued(await self.lanes[lane].put(self._stamp(lane, item, key), key=key))
+
+
+    def _stamp(self, lane: int, item: Any, key: Optional[Hashable]) -> tuple[float, Any]:
+        # A replacement keeps the enqueue time of the value it replaces,
+        # so waits are measured from when the slot was first queued
+        pending = self.lanes[lane].pending(key) if key is not None else None
+        return (pending[0] if pending is not None else time.perf_counter(), item)
+
+
+    def _queued(self, new_slot: bool) -> None:
+        if new_slot:
+            self._unfinished += 1
+            self._all_done.clear()
+        self._not_empty.set()
+
+
+    def _select_lane(self) -> int:
+        if self.policy == SCHEDULE_STRICT:
+            for index, lane in enumerate(self.lanes):
+                if lane.qsize():
+                    return index
+
+        # Smooth weighted round robin: every backlogged lane earns its weight,
+        # the richest lane goes next and pays back the total
+        best, total = None, 0
+        for index, lane in enumerate(self.lanes):
+            if not lane.qsize():
+                continue
+            self._credit[index] += self.weights[index]
+            total += self.weights[index]
+            if best is None or self._credit[index] > self._credit[best]:
+                best = index
+        self._credit[best] -= total
+        return best
+
+
+    def get_nowait(self) -> Any:
+        """
+        Take the next message according to the scheduling policy
+
+        Raises:
+            asyncio.QueueEmpty: nothing pending on any lane
+        """
+        if self.empty():
+            raise asyncio.QueueEmpty
+
+        index = self._select_lane()
+        lane = self.lanes[index]
+        enqueued_at, item = lane.get_nowait()
+        lane.task_done()
+
+        wait = time.perf_counter() - enqueued_at
+        self._sent[index] += 1
+        self._wait_total[index] += wait
+        self._wait_max[index] = max(self._wait_max[index], wait)
+
+        if self.empty():
+            self._not_empty.clear()
+        return item
+
+
+    async def get(self) -> Any:
+        while self.empty():
+            await self._not_empty.wait()
+        return self.get_nowait()
+
+
+    def mark(self) -> list[int]:
+        """
+        Slots queued so far on each lane, pass to `sent_through()`
+        """
+        return [lane.queued for lane in self.lanes]
+
+
+    def sent_through(self, mark: list[int]) -> bool:
+        """
+        Lanes are FIFO by slot, so once a lane has handed out as many slots as `mark` counted,
+        everything queued on it before the mark has been taken. A coalesced replacement keeps its slot.
+
+        Args:
+            mark (list[int]): from `mark()`, 0 for lanes that don't matter
+
+        Returns:
+            bool: True once every lane has caught up with the mark
+        """
+        return all(sent >= queued for sent, queued in zip(self._sent, mark))
+
+
+    async def throttle(self, n_bytes: int) -> None:
+        """
+        Wait until the link budget allows `n_bytes` to be sent
+
+        Args:
+            n_bytes (int): size of the message about to be sent
+        """
+        await self.bucket.acquire(n_bytes)
+
+
+    def task_done(self) -> None:
+        if self._unfinished <= 0:
+            raise ValueError("task_done() called too many times")
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._all_done.set()
+
+
+    async def join(self) -> None:
+        await self._all_done.wait()
+
+
+    def stats(self) -> dict:
+        """
+        Per-lane queue depth, throughput and wait times (enqueue to dequeue, in seconds)
+        """
+        lanes = {}
+        for index, name in enumerate(LANE_NAMES):
+            sent = self._sent[index]
+            lanes[name] = {
+                "depth": self.lanes[index].qsize(),
+                "sent": sent,
+                "collapsed": self.lanes[index].collapsed,
+                "mean_wait": self._wait_total[index] / sent if sent else 0.0,
+                "max_wait": self._wait_max[index],
+            }
+        return {
+            "policy": self.policy,
+            "bytes_per_second": self.bucket.bytes_per_second,
+            "throttled_time": self.bucket.throttled_time,
+            "lanes": lanes,
+        }
@@ -0,0 +1,315 @@
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from ..messages.sysex import *
+from ..messages.button import FADER_TOUCH_NOTES
+from ..messages.hardware_mapping import NOTE_MAP
+from ..messages.vpot import VPOT_CC_BASE, SCROLL_WHEEL_CC
+from .event_bus import EVENT_BUTTON, EVENT_VPOT, EVENT_WHEEL, EVENT_FADER
+from .surface_model import MCUSurfaceModel, N_FADERS, N_STRIPS
+
+MIDIMessage = list[int]
+
+
+class VirtualMidiIn():
+    """
+    Stands in for `rtmidi.MidiIn`: whatever the virtual device sends arrives here for the host to read,
+    either through the input callback or by polling `get_message()`
+    """
+
+    def __init__(self):
+        self._pending: deque[tuple[MIDIMessage, float]] = deque()
+        self._callback: Callable = None
+        self._callback_data = None
+        self._last = time.perf_counter()
+        self.ignore_sysex = True
+
+
+    def set_callback(self, func: Callable, data=None) -> None:
+        self._callback = func
+        self._callback_data = data
+
+
+    def cancel_callback(self) -> None:
+        self._callback = None
+        self._callback_data = None
+
+
+    def ignore_types(self, sysex: bool = True, timing: bool = True, active_sense: bool = True) -> None:
+        self.ignore_sysex = sysex
+
+
+    def get_message(self) -> Optional[tuple[MIDIMessage, float]]:
+        return self._pending.popleft() if self._pending else None
+
+
+    def close_port(self) -> None:
+        self.cancel_callback()
+        self._pending.clear()
+
+
+    def deliver(self, message: MIDIMessage) -> None:
+        """
+        Device side: hand a message to the host, with rtmidi's delta time since the previous one
+        """
+        if self.ignore_sysex and message[0] == 0xF0:
+            return
+
+        now = time.perf_counter()
+        event = (message, now - self._last)
+        self._last = now
+
+        if self._callback is not None:
+            self._callback(event, self._callback_data)
+        else:
+            self._pending.append(event)
+
+
+class VirtualMidiOut():
+    """
+    Stands in for `rtmidi.MidiOut`: everything the host sends goes straight into the virtual device
+    """
+
+    def __init__(self, device: "VirtualMCU"):
+        self.device = device
+
+
+    def send_message(self, message: MIDIMessage) -> None:
+        self.device.receive(list(message))
+
+
+    def close_port(self) -> None:
+        pass
+
+
+class VirtualMCU():
+    """
+    In-process simulation of an MCU surface, for testing & benchmarking without hardware
+
+    Plug `midi_in` / `midi_out` into `MCUDevice` in place of the rtmidi ports:
+
+        surface = VirtualMCU()
+        controller = MCUDevice(surface.midi_in, surface.midi_out)
+
+    The simulation answers `DeviceQuery` pings with a `HostConnectionQuery` challenge, checks the
+    host's reply and confirms (or refuses) the connection. Motor faders follow the host unless touched,
+    and LCD / LED / ring / timecode state is mirrored in an `MCUSurfaceModel`.
+    Button, VPot, jog wheel and fader input can be generated by hand or at a fixed rate with `generate()`.
+    `unplug()` / `plug()` simulate losing the surface and getting it back blank.
+
+    Args:
+        serial_number: 7 character serial number used in the handshake
+        touchless: send fader moves without a touch, like touchless fader mode
+        seed: seed for the challenge codes & generated events
+    """
+
+    def __init__(self, serial_number: str = "VMCU001", touchless: bool = False, seed: Optional[int] = None):
+        if len(serial_number) != 7:
+            raise ValueError("Serial number must be 7 characters")
+
+        self.serial_number = serial_number
+        self.touchless = touchless
+        self.random = random.Random(seed)
+
+        self.midi_in = VirtualMidiIn()
+        self.midi_out = VirtualMidiOut(self)
+        self.surface = MCUSurfaceModel()
+
+        self.connected = False
+        # False while "unplugged": nothing gets through in either direction
+        self.online = True
+        self.challenge_code: list[int] = None
+        self.fader_positions = [0] * N_FADERS
+        self.fader_touched = [False] * N_FADERS
+
+        self.messages_received = 0
+        self.messages_sent = 0
+        self.pings = 0
+        self.handshakes = 0
+        self.handshake_failures = 0
+
+        # Hook for tests / benchmarks, called with every message the host sends
+        self.on_receive: Callable[[MIDIMessage], None] = None
+
+
+    # ===== Host -> Device ===== #
+
+    def receive(self, message: MIDIMessage) -> None:
+        """
+        Handle a message from the host
+        """
+        if not self.online:
+            return
+        self.messages_received += 1
+        self.surface.update(message)
+
+        if message[0] == 0xF0:
+            self._receive_sysex(message)
+        elif message[0] & 0xF0 == 0xE0:
+            index = message[0] & 0x0F
+            # The motor can't pull a fader out from under a finger
+            if index < N_FADERS and not self.fader_touched[index]:
+                self.fader_positions[index] = (message[2] & 0x7F) << 7 | (message[1] & 0x7F)
+
+        if self.on_receive is not None:
+            self.on_receive(message)
+
+
+    def _receive_sysex(self, message: MIDIMessage) -> None:
+        if len(message) < 7 or message[1:5] != MCU_HEADER:
+            return
+
+        command = message[5]
+        if command == DeviceQuery.command:
+            self.pings += 1
+            if self.challenge_code is None or not self.connected:
+                self.challenge_code = [self.random.randrange(0x80) for _ in range(4)]
+            self.send(
+                SOX + MCU_HEADER
+                + [HostConnectionQuery.command]
+                + [ord(x) for x in self.serial_number]
+                + self.challenge_code
+                + EOX
+            )
+
+        elif command == HostConnectionReply.command and self.challenge_code is not None:
+            expected = HostConnectionReply(
+                serial_number=self.serial_number, challenge_code=self.challenge_code
+            ).response_code
+            serial = [ord(x) for x in self.serial_number]
+
+            if message[6:13] == serial and message[13:17] == expected:
+                self.connected = True
+                self.handshakes += 1
+                self.send(SOX + MCU_HEADER + [HostConnectionConfirmation.command] + serial + EOX)
+            else:
+                self.connected = False
+                self.handshake_failures += 1
+                self.send(SOX + MCU_HEADER + [HostConnectionError.command] + serial + EOX)
+
+
+    def unplug(self) -> None:
+        """
+        Simulate pulling the cable: the surface goes silent and forgets the connection
+        """
+        self.online = False
+        self.connected = False
+        self.challenge_code = None
+
+
+    def plug(self) -> None:
+        """
+        Reconnect the cable, the surface comes back blank and waits for the handshake
+        """
+        self.surface = MCUSurfaceModel()
+        self.fader_positions = [0] * N_FADERS
+        self.online = True
+
+
+    # ===== Device -> Host ===== #
+
+    def send(self, message: MIDIMessage) -> None:
+        if not self.online:
+            return
+        self.messages_sent += 1
+        self.midi_in.deliver(message)
+
+
+    def press(self, note: int) -> None:
+        self.send([0x90, note, 0x7F])
+
+
+    def release(self, note: int) -> None:
+        self.send([0x90, note, 0x00])
+
+
+    def click(self, note: int) -> None:
+        self.press(note)
+        self.release(note)
+
+
+    def turn_vpot(self, index: int, delta: int) -> None:
+        self.send([0xB0, VPOT_CC_BASE | index, delta if delta > 0 else (-delta) | 0x40])
+
+
+    def turn_wheel(self, delta: int) -> None:
+        self.send([0xB0, SCROLL_WHEEL_CC, delta if delta > 0 else (-delta) | 0x40])
+
+
+    def touch_fader(self, index: int) -> None:
+        self.fader_touched[index] = True
+        self.press(FADER_TOUCH_NOTES.start + index)
+
+
+    def release_fader(self, index: int) -> None:
+        self.fader_touched[index] = False
+        self.release(FADER_TOUCH_NOTES.start + index)
+
+
+    def move_fader(self, index: int, position: int) -> None:
+        """
+        Move a fader by hand. Nothing is sent unless it is touched, or the device is touchless
+        """
+        self.fader_positions[index] = position & 0x3FFF
+        if self.fader_touched[index] or self.touchless:
+            self.send([0xE0 | index, position & 0x7F, (position >> 7) & 0x7F])
+
+
+    # ===== Load generation ===== #
+
+    def random_event(self, kinds: tuple[str, ...] = (EVENT_BUTTON, EVENT_VPOT, EVENT_WHEEL, EVENT_FADER)) -> None:
+        """
+        Generate one random piece of surface input
+        """
+        kind = self.random.choice(kinds)
+        if kind == EVENT_BUTTON:
+            note = self.random.choice([note for note in NOTE_MAP if note not in FADER_TOUCH_NOTES])
+            self.click(note)
+        elif kind == EVENT_VPOT:
+            self.turn_vpot(self.random.randrange(N_STRIPS), self.random.choice((-3, -1, 1, 3)))
+        elif kind == EVENT_WHEEL:
+            self.turn_wheel(self.random.choice((-1, 1)))
+        elif kind == EVENT_FADER:
+            index = self.random.randrange(N_FADERS)
+            if not self.fader_touched[index]:
+                self.touch_fader(index)
+            self.move_fader(index, self.random.randrange(0x4000))
+
+
+    async def generate(
+        self,
+        rate: float,
+        kinds: tuple[str, ...] = (EVENT_BUTTON, EVENT_VPOT, EVENT_WHEEL, EVENT_FADER),
+        duration: Optional[float] = None
+    ) -> int:
+        """
+        Generate random surface input at a fixed rate
+
+        Args:
+            rate (float): events per second
+            kinds (tuple[str, ...], optional): which kinds of input to generate. Defaults to all.
+            duration (Optional[float], optional): seconds to run for. Defaults to forever.
+
+        Returns:
+            int: number of events generated
+        """
+        period = 1.0 / rate
+        start = time.perf_counter()
+        next_event = start
+        generated = 0
+
+        while duration is None or next_event - start < duration:
+            # Catch up in a burst if the loop fell behind, rather than drifting, but not past the end
+            while next_event <= time.perf_counter() and (duration is None or next_event - start < duration):
+                self.random_event(kinds)
+                generated += 1
+                next_event += period
+            await asyncio.sleep(max(0.0, next_event - time.perf_counter()))
+
+        for index, touched in enumerate(self.fader_touched):
+            if touched:
+                self.release_fader(index)
+        return generated
@@ -1,22 +1,46 @@
 import asyncio
+import logging
+import time
+from collections import deque
 
 from rtmidi.midiutil import open_midiinput, open_midioutput
 from rtmidi import MidiIn, MidiOut
-from typing import Callable, Awaitable, Union
+from typing import Callable, Awaitable, Optional, Union
 
 from .messages.sysex import *
 from .messages.fader import *
 from .messages.meter import *
 from .messages.button import *
 from .messages.vpot import *
-from .helpers.managed_fader import ManagedFader
+from .messages.meter_ballistics import MeterBallistics
+from .messages.meter_audio import block_meter_levels, METER_MODE_PEAK
+from .helpers.managed_fader import *
+from .helpers.managed_vpot import *
+from .helpers.scroll_wheel import ScrollWheel, WheelScrub, DEFAULT_SCRUB_RATE, DEFAULT_WHEEL_SMOOTHING, WHEEL_ACCEL_LINEAR
+from .helpers.connection import *
+from .helpers.fader_throttle import FaderThrottle, DEFAULT_FADER_RATE
+from .helpers.dispatch_table import DispatchTable
+from .helpers.lcd_framebuffer import LCDFramebuffer
+from .helpers.tx_scheduler import *
+from .helpers.surface_model import MCUSurfaceModel
+from .helpers.timecode import *
+from .helpers.event_bus import *
+from .helpers.event_stream import EventLog, EventStream, DEFAULT_MAX_BATCH, DEFAULT_MAX_LATENCY
+from .helpers.session_log import SessionRecorder, SessionLog, SessionReplayer, DIRECTION_RX, DIRECTION_TX
 
 
-PING_INTERVAL = 5 # seconds
 RX_INTERVAL = 0.001
+DISPLAY_FLUSH_INTERVAL = 0.01 # seconds, display writes within this window are merged
+
+# Inbound MIDI is either pushed to us by the rtmidi input callback (default),
+# or polled every `RX_INTERVAL` as a fallback for backends without callback support
+RX_MODE_CALLBACK = "callback"
+RX_MODE_POLL = "poll"
 
 N_FADERS = 9
 
+logger = logging.getLogger(__name__)
+
 
 Callback_T = Union[Callable, Awaitable]
 
@@ -27,68 +51,228 @@ async def call_or_await(func: Callback_T, *args, **kwargs) -> None:
         func(*args, **kwargs)
 
 class MCUDevice:
-    def __init__(self, input_port: Union[str, MidiIn], output_port: Union[str, MidiOut]):
-        self.tx_queue = asyncio.Queue(maxsize=1024)
+    def __init__(
+        self,
+        input_port: Union[str, MidiIn],
+        output_port: Union[str, MidiOut],
+        rx_mode: str = RX_MODE_CALLBACK,
+        tx_policy: str = SCHEDULE_STRICT,
+        tx_bytes_per_second: float = MIDI_USB_BYTES_PER_SECOND,
+        require_connection: bool = True,
+        keepalive_interval: float = KEEPALIVE_INTERVAL
+    ):
+        if rx_mode not in (RX_MODE_CALLBACK, RX_MODE_POLL):
+            raise ValueError(f"Unknown rx_mode: {rx_mode}")
+
+        # Outbound messages are split into priority lanes & throttled to the link's bandwidth
+        # State updates (faders, LEDs, rings) are keyed, so only the latest pending value is sent
+        self.tx_queue = TxScheduler(
+            maxsize=1024, policy=tx_policy, bytes_per_second=tx_bytes_per_second
+        )
         self.response_queue = asyncio.Queue(maxsize=1024)
         self.midi_in, _ = open_midiinput(input_port) if type(input_port) is str else (input_port, None)
         self.midi_out, _ = open_midioutput(output_port) if type(output_port) is str else (output_port, None)
-        self.connected_status = False
-        self.pending_pings = 0
+        # rtmidi drops SysEx by default, but the connection handshake depends on it
+        self.midi_in.ignore_types(sysex=False, timing=True, active_sense=True)
+
+        # Handshake state machine, see `_connect_request_producer()`
+        # An idle surface is pinged after `keepalive_interval` seconds of silence, ~57 bytes there & back
+        self.connection = ConnectionMonitor(keepalive_interval=keepalive_interval)
+        # Hold back everything but connection traffic until the surface has completed the handshake
+        self.require_connection = require_connection
+        self.tx_suppressed = 0
+        self._suppressing = False # warned about holding back output since the last connect
+
+        self.resync_count = 0
+        self.last_resync_time: float = None # seconds from confirmation to the last resync message sent
+        self._resync_started: float = None
+        self._resync_mark: list[int] = None # see `TxScheduler.mark()`
+
+        self.rx_mode = rx_mode
+        self.rx_buffer: deque[list[int]] = deque()
+        self._rx_ready = asyncio.Event()
+        self._rx_wakeup_pending = False
+        self._loop: asyncio.AbstractEventLoop = None
+
+        self.dispatch_table = self._build_dispatch_table()
+        self.rx_decode_errors = 0
+        self.rx_handler_errors = 0
+        self.last_rx_error: Exception = None
 
         self.touchless_faders = False
 
+        self.fader_updates = FaderUpdateChannel()
+        # Optional rate limit on raw fader events, see `enable_fader_throttle()`
+        self.fader_throttle: FaderThrottle = None
         self.faders = [
-            ManagedFader(index=i)
+            ManagedFader(index=i, channel=self.fader_updates)
             for i in range(N_FADERS)
         ]
 
+        self.vpot_updates = VPotUpdateChannel()
+        self.vpots = [
+            ManagedVPot(index=i, channel=self.vpot_updates)
+            for i in range(N_VPOTS)
+        ]
+
+        # Mirror of everything sent to / received from the surface
+        self.surface = MCUSurfaceModel()
+
+        # Optional capture of all traffic in both directions, see `start_recording()`
+        self.recorder: SessionRecorder = None
+
+        self.lcd = LCDFramebuffer()
+        self._display_dirty = asyncio.Event()
         self.lcd_colours = [LCD_WHITE] * 8
+        self._sent_lcd_colours: list[int] = None # unknown until the first flush
+        self.display_flush_errors = 0
+        self.last_display_error: Exception = None
+        self.timecode = TimecodeDisplay(self.surface.timecode)
+        self.timecode_driver: TimecodeDriver = None
+        self._timecode_task: asyncio.Task = None
+        self.meter_encoder = MeterFrameEncoder()
+        self.meter_ballistics: MeterBallistics = None
+        self._meter_task: asyncio.Task = None
+        # Optional velocity & acceleration engine for the jog wheel, see `enable_scroll_wheel()`
+        self.scroll_wheel: ScrollWheel = None
+        self._scroll_wheel_task: asyncio.Task = None
 
         self.on_vpot_event: Callback_T = None
+        self.on_managed_vpot_event: Callback_T = None
         self.on_raw_fader_event: Callback_T = None
         self.on_managed_fader_event: Callback_T = None
         self.on_button_event: Callback_T = None
         self.on_scrollwheel_event: Callback_T = None
+        self.on_scrub_event: Callback_T = None
+        self.on_meter_event: Callback_T = None
+        self.on_connection_event: Callback_T = None
+
+        # Any number of subscribers per control, alongside the single `on_*` callbacks above
+        self.event_bus = EventBus()
+        # Shared by every `events()` stream
+        self.event_log = EventLog()
 
 
     async def _connect_request_producer(self) -> None:
         """
-        If we are not currently ping-pong'ing, send a DeviceQuery
-        This should result in the device sending a HostConnectionQuery
-        The HostConnectionQuery will then start the ping transaction
+        Send DeviceQuery pings through the `ConnectionMonitor`
+        Each should result in the device sending a HostConnectionQuery, which starts the handshake
+        Pings retry quickly with backoff until the handshake completes, then only keep the connection alive
         """
-        while True:
-            await self.tx_queue.put(DeviceQuery())
-            await asyncio.sleep(PING_INTERVAL)
+        await self.connection.run(self._send_ping, self._connection_changed)
+
+
+    def _send_ping(self) -> None:
+        self.tx_queue.put_nowait(DeviceQuery(), key="ping")
+
+
+    async def _connection_changed(self, change: ConnectionStateChange) -> None:
+        if change.state == STATE_CONNECTED:
+            if self._suppressing:
+                logger.info("Surface connected, restoring output held back while it was away")
+                self._suppressing = False
+            # The surface may have come back blank, or missed what was held back while it was away
+            self.resync_surface()
+        if self.on_connection_event:
+            await call_or_await(self.on_connection_event, change)
+        await self._publish(EVENT_CONNECTION, 0, change)
+
+
+    @property
+    def connected_status(self) -> bool:
+        return self.connection.connected
+
+
+    @property
+    def pending_pings(self) -> int:
+        return self.connection.pending_pings
     
 
     async def _fader_update_producer(self) -> None:
         """
-        Monitor each of the `ManagedFader` objects
-        when one has its `update_trigger` set, queue up a `FaderMoveEvent` to update the surface
+        Monitor the `ManagedFader` objects through their shared `FaderUpdateChannel`
+        when any have changed, queue up a `FaderMoveEvent` for each to update the surface
         This prevents the surface from pulling the fader position back down after releasing
         """
         while True:
-            # Wait for any event to be set
-            await asyncio.wait(
-                [
-                    asyncio.create_task(fader.update_trigger.wait()) for fader in self.faders
-                ],
-                return_when=asyncio.FIRST_COMPLETED
-            )
-            
-            # Send the response for the correct one(s)
-            for fader in self.faders:
-                if fader.update_trigger.is_set():
-                    await self.tx_queue.put(
-                        FaderMoveEvent(index=fader.index, position=fader.latched_value)
+            dirty = await self.fader_updates.wait()
+
+            for index in sorted(dirty):
+                fader = self.faders[index]
+                fader.update_trigger.clear()
+                await self.tx_queue.put(
+                    FaderMoveEvent(index=fader.index, position=fader.latched_value),
+                    key=("fader", fader.index)
+                )
+                if self.on_managed_fader_event:
+                    await call_or_await(
+                        self.on_managed_fader_event, fader
                     )
-                    fader.update_trigger.clear()
-                    if self.on_managed_fader_event:
-                        await call_or_await(
-                            self.on_managed_fader_event, fader
+                await self._publish(EVENT_MANAGED_FADER, fader.index, fader)
+
+
+    async def _fader_ramp_producer(self) -> None:
+        """
+        Shared motor clock for fader ramps: while any ramp is running, step every fader
+        at `RAMP_FRAME_RATE` and queue a move only for faders whose position changed
+        Moves are keyed like `set_fader()`, so a frame replaces any older move still waiting
+        """
+        period = 1.0 / RAMP_FRAME_RATE
+        while True:
+            await self.fader_updates.ramps.wait()
+
+            next_frame = time.perf_counter()
+            while any(fader.ramp is not None for fader in self.faders):
+                for fader in self.faders:
+                    if fader.step(next_frame):
+                        self.tx_queue.put_nowait(
+                            FaderMoveEvent(index=fader.index, position=fader.latched_value),
+                            key=("fader", fader.index)
                         )
-    
+                next_frame += period
+                await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
+
+            self.fader_updates.ramps.clear()
+
+
+    async def _vpot_update_producer(self) -> None:
+        """
+        Once per `VPOT_TICK_INTERVAL`, fold the encoder deltas accumulated by each turned `ManagedVPot`
+        into its value, then update the ring & call back only for pots whose value actually changed
+        """
+        while True:
+            dirty = await self.vpot_updates.wait()
+
+            for index in sorted(dirty):
+                vpot = self.vpots[index]
+                if not vpot.apply():
+                    continue
+                self._queue_vpot_ring(vpot)
+                if self.on_managed_vpot_event:
+                    await call_or_await(
+                        self.on_managed_vpot_event, vpot
+                    )
+                await self._publish(EVENT_MANAGED_VPOT, vpot.index, vpot)
+
+            await asyncio.sleep(VPOT_TICK_INTERVAL)
+
+
+    async def _display_flush_producer(self) -> None:
+        """
+        Wait for display writes, flush only what changed, then hold off for
+        `DISPLAY_FLUSH_INTERVAL` so rapid rewrites are merged into the next flush
+        """
+        while True:
+            await self._display_dirty.wait()
+            self._display_dirty.clear()
+            try:
+                self.flush_display()
+            except Exception as e:
+                # One bad write mustn't stop every later display update, the error is kept for inspection
+                self.display_flush_errors += 1
+                self.last_display_error = e
+            await asyncio.sleep(DISPLAY_FLUSH_INTERVAL)
+
 
     async def _tx_consumer(self) -> None:
         """
@@ -97,17 +281,45 @@ class MCUDevice:
         while True:
             message = await self.tx_queue.get()
 
-            pkt = message.encode()
+            # Raw lists are already on the wire format, see `update_meters()`
+            pkt = message if type(message) is list else message.encode()
+
+            if self.require_connection and not self.connection.connected \
+                    and LANE_BY_TYPE.get(type(message)) != LANE_CONNECTION:
+                # Nobody listening: track the state so `resync_surface()` restores it on connect, but don't send
+                self.surface.update(pkt)
+                self.tx_suppressed += 1
+                if not self._suppressing:
+                    self._suppressing = True
+                    logger.warning(
+                        "Surface hasn't completed the MCU handshake (%s), holding back output until it does; "
+                        "pass require_connection=False to send regardless",
+                        self.connection.state
+                    )
+                self.tx_queue.task_done()
+                continue
+
+            # NoteOn goes out twice, see below
+            await self.tx_queue.throttle(len(pkt) * 2 if pkt[0] == 0x90 else len(pkt))
             self.midi_out.send_message(pkt)
+            self.surface.update(pkt)
+            if self.recorder is not None:
+                self.recorder.record(DIRECTION_TX, pkt)
 
             # Not sure I like this behaviour being here...
             # But if we are sending a NoteOn <technically> it should be followed by an immediate NoteOff.
             if pkt[0] == 0x90:
                 pkt[0] = 0x80
                 self.midi_out.send_message(pkt)
+                if self.recorder is not None:
+                    self.recorder.record(DIRECTION_TX, pkt)
 
             self.tx_queue.task_done()
 
+            if self._resync_mark is not None and self.tx_queue.sent_through(self._resync_mark):
+                self.last_resync_time = time.perf_counter() - self._resync_started
+                self._resync_mark = None
+
 
     async def _response_consumer(self) -> None:
         """
@@ -115,83 +327,283 @@ class MCUDevice:
         """
         while True:
             message = await self.response_queue.get()
-            match type(message):
-                case HostConnectionQuery:
-                    await self.tx_queue.put(
-                        HostConnectionReply(
-                            serial_number=message.serial_number,
-                            challenge_code=message.challenge_code
-                        )
+            if isinstance(message, HostConnectionQuery):
+                await self.tx_queue.put(
+                    HostConnectionReply(
+                        serial_number=message.serial_number,
+                        challenge_code=message.challenge_code
                     )
-            
-            # ...
-            await asyncio.sleep(RX_INTERVAL)
+                )
     
 
-    async def _rx_handler(self):
+    def _rx_callback(self, event: tuple[list[int], float], data=None) -> None:
         """
-        Read from the MIDI buffer, classify & pass off to the correct handler
+        rtmidi input callback - this runs on the rtmidi thread, not the event loop!
+        Buffer the message and wake the event loop, unless a wakeup is already on its way
+
+        Args:
+            event (tuple[list[int], float]): raw MIDI & delta time from rtmidi
+            data: unused user data
+        """
+        self.rx_buffer.append(event[0])
+        if self._rx_wakeup_pending:
+            return
+
+        self._rx_wakeup_pending = True
+        try:
+            self._loop.call_soon_threadsafe(self._rx_ready.set)
+        except RuntimeError:
+            # Loop has been closed underneath us, nothing left to wake
+            pass
+
+
+    async def _rx_handler(self) -> None:
+        """
+        Read from the MIDI input, classify & pass off to the correct handler
+        """
+        if self.rx_mode == RX_MODE_CALLBACK:
+            await self._rx_callback_consumer()
+        else:
+            await self._rx_poll_consumer()
+
+
+    async def _rx_callback_consumer(self) -> None:
+        """
+        Sleep until the rtmidi callback signals new data, then drain everything pending
+        """
+        while True:
+            await self._rx_ready.wait()
+            # Re-arm before draining - anything arriving from here on either gets
+            # picked up by this pass, or schedules another wakeup
+            self._rx_ready.clear()
+            self._rx_wakeup_pending = False
+
+            while self.rx_buffer:
+                await self._handle_message(self.rx_buffer.popleft())
+
+
+    async def _rx_poll_consumer(self) -> None:
+        """
+        Fallback: wake every `RX_INTERVAL` and drain everything pending from the port
         """
         while True:
             await asyncio.sleep(RX_INTERVAL)
-            message = self.midi_in.get_message()
-            if message:
-                match message := message[0]:
-                    case 0xF0:
-                        self._receive_sysex(message)
-                        continue
-
-                    case _ if message[0] & 0xF0 == 0xE0:
-                        event = FaderMoveEvent.from_midi(message)
-                        self.faders[event.index].update(event)
-                        if self.on_raw_fader_event: 
-                            await call_or_await(
-                                self.on_raw_fader_event, event
-                            )
-                        continue
-
-                    case _ if message[0] & 0xF0 == 0x90:
-                        event = ButtonPressEvent.from_midi(message)
-                        if event.index in range(104, 113):
-                            self.faders[event.index - 104].touch(event)
-                        if self.on_button_event:
-                            await call_or_await(
-                                self.on_button_event, ButtonPressEvent.from_midi(message)
-                            )
-                        continue
-
-                    case _ if message[0] & 0xF0 == 0xB0:
-                        if message[1] & 0x0F == 12 and self.on_scrollwheel_event:
-                            await call_or_await(
-                                self.on_scrollwheel_event,
-                                    ScrollWheelMoveEvent.from_midi(message)
-                            )
-                        elif self.on_vpot_event:
-                            await call_or_await(
-                                self.on_vpot_event, VPotMoveEvent.from_midi(message)
-                            )
-                        continue
+            while message := self.midi_in.get_message():
+                await self._handle_message(message[0])
 
 
-    # ===== #
+    async def _handle_message(self, message: list[int]) -> None:
+        """
+        Record a single raw MIDI message from the surface, mirror it in the surface model,
+        then decode & dispatch it
 
-    def _receive_sysex(self, message: list[int]) -> None:
+        Args:
+            message (list[int]): incoming raw MIDI
         """
-        Rx handler for sysex messages (protocol connection events)
+        if self.recorder is not None:
+            self.recorder.record(DIRECTION_RX, message)
+        self.connection.activity()
+        try:
+            self.surface.update(message, outbound=False)
+        except IndexError:
+            # Empty message, nothing to decode either
+            self.rx_decode_errors += 1
+            return
+        await self._dispatch(message)
+
+
+    async def _replay_message(self, message: list[int]) -> None:
+        """
+        Replayed input is decoded & dispatched like the real thing, but isn't recorded, doesn't count
+        as the surface being alive, and skips SysEx: that's all handshake traffic, which would
+        otherwise answer or change the state of the live connection
+
+        Args:
+            message (list[int]): raw MIDI from a session log
+        """
+        if message and message[0] == 0xF0:
+            return
+        await self._dispatch(message)
+
+
+    async def _dispatch(self, message: list[int]) -> None:
+        """
+        Look up a single raw MIDI message in the dispatch table, decode it once
+        and pass it off to the correct handler
 
         Args:
             message (list[int]): incoming raw MIDI
         """
+        try:
+            entry = self.dispatch_table.lookup(message)
+            if entry is None:
+                return
+
+            decoder, handler = entry
+            event = decoder(message)
+        except (ValueError, IndexError, TypeError, NotImplementedError):
+            # Malformed input is counted and dropped, it mustn't stop the receive loop
+            self.rx_decode_errors += 1
+            return
+
+        try:
+            await handler(event)
+        except Exception as e:
+            # Nor may a failing callback / subscriber, the error is kept for inspection
+            self.rx_handler_errors += 1
+            self.last_rx_error = e
+            logger.exception("Error handling %s from the surface", type(event).__name__)
+
+
+    # ===== #
+
+    def _build_dispatch_table(self) -> DispatchTable:
+        """
+        Bind the inbound message decoders to their handlers
+
+        Returns:
+            DispatchTable: table covering everything the surface sends us
+        """
+        table = DispatchTable()
+
+        for index in range(N_FADERS):
+            table.register_status(0xE0 | index, FaderMoveEvent.from_midi, self._handle_fader)
+
+        table.register_channel_message(0x90, ButtonPressEvent.from_midi, self._handle_button)
+        table.register_channel_message(0xD0, UpdateMeter.from_midi, self._handle_meter)
+
+        for index in range(8):
+            table.register_cc(VPOT_CC_BASE | index, VPotMoveEvent.from_midi, self._handle_vpot)
+        table.register_cc(SCROLL_WHEEL_CC, ScrollWheelMoveEvent.from_midi, self._handle_scrollwheel)
+
+        for command, message_class in MESSAGE_CLASSES.items():
+            table.register_sysex(command, message_class.from_midi, self._handle_sysex)
+
+        return table
+
+
+    async def _handle_fader(self, event: FaderMoveEvent) -> None:
+        self.faders[event.index].update(event)
+        if self.fader_throttle is not None:
+            await self.fader_throttle.offer(event)
+        else:
+            await self._deliver_fader(event)
+
+
+    async def _deliver_fader(self, event: FaderMoveEvent) -> None:
+        if self.on_raw_fader_event:
+            await call_or_await(self.on_raw_fader_event, event)
+        await self._publish(EVENT_FADER, event.index, event)
+
+
+    async def _handle_button(self, event: ButtonPressEvent) -> None:
+        if event.index in FADER_TOUCH_NOTES:
+            index = event.index - FADER_TOUCH_NOTES.start
+            self.faders[index].touch(event)
+            if not event.state and self.fader_throttle is not None:
+                await self.fader_throttle.release(index)
+        if self.on_button_event:
+            await call_or_await(self.on_button_event, event)
+        await self._publish(EVENT_BUTTON, event.index, event)
+
+
+    async def _handle_vpot(self, event: VPotMoveEvent) -> None:
+        self.vpots[event.index].accumulate(event)
+        if self.on_vpot_event:
+            await call_or_await(self.on_vpot_event, event)
+        await self._publish(EVENT_VPOT, event.index, event)
+
+
+    async def _handle_scrollwheel(self, event: ScrollWheelMoveEvent) -> None:
+        if self.scroll_wheel is not None:
+            self.scroll_wheel.feed(event)
+        if self.on_scrollwheel_event:
+            await call_or_await(self.on_scrollwheel_event, event)
+        await self._publish(EVENT_WHEEL, 0, event)
+
 
-        command_byte = message[5]
+    async def _deliver_scrub(self, scrub: WheelScrub) -> None:
+        if self.on_scrub_event:
+            await call_or_await(self.on_scrub_event, scrub)
+        await self._publish(EVENT_SCRUB, 0, scrub)
 
-        if command_byte not in MESSAGE_CLASSES:
+
+    async def _handle_meter(self, event: UpdateMeter) -> None:
+        if self.on_meter_event:
+            await call_or_await(self.on_meter_event, event)
+        await self._publish(EVENT_METER, event.index, event)
+
+
+    async def _publish(self, kind: str, index: int, event) -> None:
+        self.event_log.append(kind, event)
+        await self.event_bus.publish(kind, index, event)
+
+
+    async def _handle_sysex(self, message: MCUBase) -> None:
+        """
+        Rx handler for sysex messages (protocol connection events)
+
+        Args:
+            message (MCUBase): decoded SysEx message
+        """
+        if message.response_required:
+            self.response_queue.put_nowait(message)
+
+        if isinstance(message, HostConnectionConfirmation):
+            change = self.connection.confirmed()
+        elif isinstance(message, HostConnectionError):
+            change = self.connection.refused()
+        else:
             return
-        
-        message_obj = MESSAGE_CLASSES[command_byte].from_midi(message)
 
-        if message_obj.response_required:
-            self.response_queue.put(message_obj)
+        # Only a change of state matters, keepalive confirmations are routine
+        if change is not None:
+            await self._connection_changed(change)
+
+
+    def resync_surface(self) -> None:
+        """
+        Replay the current host-side state after the surface (re)connects blank,
+        in as few messages as possible: one LCD SysEx per line, one colour SysEx,
+        then only the LEDs / rings / timecode digits which aren't off, and the fader positions.
+
+        The time until the last of these is transmitted is kept in `last_resync_time`,
+        other traffic queued meanwhile (meters, timecode...) doesn't hold it up
+        """
+        self._resync_started = time.perf_counter()
+        self.resync_count += 1
+        before = self.tx_queue.mark()
+
+        for message in self.lcd.resync():
+            self.tx_queue.put_nowait(message)
+        self._queue_lcd_colours()
+
+        for index, state in enumerate(self.surface.leds):
+            if state:
+                self.tx_queue.put_nowait(SetLED(index=index, state=state), key=("led", index))
+
+        for fader in self.faders:
+            self.tx_queue.put_nowait(
+                FaderMoveEvent(index=fader.index, position=fader.latched_value),
+                key=("fader", fader.index)
+            )
+
+        for index, ring in enumerate(self.surface.vpot_rings):
+            if ring:
+                self.tx_queue.put_nowait(
+                    SetVPotLED(index=index, mode=(ring >> 4) & 0x03, value=ring & 0x0F, extra=bool(ring & 0x40)),
+                    key=("vpot_ring", index)
+                )
+
+        for offset, char in enumerate(self.timecode.cells):
+            if char:
+                self._queue_timecode(UpdateTimecodeChar(raw_char=char, display_offset=offset))
+
+        # Only the lanes this added to need to catch up
+        self._resync_mark = [
+            queued if queued > previous else 0
+            for queued, previous in zip(self.tx_queue.mark(), before)
+        ]
 
 
     # ===== #
@@ -273,35 +685,86 @@ class MCUDevice:
 
         Args:
             char (int): Raw character code
-            display_offset (int): Offset to write to
+            display_offset (int): Offset to write to, counted from the right hand end
         """
-        self.tx_queue.put_nowait(
-            UpdateTimecodeChar(char=char, display_offset=display_offset)
-        )
+        for message in self.timecode.write_codes(display_offset, bytes((char,)), left_to_right=False):
+            self._queue_timecode(message)
 
     
     def update_timecode(self, text: str, display_offset: int = 0, left_to_right: bool = True) -> None:
-        for i, char in enumerate(text):
-            self.tx_queue.put_nowait(
-                UpdateTimecodeChar(
-                    char=char,
-                    display_offset=display_offset+i,
-                    left_to_right=left_to_right
-                )
-            )
+        """
+        Update the timecode / assignment display, sending only the characters which changed
+
+        Args:
+            text (str): Text to show
+            display_offset (int, optional): First cell to write. Defaults to 0.
+            left_to_right (bool, optional): Count cells from the left rather than the right. Defaults to True.
+        """
+        for message in self.timecode.write_text(display_offset, text, left_to_right=left_to_right):
+            self._queue_timecode(message)
+
+
+    def _queue_timecode(self, message: UpdateTimecodeChar) -> None:
+        self.tx_queue.put_nowait(message, key=("timecode", message.display_offset))
+
+
+    def start_timecode(self, clock: TimecodeClock, frame_rate: Optional[float] = None) -> TimecodeDriver:
+        """
+        Show a running clock on the timecode display, refreshed at `frame_rate`
+        Only digits which changed since the last frame are sent
+
+            controller.start_timecode(SMPTEClock(fps=25))
+            controller.start_timecode(BBTClock(bpm=128))
+            controller.start_timecode(WallClock())
+
+        Args:
+            clock (TimecodeClock): position source, start / stop / locate it to control the display
+            frame_rate (Optional[float], optional): display updates per second. Defaults to the clock's rate.
+
+        Returns:
+            TimecodeDriver: the driver
+        """
+        self.stop_timecode()
+        self.timecode_driver = TimecodeDriver(self.timecode, clock, frame_rate=frame_rate)
+        if self._loop is not None:
+            self._timecode_task = self._loop.create_task(self.timecode_driver.run(self._queue_timecode))
+        return self.timecode_driver
+
+
+    def stop_timecode(self) -> None:
+        if self._timecode_task is not None:
+            self._timecode_task.cancel()
+            self._timecode_task = None
+        self.timecode_driver = None
 
 
     def update_lcd_raw(self, text: str, display_offset: int = 0) -> None:
         """
         Update the LCD with raw text
+        This writes into the LCD shadow buffer, only changed characters are sent on the next flush
 
         Args:
             text (str): Text to send
             display_offset (int, optional): Offset to write to. Defaults to 0.
         """
-        self.tx_queue.put_nowait(
-            UpdateLCD(text=text, display_offset=display_offset)
-        )
+        self.lcd.write_text(display_offset, text)
+        self._display_dirty.set()
+
+
+    def flush_display(self) -> None:
+        """
+        Queue up the minimal set of messages to bring the display in line with the shadow buffers
+        """
+        for message in self.lcd.flush():
+            self.tx_queue.put_nowait(message)
+        if self.lcd_colours != self._sent_lcd_colours:
+            self._queue_lcd_colours()
+
+
+    def _queue_lcd_colours(self) -> None:
+        message = UpdateLCDColour(colours=list(self.lcd_colours))
+        self._sent_lcd_colours = message.colours
+        self.tx_queue.put_nowait(message, key="lcd_colours")
 
 
     def update_single_lcd(self, index: int, text: Union[str, list[str]], line=0) -> None:
@@ -330,30 +793,36 @@ class MCUDevice:
     def update_lcd_colour(self, index: int, colour: int) -> None:
         """
         Update the colour of a single LCD
+        Changes within one flush tick go out as a single `UpdateLCDColour`, and only if the palette changed
 
         Args:
             index (int): LCD index
             colour (int): Colour index
         """
-        if colour < 0 or colour > 0x0F:
+        if colour < 0 or colour > 0x0F or not 0 <= index < len(self.lcd_colours):
             return
         self.lcd_colours[index] = colour
-        self.tx_queue.put_nowait(
-            UpdateLCDColour(colours=self.lcd_colours)
-        )
+        self._display_dirty.set()
 
 
     def update_lcd_colours(self, colours: list[int]) -> None:
         """
         Update the colour of all LCDs
+        Changes within one flush tick go out as a single `UpdateLCDColour`, and only if the palette changed
 
         Args:
-            colours (list[int]): Colour index
+            colours (list[int]): Colour index per LCD, 8 of them
+
+        Raises:
+            ValueError: wrong number of colours, or a colour out of range
         """
+        colours = list(colours)
+        if len(colours) != 8:
+            raise ValueError("Need 8 colours")
+        if any(colour < 0 or colour > 0x0F for colour in colours):
+            raise ValueError(f"Colour out of range: {colours}")
         self.lcd_colours = colours
-        self.tx_queue.put_nowait(
-            UpdateLCDColour(colours=self.lcd_colours)
-        )
+        self._display_dirty.set()
 
     
     def set_led(self, index: int, state: int) -> None:
@@ -365,10 +834,157 @@ class MCUDevice:
             state (int): State
         """
         self.tx_queue.put_nowait(
-            SetLED(index=index, state=state)
+            SetLED(index=index, state=state), key=("led", index)
         )
     
 
+    def update_meters(self, levels) -> None:
+        """
+        Update all channel meters from one frame of levels
+        Only strips whose LED segment count changed since the last frame are sent
+
+        Args:
+            levels: dB value per strip, a NumPy array, buffer or list
+        """
+        for data_byte in self.meter_encoder.encode(levels):
+            self._queue_meter([0xD0, data_byte])
+
+
+    def enable_meter_ballistics(self, **kwargs) -> MeterBallistics:
+        """
+        Drive the meters from a host-side ballistics engine running on its own frame clock
+        Feed it with `push_meter_levels()`
+
+        Args:
+            **kwargs: passed on to `MeterBallistics`
+
+        Returns:
+            MeterBallistics: the engine
+        """
+        self.disable_meter_ballistics()
+        self.meter_ballistics = MeterBallistics(**kwargs)
+        if self._loop is not None:
+            self._meter_task = self._loop.create_task(self.meter_ballistics.run(self._queue_meter))
+        return self.meter_ballistics
+
+
+    def disable_meter_ballistics(self) -> None:
+        if self._meter_task is not None:
+            self._meter_task.cancel()
+            self._meter_task = None
+        self.meter_ballistics = None
+
+
+    def enable_fader_throttle(self, max_rate: float = DEFAULT_FADER_RATE, deadband: int = 0) -> FaderThrottle:
+        """
+        Limit raw fader events (`on_raw_fader_event`, fader subscriptions & streams) to `max_rate` per fader,
+        always passing on the latest position and the final one on touch release.
+        `ManagedFader`s still see every move.
+
+        Args:
+            max_rate (float, optional): most updates per second per fader. Defaults to DEFAULT_FADER_RATE.
+            deadband (int, optional): ignore moves smaller than this many 14-bit steps. Defaults to 0.
+
+        Returns:
+            FaderThrottle: the throttle, for its stats
+        """
+        self.disable_fader_throttle()
+        self.fader_throttle = FaderThrottle(self._deliver_fader, max_rate=max_rate, deadband=deadband)
+        return self.fader_throttle
+
+
+    def disable_fader_throttle(self) -> None:
+        if self.fader_throttle is not None:
+            self.fader_throttle.close()
+            self.fader_throttle = None
+
+
+    def enable_scroll_wheel(
+        self,
+        rate: float = DEFAULT_SCRUB_RATE,
+        smoothing: float = DEFAULT_WHEEL_SMOOTHING,
+        acceleration: str = WHEEL_ACCEL_LINEAR,
+        sensitivity: float = 1.0
+    ) -> ScrollWheel:
+        """
+        Turn jog wheel messages into smoothed, accelerated scrub updates (`on_scrub_event`, EVENT_SCRUB)
+        delivered at a fixed `rate` while the wheel moves. Raw `on_scrollwheel_event`s are unaffected.
+
+        Args:
+            rate (float, optional): scrub updates per second. Defaults to DEFAULT_SCRUB_RATE.
+            smoothing (float, optional): velocity filter time constant in seconds. Defaults to DEFAULT_WHEEL_SMOOTHING.
+            acceleration (str, optional): WHEEL_ACCEL_NONE, WHEEL_ACCEL_LINEAR or WHEEL_ACCEL_QUADRATIC. Defaults to WHEEL_ACCEL_LINEAR.
+            sensitivity (float, optional): multiplier applied to every detent. Defaults to 1.0.
+
+        Returns:
+            ScrollWheel: the engine
+        """
+        self.disable_scroll_wheel()
+        self.scroll_wheel = ScrollWheel(
+            rate=rate, smoothing=smoothing, acceleration=acceleration, sensitivity=sensitivity
+        )
+        if self._loop is not None:
+            self._scroll_wheel_task = self._loop.create_task(self.scroll_wheel.run(self._deliver_scrub))
+        return self.scroll_wheel
+
+
+    def disable_scroll_wheel(self) -> None:
+        if self._scroll_wheel_task is not None:
+            self._scroll_wheel_task.cancel()
+            self._scroll_wheel_task = None
+        self.scroll_wheel = None
+
+
+    def push_meter_levels(self, levels) -> None:
+        """
+        Feed level samples to the meter ballistics engine
+
+        Args:
+            levels: dB per strip, shape (8,) or (n_samples, 8)
+
+        Raises:
+            RuntimeError: ballistics aren't enabled, see `enable_meter_ballistics()`
+        """
+        if self.meter_ballistics is None:
+            raise RuntimeError("Meter ballistics aren't enabled, call enable_meter_ballistics() first")
+        self.meter_ballistics.push(levels)
+
+
+    def feed_meter_audio(
+        self,
+        block,
+        interleaved: bool = True,
+        mode: str = METER_MODE_PEAK,
+        n_channels: Optional[int] = None
+    ) -> None:
+        """
+        Drive the meters straight from a block of audio
+        Levels go through the ballistics engine if enabled, otherwise only changed strips are sent
+
+        Args:
+            block: NumPy float / integer PCM, (n_frames, n_channels) interleaved or (n_channels, n_frames) planar
+            interleaved (bool, optional): sample layout. Defaults to True.
+            mode (str, optional): `METER_MODE_PEAK` or `METER_MODE_RMS`. Defaults to peak.
+            n_channels (Optional[int], optional): channels in the block, up to 8. Defaults to the block's shape, or 8 for a flat block.
+
+        Raises:
+            ValueError: the block's shape doesn't match `n_channels` / the layout
+        """
+        levels = block_meter_levels(block, n_channels=n_channels, interleaved=interleaved, mode=mode)
+        if self.meter_ballistics is not None:
+            self.meter_ballistics.push(levels)
+        else:
+            self.update_meters(levels)
+
+
+    def _queue_meter(self, message: Union[UpdateMeter, list[int]]) -> None:
+        # Either a message, or a `[0xD0, data_byte]` wire message straight from the frame encoder
+        data_byte = message[1] if type(message) is list else message.data_byte
+        # Overload set / clear share the strip with its level, but mustn't be coalesced away by it
+        kind = "meter_overload" if data_byte & 0x0F >= 0x0E else "meter"
+        self.tx_queue.put_nowait(message, key=(kind, data_byte >> 4), lane=LANE_METER)
+
+
     def set_fader(self, index: int, position: int) -> None:
         """
         Set the position of a fader
@@ -378,7 +994,22 @@ class MCUDevice:
             position (int): Position
         """
         self.faders[index].set_position(position)
-        self.tx_queue.put_nowait(FaderMoveEvent(index=index, position=position))
+        self.tx_queue.put_nowait(
+            FaderMoveEvent(index=index, position=position), key=("fader", index)
+        )
+
+
+    def ramp_fader(self, index: int, position: int, duration: float, curve: str = RAMP_LINEAR) -> None:
+        """
+        Move a fader smoothly to a position
+
+        Args:
+            index (int): Fader index
+            position (int): Target position
+            duration (float): Seconds
+            curve (str, optional): RAMP_LINEAR, RAMP_EXPONENTIAL or RAMP_S_CURVE. Defaults to RAMP_LINEAR.
+        """
+        self.faders[index].ramp_to(position, duration, curve=curve)
 
 
     def set_vpot_led(self, index: int, mode: int, value: int, extra: bool = False) -> None:
@@ -391,24 +1022,230 @@ class MCUDevice:
             value (int): Value
             extra (bool, optional): Extra LED. Defaults to False.
         """
+        message = SetVPotLED(index=index, mode=mode, value=value, extra=extra)
+        self.vpots[index].sent_ring = message.encode()[2]
+        self.tx_queue.put_nowait(message, key=("vpot_ring", index))
+
+
+    def configure_vpot(
+        self,
+        index: int,
+        minimum: float = 0.0,
+        maximum: float = 1.0,
+        step: float = 0.01,
+        value: Optional[float] = None,
+        acceleration: str = VPOT_ACCEL_LINEAR,
+        mode: int = RING_MODE_SINGLE,
+        extra: bool = False,
+        show_ring: bool = True
+    ) -> ManagedVPot:
+        """
+        Set up the value model behind a VPot, and by default let it draw its own LED ring
+
+        Args:
+            index (int): VPot index
+            minimum (float, optional): lowest value. Defaults to 0.0.
+            maximum (float, optional): highest value. Defaults to 1.0.
+            step (float, optional): value change per detent. Defaults to 0.01.
+            value (Optional[float], optional): starting value. Defaults to the current value.
+            acceleration (str, optional): VPOT_ACCEL_NONE, VPOT_ACCEL_LINEAR or VPOT_ACCEL_POWER. Defaults to VPOT_ACCEL_LINEAR.
+            mode (int, optional): LED ring mode (single, fill-centre, fill-left, width). Defaults to RING_MODE_SINGLE.
+            extra (bool, optional): Extra LED. Defaults to False.
+            show_ring (bool, optional): draw the value on the ring. Defaults to True.
+
+        Returns:
+            ManagedVPot: the pot
+        """
+        previous = self.vpots[index]
+        vpot = ManagedVPot(
+            index=index,
+            minimum=minimum,
+            maximum=maximum,
+            step=step,
+            value=previous.value if value is None else value,
+            acceleration=acceleration,
+            mode=mode,
+            extra=extra,
+            show_ring=show_ring,
+            channel=self.vpot_updates
+        )
+        vpot.sent_ring = previous.sent_ring
+        vpot.pending = previous.pending
+        self.vpots[index] = vpot
+        self._queue_vpot_ring(vpot)
+        return vpot
+
+
+    def set_vpot(self, index: int, value: float) -> None:
+        """
+        Set the value of a `ManagedVPot`, redrawing its LED ring if that changes how it looks
+
+        Args:
+            index (int): VPot index
+            value (float): Value, clamped to the pot's range & snapped to its step
+        """
+        vpot = self.vpots[index]
+        vpot.set_value(value)
+        self._queue_vpot_ring(vpot)
+
+
+    def _queue_vpot_ring(self, vpot: ManagedVPot) -> None:
+        ring = vpot.render()
+        if ring is None:
+            return
         self.tx_queue.put_nowait(
-            SetVPotLED(index=index, mode=mode, value=value, extra=extra)
+            SetVPotLED(index=vpot.index, mode=(ring >> 4) & 0x03, value=ring & 0x0F, extra=bool(ring & 0x40)),
+            key=("vpot_ring", vpot.index)
         )
 
     # ===== #
 
 
+    def subscribe(
+        self,
+        kind: str,
+        handler: Callback_T,
+        controls: ControlSpec = None,
+        mode: str = MODE_INLINE,
+        maxsize: int = DEFAULT_QUEUE_SIZE,
+        overflow: str = OVERFLOW_DROP_OLDEST
+    ) -> Subscription:
+        """
+        Subscribe to events from some of the surface's controls
+
+            controller.subscribe(EVENT_BUTTON, on_mute, "Mute *")
+            controller.subscribe(EVENT_VPOT, on_pan, range(0, 4))
+            controller.subscribe(EVENT_FADER, send_to_daw, mode=MODE_THREAD, overflow=OVERFLOW_COALESCE)
+
+        Inline handlers run inside the receive loop, so anything slow (network, disk) should use
+        MODE_TASK or MODE_THREAD to keep input handling & the fader motors responsive.
+
+        Args:
+            kind (str): EVENT_BUTTON, EVENT_FADER, EVENT_MANAGED_FADER, EVENT_VPOT, EVENT_MANAGED_VPOT, EVENT_WHEEL, EVENT_SCRUB, EVENT_METER or EVENT_CONNECTION
+            handler (Callback_T): sync or async callable taking the event
+            controls (ControlSpec, optional): index, range, `NOTE_MAP` name / pattern, or a list of those. Defaults to None (all).
+            mode (str, optional): MODE_INLINE, MODE_TASK or MODE_THREAD. Defaults to MODE_INLINE.
+            maxsize (int, optional): queue bound for task / thread modes. Defaults to DEFAULT_QUEUE_SIZE.
+            overflow (str, optional): OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST or OVERFLOW_COALESCE. Defaults to OVERFLOW_DROP_OLDEST.
+
+        Returns:
+            Subscription: pass to `unsubscribe()` to stop receiving events
+        """
+        return self.event_bus.subscribe(kind, handler, controls, mode=mode, maxsize=maxsize, overflow=overflow)
+
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self.event_bus.unsubscribe(subscription)
+
+
+    def events(
+        self,
+        kinds: Optional[list[str]] = None,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        max_latency: float = DEFAULT_MAX_LATENCY
+    ) -> EventStream:
+        """
+        Stream decoded surface events in batches
+
+            async for batch in controller.events(kinds=[EVENT_FADER, EVENT_VPOT], max_latency=0.01):
+                for event in batch:
+                    ...
+
+        Every stream reads the same shared ring of events, so opening more doesn't copy anything.
+        A stream that falls too far behind skips the oldest events, counted in `stream.dropped`.
+
+        Args:
+            kinds (Optional[list[str]], optional): event kinds to include. Defaults to None (all).
+            max_batch (int, optional): most events per batch. Defaults to DEFAULT_MAX_BATCH.
+            max_latency (float, optional): longest to wait for a batch to fill, in seconds. Defaults to DEFAULT_MAX_LATENCY.
+
+        Returns:
+            EventStream: async iterator of event lists, `close()` it (or use `async with`) when done
+        """
+        return self.event_log.stream(kinds=kinds, max_batch=max_batch, max_latency=max_latency)
+
+
+    def start_recording(self, path: str) -> SessionRecorder:
+        """
+        Start logging all traffic in both directions to a session log
+        Inbound messages are timestamped as they are handled, outbound as they are sent
+
+        Args:
+            path (str): log file to create
+
+        Returns:
+            SessionRecorder: the active recorder
+        """
+        self.stop_recording()
+        self.recorder = SessionRecorder(path)
+        return self.recorder
+
+
+    def stop_recording(self) -> None:
+        if self.recorder is not None:
+            self.recorder.close()
+            self.recorder = None
+
+
+    async def replay_session(
+        self,
+        path: str,
+        speed: Optional[float] = 1.0,
+        start: float = 0.0,
+        end: Optional[float] = None
+    ) -> int:
+        """
+        Feed the inbound side of a recorded session back through the decoders & handlers,
+        as if the surface were sending it again
+
+        Only the surface's input is replayed: nothing is recorded, the handshake SysEx is skipped
+        and the live connection to any attached surface is left alone, see `_replay_message()`
+
+        Args:
+            path (str): session log to replay
+            speed (Optional[float], optional): 1.0 for real time, N for N times faster, None for as fast as possible. Defaults to 1.0.
+            start (float, optional): session time in seconds to start at. Defaults to 0.0.
+            end (Optional[float], optional): session time in seconds to stop at. Defaults to the end.
+
+        Returns:
+            int: number of messages replayed
+        """
+        with SessionLog(path) as log:
+            return await SessionReplayer(log, self._replay_message, speed=speed).run(start, end)
+
+
     async def run(self):
+        self._loop = asyncio.get_running_loop()
+        if self.rx_mode == RX_MODE_CALLBACK:
+            self.midi_in.set_callback(self._rx_callback)
+
         asyncio.create_task(self._tx_consumer())
         asyncio.create_task(self._rx_handler())
         asyncio.create_task(self._response_consumer())
         asyncio.create_task(self._fader_update_producer())
+        asyncio.create_task(self._fader_ramp_producer())
+        asyncio.create_task(self._vpot_update_producer())
         asyncio.create_task(self._connect_request_producer())
+        asyncio.create_task(self._display_flush_producer())
+        if self.meter_ballistics is not None and self._meter_task is None:
+            self._meter_task = asyncio.create_task(self.meter_ballistics.run(self._queue_meter))
+        if self.timecode_driver is not None and self._timecode_task is None:
+            self._timecode_task = asyncio.create_task(self.timecode_driver.run(self._queue_timecode))
+        if self.scroll_wheel is not None and self._scroll_wheel_task is None:
+            self._scroll_wheel_task = asyncio.create_task(self.scroll_wheel.run(self._deliver_scrub))
 
         while True:
             await asyncio.sleep(1)
 
     def close(self):
+        self.stop_recording()
+        self.event_bus.close()
+        self.disable_fader_throttle()
+        self.stop_timecode()
+        self.disable_scroll_wheel()
+        self.disable_meter_ballistics()
+        if self.rx_mode == RX_MODE_CALLBACK:
+            self.midi_in.cancel_callback()
         self.midi_in.close_port()
         self.midi_out.close_port()
 
@@ -440,7 +1277,7 @@ if __name__ == "__main__":
         global colour_idx
         colour_idx += event.delta
         print(colour_idx)
-        controller.tx_queue.put_nowait(UpdateLCDColour(colours=[colour_idx]*8))
+        controller.update_lcd_colours([colour_idx]*8)
 
 
 #    controller.on_button_event = demo_button
@@ -449,7 +1286,7 @@ if __name__ == "__main__":
 #    controller.on_vpot_event = demo_vpot
 #    controller.on_scrollwheel_event = demo_wheel
 
-    controller.update_lcd_colours([LCD_PINK*8])
+    controller.update_lcd_colours([LCD_PINK]*8)
 
 #    controller.update_single_lcd("X2P Gtr\nDnte 01", index=0)
 #    controller.update_single_lcd("X2P 2\nDnte 02", index=1)
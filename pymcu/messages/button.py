@@ -5,6 +5,9 @@ LED_OFF = 0x00
 LED_BLINK = 0x01
 LED_ON = 0x7F
 
+# Capacitive touch on faders 1..8 + master comes in as NoteOn 0x68..0x70
+FADER_TOUCH_NOTES = range(0x68, 0x71)
+
 @dataclass
 class SetLED():
     index: int = field()
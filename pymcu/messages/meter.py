@@ -1,5 +1,11 @@
+import math
 from dataclasses import dataclass, field
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 @dataclass
 class UpdateMeter():
     """
@@ -48,20 +54,157 @@ class UpdateMeter():
         return [0xD0, self.data_byte]
 
     def __post_init__(self):
-        lsn: int = 0
-
-        for nibble, condition in self.METER_THRESHOLDS.items():
-            if condition(self.value):
-                lsn = nibble
-                break
-        
-        self.data_byte = self.index << 4 | lsn
+        self.data_byte = self.index << 4 | meter_nibble(self.value)
+
+    @classmethod
+    def from_data_byte(cls, data_byte: int):
+        """
+        Build from an already encoded strip / nibble byte
+        """
+        return cls(index=data_byte >> 4, value=METER_NIBBLE_VALUES[data_byte & 0x0F])
     
     @classmethod
     def from_midi(cls, data: list[int]):
         """
         Decode a MIDI message into a MeterUpdate object
+        The dB value is the lowest value which maps back onto the same nibble
         """
-        index = (data[0] & 0x0F)
-        value = (data[1] & 0x0F) << 4 | (data[2] & 0x0F)
+        index = (data[1] >> 4) & 0x0F
+        value = METER_NIBBLE_VALUES[data[1] & 0x0F]
         return cls(index=index, value=value)
+
+
+# Inverse of `UpdateMeter.METER_THRESHOLDS`, nibble -> representative dB value
+METER_NIBBLE_VALUES = {
+    0x0F: 0xFF,
+    0x0E: 0xFE,
+    0x0D: 1,
+    0x0C: 0,
+    0x0B: -2,
+    0x0A: -4,
+    0x09: -6,
+    0x08: -8,
+    0x07: -10,
+    0x06: -14,
+    0x05: -20,
+    0x04: -30,
+    0x03: -40,
+    0x02: -50,
+    0x01: -60,
+    0x00: -61,
+}
+
+
+# `UpdateMeter.METER_THRESHOLDS` precomputed for every whole dB from -61 to 0.
+# The thresholds are all whole numbers compared with >=, so flooring a level first gives the same nibble
+METER_LUT_FLOOR = -61
+METER_LUT = bytes(
+    next(
+        nibble for nibble, condition in UpdateMeter.METER_THRESHOLDS.items()
+        if condition(db)
+    )
+    for db in range(METER_LUT_FLOOR, 1)
+)
+
+
+def meter_nibble(value: float) -> int:
+    """
+    Map a dB value (or the 254 / 255 overload codes) onto a meter nibble
+    NaN (e.g. the log of a silent or empty block gone wrong) shows as silence
+
+    Args:
+        value (float): dB value
+
+    Returns:
+        int: LED state nibble (0x00..0x0F)
+    """
+    if value > 0:
+        if value == 0xFF:
+            return 0x0F
+        if value == 0xFE:
+            return 0x0E
+        return 0x0D
+    if value <= METER_LUT_FLOOR or math.isnan(value):
+        return 0x00
+    return METER_LUT[math.floor(value) - METER_LUT_FLOOR]
+
+
+# Ascending thresholds for nibbles 0x01..0x0D, for vectorised lookup with `searchsorted`:
+# whole dB steps up to 0 dB, then anything above 0 dB.
+# The 254 / 255 overload codes only count when exact, like `meter_nibble`, so they are matched separately
+METER_THRESHOLDS_DB = (-60, -50, -40, -30, -20, -14, -10, -8, -6, -4, -2, 0, math.ulp(0))
+
+
+class MeterFrameEncoder():
+    """
+    Turns a frame of per-strip dB levels into `0xD0` data bytes in one step,
+    skipping strips whose nibble is unchanged since the previous frame.
+
+    Uses NumPy when it is installed, and falls back to `METER_LUT` one strip at a time otherwise.
+    NumPy doesn't pay off at the 8 strips of a surface: the fallback encodes frames faster,
+    even from ndarrays (see `benchmarks/bench_meter.py`).
+    Frames may hold fewer levels than `n_channels`, they then update the first strips only.
+
+    Args:
+        n_channels: number of strips (0..8)
+    """
+
+    def __init__(self, n_channels: int = 8):
+        self.n_channels = n_channels
+
+        # Last data byte sent per strip, 0xFF never matches a real one so the first frame sends everything
+        if np is None:
+            self._last = bytearray([0xFF] * n_channels)
+        else:
+            self._thresholds = np.array(METER_THRESHOLDS_DB, dtype=np.float64)
+            self._strip_bits = np.arange(n_channels, dtype=np.int64) << 4
+            self._last = np.full(n_channels, 0xFF, dtype=np.int64)
+
+
+    def encode(self, levels) -> bytes:
+        """
+        Encode a frame, returning data bytes only for strips that changed
+
+        Args:
+            levels: up to `n_channels` dB values, a NumPy array or anything NumPy / iteration accepts
+
+        Raises:
+            ValueError: more levels than strips
+
+        Returns:
+            bytes: `0xD0` data bytes (strip << 4 | nibble) to send
+        """
+        if np is None:
+            changed = bytearray()
+            for strip, level in enumerate(levels):
+                if strip >= self.n_channels:
+                    raise ValueError(f"More levels than the {self.n_channels} strips")
+                data_byte = strip << 4 | meter_nibble(level)
+                if self._last[strip] != data_byte:
+                    self._last[strip] = data_byte
+                    changed.append(data_byte)
+            return bytes(changed)
+
+        levels = np.asarray(levels, dtype=np.float64)
+        n = len(levels)
+        if n > self.n_channels:
+            raise ValueError(f"Got {n} levels for {self.n_channels} strips")
+        nibbles = np.searchsorted(self._thresholds, levels, side="right")
+        nibbles[levels == 0xFE] = 0x0E
+        nibbles[levels == 0xFF] = 0x0F
+        # searchsorted puts NaN above every threshold, `meter_nibble` shows it as silence
+        nibbles[np.isnan(levels)] = 0x00
+
+        data = self._strip_bits[:n] | nibbles
+        last = self._last[:n]
+        mask = data != last
+        changed = data[mask]
+        last[mask] = changed
+        return changed.astype(np.uint8).tobytes()
+
+
+    def reset(self) -> None:
+        """
+        Forget the previous frame, so the next one sends every strip
+        """
+        self._last[:] = 0xFF if np is not None else bytes([0xFF] * self.n_channels)
@@ -0,0 +1,100 @@
+from typing import Optional
+
+from .meter import np
+from .meter_ballistics import METER_FLOOR_DB
+
+METER_MODE_PEAK = "peak"
+METER_MODE_RMS = "rms"
+
+# Channels in a flat block when not given
+DEFAULT_CHANNELS = 8
+
+# Linear amplitude of METER_FLOOR_DB, anything quieter reads as the floor
+_FLOOR_AMPLITUDE = 10 ** (METER_FLOOR_DB / 20)
+
+
+def _frames(block, n_channels: Optional[int], interleaved: bool):
+    """
+    View an audio block as (n_frames, n_channels) float samples in the range -1..1
+
+    2-D blocks carry their own channel count, which must match `n_channels` if that's given.
+    Flat blocks are split into `n_channels`, 8 if not given.
+    Integer PCM is scaled by its full-scale value, float blocks are used as-is
+    """
+    if np is None:
+        raise ImportError("feed_meter_audio / block_levels need numpy, install it with the `audio` extra: pip install pymcu[audio]")
+
+    block = np.asarray(block)
+    if block.ndim == 2:
+        frames = block if interleaved else block.T
+        if n_channels is not None and frames.shape[1] != n_channels:
+            layout = "(n_frames, n_channels)" if interleaved else "(n_channels, n_frames)"
+            raise ValueError(f"Block of shape {block.shape} has {frames.shape[1]} channels, expected {n_channels} as {layout}")
+    elif block.ndim == 1:
+        n_channels = DEFAULT_CHANNELS if n_channels is None else n_channels
+        frames = block.reshape(-1, n_channels) if interleaved else block.reshape(n_channels, -1).T
+    else:
+        raise ValueError(f"Audio blocks must be 1-D or 2-D, got shape {block.shape}")
+
+    if np.issubdtype(frames.dtype, np.integer):
+        return frames.astype(np.float32) / (np.iinfo(frames.dtype).max + 1)
+    return frames
+
+
+def to_dbfs(amplitude):
+    """
+    Convert linear amplitudes to dBFS, clamped at `METER_FLOOR_DB`
+    """
+    return 20.0 * np.log10(np.maximum(amplitude, _FLOOR_AMPLITUDE))
+
+
+def _peak(frames):
+    return to_dbfs(np.abs(frames).max(axis=0))
+
+
+def _rms(frames):
+    # Sum of squares per channel in one pass, without materialising the squared block
+    mean_square = np.einsum("ij,ij->j", frames, frames, dtype=np.float64) / max(len(frames), 1)
+    return to_dbfs(np.sqrt(mean_square))
+
+
+def block_levels(block, n_channels: Optional[int] = None, interleaved: bool = True):
+    """
+    Per-channel peak and RMS level of one block of audio
+
+    Args:
+        block: NumPy array (or anything `np.asarray` accepts) of float or integer PCM.
+            Interleaved: (n_frames, n_channels) or flat frame-major samples.
+            Planar: (n_channels, n_frames).
+        n_channels (Optional[int], optional): number of channels in the block.
+            Defaults to the block's own shape, or 8 for a flat block.
+        interleaved (bool, optional): sample layout. Defaults to True.
+
+    Raises:
+        ValueError: the block's shape doesn't match `n_channels` / the layout
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: (peak dBFS, RMS dBFS), one value per channel
+    """
+    frames = _frames(block, n_channels, interleaved)
+    return _peak(frames), _rms(frames)
+
+
+def block_meter_levels(block, n_channels: Optional[int] = None, interleaved: bool = True, mode: str = METER_MODE_PEAK):
+    """
+    Level per channel to drive the meters with, see `block_levels`
+    Only the requested measurement is computed
+
+    Args:
+        mode (str, optional): `METER_MODE_PEAK` or `METER_MODE_RMS`. Defaults to peak.
+
+    Returns:
+        np.ndarray: dBFS per channel
+    """
+    if mode == METER_MODE_PEAK:
+        measure = _peak
+    elif mode == METER_MODE_RMS:
+        measure = _rms
+    else:
+        raise ValueError(f"Unknown meter mode: {mode}")
+    return measure(_frames(block, n_channels, interleaved))
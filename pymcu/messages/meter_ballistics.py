@@ -0,0 +1,144 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from .meter import UpdateMeter, MeterFrameEncoder, np
+
+# Anything below this is treated as silence
+METER_FLOOR_DB = -100.0
+
+METER_OVERLOAD_SET = 0xFE
+METER_OVERLOAD_CLEAR = 0xFF
+
+
+class MeterBallistics():
+    """
+    Host-side meter ballistics for all strips, vectorised across channels with NumPy
+
+    Level samples can be pushed at any rate with `push()`; the engine keeps the loudest
+    sample per strip until the next frame. Each `frame()` then applies attack / peak-hold / release
+    and returns `UpdateMeter` messages only for strips whose LED segment count changed.
+
+    Signals above `overload_threshold` set the strip's overload LED (254), which is cleared (255)
+    once the strip has stayed below the threshold for `overload_hold` seconds.
+
+    Args:
+        n_channels: number of strips
+        attack: rise time constant in seconds (0 for instant)
+        release: fall time constant in seconds
+        peak_hold: seconds to hold a peak before releasing
+        overload_threshold: dB value above which the overload LED is set
+        overload_hold: seconds below the threshold before the overload LED is cleared
+        frame_rate: frames per second when driven by `run()`
+    """
+
+    def __init__(
+        self,
+        n_channels: int = 8,
+        attack: float = 0.0,
+        release: float = 0.3,
+        peak_hold: float = 0.5,
+        overload_threshold: float = 0.0,
+        overload_hold: float = 2.0,
+        frame_rate: float = 30.0
+    ):
+        if np is None:
+            raise ImportError("MeterBallistics requires numpy")
+
+        self.n_channels = n_channels
+        self.attack = attack
+        self.release = release
+        self.peak_hold = peak_hold
+        self.overload_threshold = overload_threshold
+        self.overload_hold = overload_hold
+        self.frame_rate = frame_rate
+
+        self.encoder = MeterFrameEncoder(n_channels)
+
+        self.level = np.full(n_channels, METER_FLOOR_DB)
+        self._input = np.full(n_channels, METER_FLOOR_DB)
+        self._peak_time = np.full(n_channels, -np.inf)
+        self._over_time = np.full(n_channels, -np.inf)
+        self.overload = np.zeros(n_channels, dtype=bool)
+        self._last_frame: Optional[float] = None
+
+        self.frames = 0
+        self.messages_sent = 0
+
+
+    def push(self, levels) -> None:
+        """
+        Feed level samples in dB
+
+        Args:
+            levels: shape (n_channels,) for one sample per strip, or (n_samples, n_channels).
+                Fewer channels than strips feed the first strips only.
+        """
+        levels = np.asarray(levels, dtype=np.float64)
+        if levels.ndim > 1:
+            levels = levels.max(axis=0)
+        target = self._input[:len(levels)]
+        np.maximum(target, levels, out=target)
+
+
+    def frame(self, now: Optional[float] = None) -> list[UpdateMeter]:
+        """
+        Advance the ballistics to `now` and collect what needs sending
+
+        Args:
+            now (Optional[float], optional): `time.perf_counter()` timestamp. Defaults to now.
+
+        Returns:
+            list[UpdateMeter]: overload set / clear and changed levels
+        """
+        now = time.perf_counter() if now is None else now
+        dt = 1.0 / self.frame_rate if self._last_frame is None else now - self._last_frame
+        self._last_frame = now
+        self.frames += 1
+
+        target = self._input
+        self._input = np.full(self.n_channels, METER_FLOOR_DB)
+
+        # Attack towards anything louder, hold after a peak, then release
+        attack = 1.0 if self.attack <= 0 else 1.0 - np.exp(-dt / self.attack)
+        release = 1.0 if self.release <= 0 else 1.0 - np.exp(-dt / self.release)
+
+        rising = target >= self.level
+        self._peak_time[rising] = now
+        holding = ~rising & (now - self._peak_time < self.peak_hold)
+        coefficient = np.where(rising, attack, np.where(holding, 0.0, release))
+        self.level += (target - self.level) * coefficient
+
+        messages = []
+
+        over = target > self.overload_threshold
+        self._over_time[over] = now
+        for strip in np.flatnonzero(over & ~self.overload):
+            messages.append(UpdateMeter(index=int(strip), value=METER_OVERLOAD_SET))
+        expired = self.overload & ~over & (now - self._over_time >= self.overload_hold)
+        for strip in np.flatnonzero(expired):
+            messages.append(UpdateMeter(index=int(strip), value=METER_OVERLOAD_CLEAR))
+        self.overload = (self.overload | over) & ~expired
+
+        # Clamped so the encoder never turns a hot level into the overload codes itself
+        for data_byte in self.encoder.encode(np.minimum(self.level, 1.0)):
+            messages.append(UpdateMeter.from_data_byte(data_byte))
+
+        self.messages_sent += len(messages)
+        return messages
+
+
+    async def run(self, send: Callable[[UpdateMeter], None]) -> None:
+        """
+        Drive `frame()` on a fixed clock at `frame_rate`
+
+        Args:
+            send (Callable[[UpdateMeter], None]): called with every message to transmit
+        """
+        period = 1.0 / self.frame_rate
+        next_frame = time.perf_counter()
+        while True:
+            for message in self.frame(next_frame):
+                send(message)
+            next_frame += period
+            await asyncio.sleep(max(0.0, next_frame - time.perf_counter()))
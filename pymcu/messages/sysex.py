@@ -22,6 +22,14 @@ SEGMENT_CHARS = {
     "7": 0x37, "8": 0x38, "9": 0x39,
 }
 
+# Adds the decimal point after a 7-segment character
+SEGMENT_DOT = 0x40
+
+# `SEGMENT_CHARS` as a 256 byte translation table for `bytes.translate()`, either case, unknown -> blank
+SEGMENT_TABLE = bytes(
+    SEGMENT_CHARS.get(chr(code).lower(), 0x00) for code in range(256)
+)
+
 def hex_string(data: list[int]):
     """Print the data as a hex string."""
     return(" ".join(f"{x:02X}" for x in data))
@@ -51,9 +59,9 @@ class DeviceQuery(MCUBase):
     def from_midi(cls, syx: list[int]):
         if syx[0] != 0xF0 or syx[-1] != 0xF7:
             raise ValueError(f"Invalid SysEx message: {syx}")
-        if syx[1:4] != MCU_HEADER:
+        if syx[1:5] != MCU_HEADER:
             raise ValueError(f"Invalid SysEx header: {syx}")
-        if syx[4] != 0x00:
+        if syx[5] != 0x00:
             raise ValueError(f"Not a Device Query message: {syx}")
         return cls()
 
@@ -75,7 +83,7 @@ class HostConnectionQuery(MCUBase):
     @classmethod
     def from_midi(cls, syx: list[int]):
         serial_number = "".join([chr(x) for x in syx[6:13]])
-        challenge_code = syx[14:22]
+        challenge_code = syx[13:17]
         return cls(serial_number=serial_number, challenge_code=challenge_code)
 
 
@@ -222,6 +230,8 @@ class ConfigFaderTouchSensitivity(MCUBase):
     touch sensitivity (0x00 .. 0x05; default: 0x03)
     """
     command: int = 0x0E
+    index: int = field(default=0)
+    sensitivity: int = field(default=0x03)
 
     def encode(self) -> list[int]:
        return SOX + MCU_HEADER + [self.command, self.index, self.sensitivity] + EOX
@@ -248,6 +258,8 @@ class UpdateLCD(MCUBase):
 
     def __post_init__(self):
         if not self.raw_text:
+            if self.text is None:
+                raise ValueError("UpdateLCD needs text or raw_text")
             self.raw_text = [ord(x) for x in self.text]
 
     def encode(self) -> list[int]:
@@ -259,6 +271,10 @@ class UpdateLCD(MCUBase):
             + self.raw_text \
             + EOX
 
+    @classmethod
+    def from_midi(cls, syx: list[int]):
+        return cls(display_offset=syx[6], raw_text=list(syx[7:-1]))
+
 LCD_OFF = 0
 LCD_RED = 1
 LCD_GREEN = 2
@@ -392,8 +408,11 @@ class UpdateTimecodeChar(MCUBase):
     left_to_right: bool = False
 
     def __post_init__(self):
-        if not self.raw_char:
+        # A raw code of 0x00 (blank) is valid, so only fall back to `char` when one was given
+        if self.char is not None:
             self.raw_char = SEGMENT_CHARS.get(self.char[0].lower(), 0x00)
+        elif not isinstance(self.raw_char, int):
+            raise ValueError("UpdateTimecodeChar needs char or raw_char")
 
     def encode(self) -> list[int]:
         if not self.left_to_right:
@@ -1,5 +1,9 @@
 from dataclasses import dataclass, field
 
+VPOT_CC_BASE = 0x10
+VPOT_RING_CC_BASE = 0x30
+SCROLL_WHEEL_CC = 0x3C
+
 @dataclass
 class VPotMoveEvent():
     """
@@ -31,13 +35,13 @@ class VPotMoveEvent():
 
 class ScrollWheelMoveEvent(VPotMoveEvent):
     """
-    Same thing as VPot, but these come in on 0x60.
+    Same thing as VPot, but these come in on 0x3C.
     Maybe we want a distinct event
     """
     def encode(self):
         return [
             0xB0,
-            0x60,
+            SCROLL_WHEEL_CC,
             self.delta if self.delta > 0 else (0 - self.delta) | 0b0100_0000
         ]
 
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+
+@pytest.fixture
+def device():
+    """
+    `MCUDevice` on a `VirtualMCU`, not running, for tests that call its methods directly
+    """
+    pytest.importorskip("rtmidi", exc_type=ImportError)
+    from pymcu.mcu import MCUDevice
+    from pymcu.helpers.virtual_device import VirtualMCU
+
+    surface = VirtualMCU(seed=1)
+    device = MCUDevice(surface.midi_in, surface.midi_out, rx_mode="poll")
+    yield device
+    device.close()
+
+
+@pytest.fixture
+def run_device():
+    """
+    Run a scenario against a live `MCUDevice` wired to a `VirtualMCU`
+
+        def test_x(run_device):
+            async def scenario(surface, device):
+                ...
+                return result
+
+            result = run_device(scenario, connect=True)
+
+    The device starts running as soon as the scenario first awaits, so anything set up before that
+    (callbacks, `surface.unplug()`...) is in place from the start. With `connect`, the scenario only starts
+    once the handshake has completed and the resync it triggers has gone out.
+    Keyword arguments go to `MCUDevice`, the device is stopped & closed however the scenario ends.
+
+    Returns:
+        Callable: `run(scenario, connect=False, **device_kwargs)`, returns what the scenario returns
+    """
+    pytest.importorskip("rtmidi", exc_type=ImportError)
+    from pymcu.mcu import MCUDevice
+    from pymcu.helpers.virtual_device import VirtualMCU
+
+    def run(scenario, connect: bool = False, **device_kwargs):
+        async def main():
+            surface = VirtualMCU(seed=1)
+            device = MCUDevice(surface.midi_in, surface.midi_out, **device_kwargs)
+            task = asyncio.create_task(device.run())
+            try:
+                if connect:
+                    while not device.connected_status:
+                        await asyncio.sleep(0.001)
+                    await asyncio.sleep(0.05)
+                return await scenario(surface, device)
+            finally:
+                task.cancel()
+                device.close()
+
+        return asyncio.run(main())
+
+    return run
@@ -0,0 +1,79 @@
+import asyncio
+
+import pytest
+
+from pymcu.helpers.coalescing_queue import CoalescingQueue
+
+
+def drain(queue: CoalescingQueue) -> list:
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+        queue.task_done()
+    return items
+
+
+def test_unkeyed_items_are_fifo():
+    queue = CoalescingQueue()
+    for item in range(3):
+        assert queue.put_nowait(item)
+
+    assert drain(queue) == [0, 1, 2]
+
+
+def test_keyed_item_replaced_in_place():
+    queue = CoalescingQueue()
+    queue.put_nowait("fader 0 @ 10", key=("fader", 0))
+    queue.put_nowait("led", key=("led", 5))
+    assert not queue.put_nowait("fader 0 @ 20", key=("fader", 0))
+    assert not queue.put_nowait("fader 0 @ 30", key=("fader", 0))
+
+    assert queue.qsize() == 2
+    assert drain(queue) == ["fader 0 @ 30", "led"]
+    assert queue.collapsed == 2
+    assert queue.collapsed_by_kind == {"fader": 2}
+
+
+def test_key_free_again_once_sent():
+    queue = CoalescingQueue()
+    queue.put_nowait(1, key=("fader", 0))
+    assert drain(queue) == [1]
+
+    assert queue.put_nowait(2, key=("fader", 0))
+    assert drain(queue) == [2]
+    assert queue.collapsed == 0
+
+
+def test_full_queue_still_coalesces():
+    queue = CoalescingQueue(maxsize=2)
+    queue.put_nowait(1, key=("fader", 0))
+    queue.put_nowait(2)
+
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(3)
+    with pytest.raises(asyncio.QueueFull):
+        queue.put_nowait(3, key=("fader", 1))
+
+    assert not queue.put_nowait(4, key=("fader", 0))
+    assert drain(queue) == [4, 2]
+
+
+def test_join_waits_for_task_done():
+    async def scenario():
+        queue = CoalescingQueue()
+        queue.put_nowait(1, key="a")
+        queue.put_nowait(2, key="a")
+
+        async def consume():
+            await asyncio.sleep(0.01)
+            assert await queue.get() == 2
+            queue.task_done()
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.wait_for(queue.join(), 1.0)
+        await consumer
+
+        with pytest.raises(ValueError):
+            queue.task_done()
+
+    asyncio.run(scenario())
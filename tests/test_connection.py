@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+
+from pymcu.helpers.connection import (
+    ConnectionMonitor, STATE_DISCONNECTED, STATE_CONNECTING, STATE_CONNECTED
+)
+
+
+def test_handshake_transitions():
+    monitor = ConnectionMonitor()
+
+    change = monitor.ping_sent(now=1.0)
+    assert (change.previous, change.state) == (STATE_DISCONNECTED, STATE_CONNECTING)
+    assert monitor.pending_pings == 1
+
+    change = monitor.confirmed(now=1.002)
+    assert (change.previous, change.state, change.reason) == (STATE_CONNECTING, STATE_CONNECTED, "confirmed")
+    assert change.latency == pytest.approx(0.002)
+    assert monitor.pending_pings == 0
+
+
+def test_keepalive_confirmation_is_not_a_change():
+    monitor = ConnectionMonitor()
+    monitor.ping_sent(now=1.0)
+    monitor.confirmed(now=1.002)
+
+    monitor.ping_sent(now=6.0)
+    assert monitor.confirmed(now=6.5) is None
+    assert monitor.connects == 1
+    # Only the connecting handshake is timed
+    assert monitor.latency == monitor.latency_max == pytest.approx(0.002)
+
+
+def test_surface_lost_after_max_missed_pings():
+    monitor = ConnectionMonitor(max_missed=2)
+    monitor.ping_sent()
+    monitor.confirmed()
+
+    monitor.ping_sent()
+    assert monitor.timed_out() is None
+    monitor.ping_sent()
+    change = monitor.timed_out()
+
+    assert (change.previous, change.state, change.reason) == (STATE_CONNECTED, STATE_CONNECTING, "timeout")
+    assert monitor.disconnects == 1
+
+
+def test_refusal_disconnects():
+    monitor = ConnectionMonitor()
+    monitor.ping_sent()
+
+    change = monitor.refused()
+
+    assert change.state == STATE_DISCONNECTED
+    assert monitor.refusals == 1
+
+
+def test_detection_time():
+    monitor = ConnectionMonitor(ping_timeout=0.25, keepalive_interval=1.0, max_missed=2)
+
+    assert monitor.detection_time == pytest.approx(1.5)
+
+
+def test_retries_back_off_until_answered():
+    async def scenario():
+        monitor = ConnectionMonitor(ping_timeout=0.005, retry_min=0.005, retry_max=0.02)
+        changes = []
+
+        async def notify(change):
+            changes.append(change)
+
+        task = asyncio.create_task(monitor.run(lambda: None, notify))
+        await asyncio.sleep(0.15)
+        task.cancel()
+        return monitor, changes
+
+    monitor, changes = asyncio.run(scenario())
+    # Never answered: one move to connecting, then quiet retries capped at retry_max
+    assert [change.state for change in changes] == [STATE_CONNECTING]
+    assert monitor.retry_interval == 0.02
+    assert monitor.pings >= 4
+
+
+def test_virtual_surface_unplug_and_replug(run_device):
+    async def scenario(surface, device):
+        device.connection.ping_timeout = 0.02
+        device.connection.retry_max = 0.05
+        changes = []
+        device.on_connection_event = lambda change: changes.append((change.previous, change.state, change.reason))
+
+        await asyncio.sleep(0.2)
+        connected = device.connected_status
+        resyncs = device.resync_count
+
+        surface.unplug()
+        await asyncio.sleep(device.connection.detection_time + 0.05)
+        lost = not device.connected_status
+
+        # Held back while the surface is away, restored by the resync on reconnect
+        device.set_led(0x10, 1)
+        surface.plug()
+        await asyncio.sleep(0.3)
+        return connected, resyncs, lost, changes, device.resync_count, surface.surface.leds[0x10], device.tx_suppressed
+
+    connected, resyncs, lost, changes, final_resyncs, led, suppressed = run_device(scenario, keepalive_interval=0.05)
+    assert connected
+    # Keepalive confirmations don't trigger a resync
+    assert resyncs == 1
+    assert lost
+    assert changes == [
+        (STATE_DISCONNECTED, STATE_CONNECTING, "ping"),
+        (STATE_CONNECTING, STATE_CONNECTED, "confirmed"),
+        (STATE_CONNECTED, STATE_CONNECTING, "timeout"),
+        (STATE_CONNECTING, STATE_CONNECTED, "confirmed"),
+    ]
+    assert final_resyncs == 2
+    assert led == 1
+    assert suppressed >= 1
+
+
+def test_keepalive_waits_for_silence():
+    async def scenario():
+        monitor = ConnectionMonitor(keepalive_interval=0.05, ping_timeout=0.02)
+
+        async def notify(change):
+            pass
+
+        # Answer every ping straight away, then keep the surface busy for a while
+        task = asyncio.create_task(monitor.run(monitor.confirmed, notify))
+        await asyncio.sleep(0.01)
+        busy = monitor.pings
+        for _ in range(15):
+            monitor.activity()
+            await asyncio.sleep(0.01)
+        chatty = monitor.pings - busy
+
+        await asyncio.sleep(0.18)
+        task.cancel()
+        return busy, chatty, monitor.pings - busy - chatty
+
+    busy, chatty, quiet = asyncio.run(scenario())
+    assert busy == 1
+    # No keepalives while the surface was talking, then one per interval of silence
+    assert chatty == 0
+    assert 2 <= quiet <= 4
+
+
+def test_held_back_output_is_logged_once(run_device, caplog):
+    async def scenario(surface, device):
+        surface.unplug()
+        device.set_led(0x10, 1)
+        device.set_led(0x11, 1)
+        await asyncio.sleep(0.02)
+        return device
+
+    with caplog.at_level("WARNING", logger="pymcu.mcu"):
+        device = run_device(scenario, keepalive_interval=0.05)
+
+    assert device.connection.keepalive_interval == 0.05
+    assert device.tx_suppressed >= 2
+    assert len([r for r in caplog.records if "require_connection" in r.getMessage()]) == 1
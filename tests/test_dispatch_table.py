@@ -0,0 +1,77 @@
+import pytest
+
+pytest.importorskip("rtmidi", exc_type=ImportError)
+
+from pymcu.helpers.dispatch_table import DispatchTable
+from pymcu.messages.vpot import ScrollWheelMoveEvent, VPOT_CC_BASE, SCROLL_WHEEL_CC
+from pymcu.messages.sysex import HostConnectionQuery, HostConnectionConfirmation, UpdateLCD
+
+
+@pytest.fixture
+def table(device) -> DispatchTable:
+    return device._build_dispatch_table()
+
+
+def decode(table: DispatchTable, message: list[int]):
+    decoder, handler = table.lookup(message)
+    return decoder(message), handler
+
+
+def test_fader(device, table):
+    event, handler = decode(table, [0xE3, 0x7F, 0x40])
+
+    assert handler == device._handle_fader
+    assert (event.index, event.position) == (3, 0x207F)
+
+
+def test_button_on_any_channel(device, table):
+    event, handler = decode(table, [0x91, 0x10, 0x7F])
+
+    assert handler == device._handle_button
+    assert event.index == 0x10
+    assert event.state
+
+
+def test_vpot_and_wheel_share_cc_status(device, table):
+    vpot, vpot_handler = decode(table, [0xB0, VPOT_CC_BASE | 5, 0x43])
+    wheel, wheel_handler = decode(table, [0xB0, SCROLL_WHEEL_CC, 0x01])
+
+    assert vpot_handler == device._handle_vpot
+    assert (vpot.index, vpot.delta) == (5, -3)
+    assert wheel_handler == device._handle_scrollwheel
+    assert isinstance(wheel, ScrollWheelMoveEvent)
+    assert wheel.delta == 1
+
+
+def test_sysex_by_command_byte(device, table):
+    query = [0xF0, 0x00, 0x00, 0x66, 0x14, 0x01] + [ord(x) for x in "ABC1234"] + [1, 2, 3, 4, 0xF7]
+    event, handler = decode(table, query)
+
+    assert handler == device._handle_sysex
+    assert isinstance(event, HostConnectionQuery)
+    assert event.serial_number == "ABC1234"
+    assert event.challenge_code == [1, 2, 3, 4]
+
+    event, _ = decode(table, [0xF0, 0x00, 0x00, 0x66, 0x14, 0x03] + [ord(x) for x in "ABC1234"] + [0xF7])
+    assert isinstance(event, HostConnectionConfirmation)
+
+
+def test_foreign_sysex_is_not_ours(table):
+    # Another manufacturer's message with 0x03 where our command byte would be
+    assert table.lookup([0xF0, 0x00, 0x20, 0x32, 0x14, 0x03] + [ord(x) for x in "ABC1234"] + [0xF7]) is None
+    assert table.lookup([0xF0, 0x43, 0x10, 0x4C, 0x00, 0x03, 0xF7]) is None
+    assert table.unhandled == 2
+
+
+def test_unregistered_messages(table):
+    assert table.lookup([0xB0, 0x7F, 0x01]) is None
+    assert table.lookup([0xF0, 0x00]) is None
+    assert table.lookup([0xA0, 0x00, 0x00]) is None
+    assert table.unhandled == 3
+
+
+def test_empty_lcd_payload_is_a_value_error(table):
+    decoder, _ = table.lookup([0xF0, 0x00, 0x00, 0x66, 0x14, UpdateLCD.command, 0x00, 0xF7])
+
+    with pytest.raises(ValueError):
+        decoder([0xF0, 0x00, 0x00, 0x66, 0x14, UpdateLCD.command, 0x00, 0xF7])
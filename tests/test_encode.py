@@ -0,0 +1,12 @@
+import pytest
+
+from pymcu.messages.sysex import UpdateTimecodeChar
+
+
+def test_timecode_blank_raw_char():
+    assert UpdateTimecodeChar(raw_char=0x00, display_offset=2).encode() == [0xB0, 0x42, 0x00]
+
+
+def test_timecode_char_needs_a_value():
+    with pytest.raises(ValueError):
+        UpdateTimecodeChar(display_offset=2)
@@ -0,0 +1,100 @@
+import asyncio
+
+from pymcu.helpers.event_bus import (
+    EventBus, EVENT_BUTTON, EVENT_FADER, MODE_TASK, MODE_THREAD,
+    OVERFLOW_DROP_OLDEST, OVERFLOW_DROP_NEWEST, OVERFLOW_COALESCE
+)
+
+
+async def publish_then_drain(bus: EventBus, events: list[tuple[int, int]]) -> None:
+    # Nothing yields while publishing, so the workers only start once every event is queued
+    for index, event in events:
+        await bus.publish(EVENT_FADER, index, event)
+    await asyncio.sleep(0.01)
+
+
+def run_queued(overflow: str, events: list[tuple[int, int]], maxsize: int = 2):
+    async def scenario():
+        bus = EventBus()
+        seen = []
+        subscription = bus.subscribe(EVENT_FADER, seen.append, mode=MODE_TASK, maxsize=maxsize, overflow=overflow)
+        await publish_then_drain(bus, events)
+        bus.close()
+        return seen, subscription
+
+    return asyncio.run(scenario())
+
+
+def test_drop_oldest_keeps_the_latest_events():
+    seen, subscription = run_queued(OVERFLOW_DROP_OLDEST, [(0, n) for n in range(5)])
+
+    assert seen == [3, 4]
+    assert (subscription.delivered, subscription.dropped, subscription.coalesced) == (2, 3, 0)
+
+
+def test_drop_newest_keeps_the_earliest_events():
+    seen, subscription = run_queued(OVERFLOW_DROP_NEWEST, [(0, n) for n in range(5)])
+
+    assert seen == [0, 1]
+    assert (subscription.delivered, subscription.dropped, subscription.coalesced) == (2, 3, 0)
+
+
+def test_coalesce_keeps_the_latest_per_control():
+    seen, subscription = run_queued(OVERFLOW_COALESCE, [(0, "a"), (1, "b"), (0, "c"), (2, "d")])
+
+    # 0 is replaced in place, 2 finds the queue full of other controls
+    assert seen == ["c", "b"]
+    assert (subscription.delivered, subscription.dropped, subscription.coalesced) == (2, 1, 1)
+
+
+def test_stats():
+    seen, subscription = run_queued(OVERFLOW_DROP_OLDEST, [(0, n) for n in range(3)])
+    stats = subscription.stats()
+
+    assert stats["mode"] == MODE_TASK
+    assert stats["controls"] == 9
+    assert (stats["delivered"], stats["pending"], stats["dropped"], stats["errors"]) == (2, 0, 1, 0)
+    assert stats["max_latency"] >= stats["mean_latency"] > 0
+
+
+def test_thread_handler_errors_are_counted():
+    async def scenario():
+        bus = EventBus()
+
+        def fail(event):
+            raise RuntimeError(event)
+
+        subscription = bus.subscribe(EVENT_BUTTON, fail, controls="Mute 1", mode=MODE_THREAD)
+        await bus.publish(EVENT_BUTTON, 0x10, "boom")
+        await asyncio.sleep(0.05)
+        bus.close()
+        return subscription
+
+    subscription = asyncio.run(scenario())
+    assert subscription.errors == 1
+    assert isinstance(subscription.last_error, RuntimeError)
+
+
+def test_unsubscribed_mid_publish_starts_no_worker():
+    async def scenario():
+        bus = EventBus()
+        seen = []
+        queued = None
+
+        async def drop_the_next(event):
+            bus.unsubscribe(queued)
+
+        bus.subscribe(EVENT_FADER, drop_the_next, controls=0)
+        queued = bus.subscribe(EVENT_FADER, seen.append, controls=0, mode=MODE_TASK)
+
+        before = asyncio.all_tasks()
+        await bus.publish(EVENT_FADER, 0, 1)
+        started = asyncio.all_tasks() - before
+        await asyncio.sleep(0.01)
+        bus.close()
+        return queued, started, seen
+
+    queued, started, seen = asyncio.run(scenario())
+    assert queued.worker is None
+    assert not started
+    assert seen == []
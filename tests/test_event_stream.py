@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+
+from pymcu.helpers.event_bus import EVENT_BUTTON, EVENT_FADER
+from pymcu.helpers.event_stream import EventLog
+
+
+def test_overflow_skips_to_the_oldest_held_event():
+    async def scenario():
+        log = EventLog(capacity=4)
+        stream = log.stream(max_batch=10, max_latency=0)
+        for n in range(10):
+            log.append(EVENT_FADER, n)
+        batch = await stream.__anext__()
+        stream.close()
+        return batch, stream
+
+    batch, stream = asyncio.run(scenario())
+    assert batch == [6, 7, 8, 9]
+    assert stream.dropped == 6
+    assert stream.stats()["delivered"] == 4
+
+
+def test_dropped_events_are_counted_once():
+    async def scenario():
+        log = EventLog(capacity=4)
+        stream = log.stream(max_batch=2, max_latency=0)
+        for n in range(6):
+            log.append(EVENT_FADER, n)
+        first = await stream.__anext__()
+        second = await stream.__anext__()
+        log.append(EVENT_FADER, 6)
+        third = await stream.__anext__()
+        stream.close()
+        return [first, second, third], stream
+
+    batches, stream = asyncio.run(scenario())
+    assert batches == [[2, 3], [4, 5], [6]]
+    assert stream.dropped == 2
+    assert stream.stats()["pending"] == 0
+
+
+def test_streams_only_see_later_events_and_their_kinds():
+    async def scenario():
+        log = EventLog()
+        log.append(EVENT_FADER, "ignored, no streams")
+        faders = log.stream(kinds=[EVENT_FADER], max_latency=0)
+        everything = log.stream(max_latency=0)
+        log.append(EVENT_BUTTON, "b")
+        log.append(EVENT_FADER, "f")
+        result = await faders.__anext__(), await everything.__anext__()
+        faders.close()
+        everything.close()
+        return log, result
+
+    log, (faders, everything) = asyncio.run(scenario())
+    assert faders == ["f"]
+    assert everything == ["b", "f"]
+    # Nothing is stored before the first stream opens
+    assert log.head == 2
+
+
+def test_batch_waits_up_to_max_latency():
+    async def scenario():
+        log = EventLog()
+        stream = log.stream(max_batch=8, max_latency=0.02)
+
+        async def producer():
+            for n in range(3):
+                log.append(EVENT_FADER, n)
+                await asyncio.sleep(0.005)
+
+        asyncio.create_task(producer())
+        batch = await stream.__anext__()
+        stream.close()
+        return batch
+
+    assert asyncio.run(scenario()) == [0, 1, 2]
+
+
+def test_close_ends_iteration():
+    async def scenario():
+        log = EventLog()
+        batches = []
+
+        async with log.stream(max_latency=0) as stream:
+            log.append(EVENT_FADER, 1)
+            async for batch in stream:
+                batches.append(batch)
+                stream.close()
+        return batches, log
+
+    batches, log = asyncio.run(scenario())
+    assert batches == [[1]]
+    assert not log._streams
+
+
+def test_unknown_kind_raises():
+    with pytest.raises(ValueError):
+        EventLog().stream(kinds=["nope"])
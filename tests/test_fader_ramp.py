@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from pymcu.helpers.managed_fader import (
+    ManagedFader, FaderUpdateChannel, FADER_MAX, RAMP_LINEAR, RAMP_EXPONENTIAL, RAMP_S_CURVE
+)
+from pymcu.messages.button import ButtonPressEvent
+
+
+def ramped(start: int = 0, target: int = 1000, duration: float = 1.0, curve: str = RAMP_LINEAR) -> ManagedFader:
+    fader = ManagedFader(index=0, latched_value=start)
+    fader.ramp_to(target, duration, curve=curve, now=0.0)
+    return fader
+
+
+def test_linear_interpolation():
+    fader = ramped()
+
+    positions = []
+    for now in (0.25, 0.5, 0.75):
+        assert fader.step(now)
+        positions.append(fader.latched_value)
+
+    assert positions == [250, 500, 750]
+
+
+@pytest.mark.parametrize("curve", [RAMP_EXPONENTIAL, RAMP_S_CURVE])
+def test_curves_keep_their_end_points(curve):
+    fader = ramped(curve=curve)
+
+    fader.step(0.0)
+    assert fader.latched_value == 0
+    fader.step(0.5)
+    middle = fader.latched_value
+    fader.step(1.0)
+
+    assert fader.latched_value == 1000
+    assert 0 < middle < 1000
+    if curve == RAMP_S_CURVE:
+        assert middle == 500
+    else:
+        assert middle < 500
+
+
+def test_reaches_the_final_position_and_stops():
+    fader = ramped()
+
+    assert fader.step(2.0)
+    assert fader.latched_value == 1000
+    assert fader.ramp is None
+    assert not fader.step(3.0)
+
+
+def test_unchanged_frames_are_not_sent():
+    fader = ramped(target=2)
+
+    assert fader.step(0.1) is False
+    assert fader.ramp is not None
+
+
+def test_touch_cancels_the_ramp_where_it_is():
+    fader = ramped()
+    fader.step(0.5)
+
+    fader.touch(ButtonPressEvent(index=0x68, state=0x7F))
+
+    assert fader.ramp is None
+    assert not fader.step(1.0)
+    assert fader.latched_value == 500
+
+
+def test_new_target_starts_from_the_current_position():
+    fader = ramped()
+    fader.step(0.5)
+
+    fader.ramp_to(0, 0.5, now=0.5)
+    fader.step(0.75)
+
+    assert fader.latched_value == 250
+    fader.step(1.0)
+    assert fader.latched_value == 0
+
+
+def test_set_position_cancels_the_ramp():
+    fader = ramped()
+    fader.step(0.5)
+
+    fader.set_position(100)
+
+    assert fader.ramp is None
+    assert not fader.step(1.0)
+    assert fader.latched_value == 100
+
+
+def test_target_is_clamped_and_curve_checked():
+    fader = ramped(target=FADER_MAX + 100)
+    fader.step(1.0)
+    assert fader.latched_value == FADER_MAX
+
+    with pytest.raises(ValueError):
+        fader.ramp_to(0, 1.0, curve="bounce")
+
+
+def test_ramp_wakes_the_motor_clock():
+    channel = FaderUpdateChannel()
+    fader = ManagedFader(index=0, channel=channel)
+
+    fader.ramp_to(1000, 1.0)
+
+    assert channel.ramps.is_set()
+
+
+def test_device_ramp_reaches_its_target(run_device):
+    async def scenario(surface, device):
+        moves = []
+        surface.on_receive = lambda message: moves.append(message) if message[0] == 0xE2 else None
+
+        await asyncio.sleep(0.01)
+        device.ramp_fader(2, 0x2000, 0.1)
+        await asyncio.sleep(0.2)
+        return surface, moves
+
+    surface, moves = run_device(scenario, require_connection=False)
+    assert surface.fader_positions[2] == 0x2000
+    # Intermediate frames from the motor clock, not a single jump
+    assert len(moves) > 3
@@ -0,0 +1,115 @@
+import asyncio
+
+from pymcu.helpers.fader_throttle import FaderThrottle
+from pymcu.messages.fader import FaderMoveEvent
+
+
+def move(position: int, index: int = 0) -> FaderMoveEvent:
+    return FaderMoveEvent(index=index, position=position)
+
+
+def test_burst_is_limited_and_latest_wins():
+    async def scenario():
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event.position)
+
+        throttle = FaderThrottle(deliver, max_rate=50)
+        for position in range(100):
+            await throttle.offer(move(position))
+        await asyncio.sleep(0.05)
+        return delivered, throttle
+
+    delivered, throttle = asyncio.run(scenario())
+    assert delivered == [0, 99]
+    assert throttle.coalesced == 98
+
+
+def test_release_delivers_final_value_last():
+    async def scenario():
+        delivered = []
+
+        async def deliver(event):
+            # Slow consumer, so the held value is still mid-delivery when the fader is released
+            await asyncio.sleep(0.005)
+            delivered.append(event.position)
+
+        throttle = FaderThrottle(deliver, max_rate=100)
+        await throttle.offer(move(1))
+        await throttle.offer(move(2))
+        while not throttle._flushing[0]:
+            await asyncio.sleep(0.001)
+        await throttle.offer(move(3))
+        await throttle.release(0)
+        await asyncio.sleep(0.05)
+        return delivered
+
+    assert asyncio.run(scenario()) == [1, 2, 3]
+
+
+def test_release_drops_waiting_flush():
+    async def scenario():
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event.position)
+
+        throttle = FaderThrottle(deliver, max_rate=10)
+        await throttle.offer(move(1))
+        await throttle.offer(move(2))
+        await throttle.release(0)
+        await asyncio.sleep(0.15)
+        return delivered
+
+    assert asyncio.run(scenario()) == [1, 2]
+
+
+def test_release_sends_nothing_when_up_to_date():
+    async def scenario():
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event.position)
+
+        throttle = FaderThrottle(deliver)
+        await throttle.offer(move(5))
+        await throttle.release(0)
+        return delivered
+
+    assert asyncio.run(scenario()) == [5]
+
+
+def test_deadband_filters_jitter():
+    async def scenario():
+        delivered = []
+
+        async def deliver(event):
+            delivered.append(event.position)
+
+        throttle = FaderThrottle(deliver, max_rate=1000, deadband=4)
+        await throttle.offer(move(100))
+        await asyncio.sleep(0.002)
+        await throttle.offer(move(102))
+        await asyncio.sleep(0.002)
+        await throttle.offer(move(110))
+        return delivered, throttle.filtered
+
+    assert asyncio.run(scenario()) == ([100, 110], 1)
+
+
+def test_flush_errors_are_kept():
+    async def scenario():
+        async def deliver(event):
+            if event.position == 2:
+                raise RuntimeError("boom")
+
+        throttle = FaderThrottle(deliver, max_rate=100)
+        await throttle.offer(move(1))
+        await throttle.offer(move(2))
+        await asyncio.sleep(0.05)
+        return throttle
+
+    throttle = asyncio.run(scenario())
+    assert throttle.errors == 1
+    assert isinstance(throttle.last_error, RuntimeError)
@@ -0,0 +1,49 @@
+import asyncio
+
+from pymcu.helpers.managed_fader import ManagedFader, FaderUpdateChannel
+
+
+def test_channel_collects_every_dirty_fader_in_one_wake():
+    async def scenario():
+        channel = FaderUpdateChannel()
+        faders = [ManagedFader(index=i, channel=channel) for i in range(4)]
+
+        for position in range(100):
+            faders[0].set_position(position)
+            faders[3].set_position(position * 2)
+        first = await channel.wait()
+
+        faders[1].set_position(5)
+        second = await channel.wait()
+        return first, second, channel.event.is_set()
+
+    first, second, pending = asyncio.run(scenario())
+    assert first == {0, 3}
+    assert second == {1}
+    assert not pending
+
+
+def test_device_sends_the_latest_value_per_fader_with_bounded_tasks(run_device):
+    async def scenario(surface, device):
+        updates = []
+        device.on_managed_fader_event = lambda fader: updates.append((fader.index, fader.latched_value))
+        await asyncio.sleep(0.01)
+        baseline = len(asyncio.all_tasks())
+
+        task_counts = []
+        for burst in range(50):
+            for position in range(20):
+                for fader in device.faders:
+                    fader.set_position(burst * 20 + position)
+            await asyncio.sleep(0)
+            task_counts.append(len(asyncio.all_tasks()))
+        await asyncio.sleep(0.02)
+        return updates, baseline, task_counts, list(surface.fader_positions)
+
+    updates, baseline, task_counts, positions = run_device(scenario, require_connection=False)
+    # Each burst wakes the producer once, which only sees the last of its 20 positions per fader
+    assert len(updates) == 50 * len(positions)
+    assert {position for _, position in updates} == {burst * 20 + 19 for burst in range(50)}
+    assert positions == [999] * len(positions)
+    # No task per update or per fader, however many updates go through
+    assert max(task_counts) <= baseline
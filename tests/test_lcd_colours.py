@@ -0,0 +1,55 @@
+import asyncio
+
+import pytest
+
+from pymcu.messages.sysex import UpdateLCDColour, LCD_RED, LCD_BLUE, LCD_WHITE
+from pymcu.helpers.virtual_device import VirtualMCU
+
+
+def colour_messages(surface: VirtualMCU) -> list:
+    sent = []
+    surface.on_receive = lambda message: sent.append(list(message[6:14])) if message[:6] == [0xF0, 0, 0, 0x66, 0x14, UpdateLCDColour.command] else None
+    return sent
+
+
+def test_changes_within_a_tick_are_one_message(run_device):
+    async def scenario(surface, device):
+        sent = colour_messages(surface)
+
+        for index in range(8):
+            device.update_lcd_colour(index, LCD_RED)
+        await asyncio.sleep(0.05)
+        return sent
+
+    assert run_device(scenario, connect=True) == [[LCD_RED] * 8]
+
+
+def test_unchanged_palette_sends_nothing(run_device):
+    async def scenario(surface, device):
+        sent = colour_messages(surface)
+
+        device.update_lcd_colours([LCD_WHITE] * 8)
+        device.update_lcd_colour(0, LCD_BLUE)
+        device.update_lcd_colour(0, LCD_WHITE)
+        await asyncio.sleep(0.05)
+        return sent
+
+    assert run_device(scenario, connect=True) == []
+
+
+def test_bad_palette_is_rejected_up_front(run_device):
+    async def scenario(surface, device):
+        with pytest.raises(ValueError):
+            device.update_lcd_colours([LCD_RED] * 2)
+        with pytest.raises(ValueError):
+            device.update_lcd_colours([0x20] * 8)
+
+        # The flush is still running afterwards
+        sent = colour_messages(surface)
+        device.update_lcd_colour(3, LCD_RED)
+        await asyncio.sleep(0.05)
+        return sent, device.display_flush_errors
+
+    sent, errors = run_device(scenario, connect=True)
+    assert sent == [[LCD_WHITE] * 3 + [LCD_RED] + [LCD_WHITE] * 4]
+    assert errors == 0
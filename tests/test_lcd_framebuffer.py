@@ -0,0 +1,72 @@
+from pymcu.helpers.lcd_framebuffer import LCDFramebuffer, LCD_LINE_WIDTH, LCD_SIZE
+
+
+def test_first_flush_sends_written_text():
+    lcd = LCDFramebuffer()
+    lcd.write_text(0, "Kick")
+
+    messages = lcd.flush()
+
+    assert len(messages) == 1
+    assert messages[0].display_offset == 0
+    assert bytes(messages[0].raw_text) == b"Kick"
+
+
+def test_unchanged_text_sends_nothing():
+    lcd = LCDFramebuffer()
+    lcd.write_text(0, "Kick")
+    lcd.flush()
+
+    lcd.write_text(0, "Kick")
+
+    assert lcd.flush() == []
+
+
+def test_only_changed_span_is_sent():
+    lcd = LCDFramebuffer()
+    lcd.write_text(0, "Vol  -12.0")
+    lcd.flush()
+
+    lcd.write_text(0, "Vol  -11.5")
+    messages = lcd.flush()
+
+    assert len(messages) == 1
+    assert messages[0].display_offset == 7
+    assert bytes(messages[0].raw_text) == b"1.5"
+
+
+def test_close_spans_are_merged():
+    lcd = LCDFramebuffer()
+    lcd.write_text(0, "abcdefgh")
+    lcd.flush()
+
+    lcd.write_text(0, "Xbcdefgh")
+    lcd.write_text(4, "Y")
+    messages = lcd.flush()
+
+    assert len(messages) == 1
+    assert bytes(messages[0].raw_text) == b"XbcdY"
+
+
+def test_distant_spans_are_separate_messages():
+    lcd = LCDFramebuffer()
+    lcd.write_text(0, " " * LCD_SIZE)
+    lcd.flush()
+
+    lcd.write_text(0, "A")
+    lcd.write_text(LCD_LINE_WIDTH, "B")
+
+    assert [message.display_offset for message in lcd.flush()] == [0, LCD_LINE_WIDTH]
+
+
+def test_resync_sends_both_lines():
+    lcd = LCDFramebuffer()
+    lcd.write_text(LCD_LINE_WIDTH, "Lower")
+    lcd.flush()
+
+    messages = lcd.resync()
+
+    assert [message.display_offset for message in messages] == [0, LCD_LINE_WIDTH]
+    assert lcd.line(1).startswith("Lower")
+    assert lcd.flush() == []
+
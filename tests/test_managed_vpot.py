@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from pymcu.helpers.managed_vpot import ManagedVPot, ring_table, VPOT_ACCEL_NONE, VPOT_ACCEL_POWER, RING_POSITIONS
+from pymcu.messages.vpot import VPotMoveEvent, SetVPotLED, RING_MODE_SINGLE, RING_MODE_FILL_LEFT, RING_MODE_WIDTH
+
+
+def turn(vpot: ManagedVPot, *deltas: int) -> None:
+    for delta in deltas:
+        vpot.accumulate(VPotMoveEvent(index=vpot.index, delta=delta))
+
+
+def test_deltas_in_one_tick_are_one_change():
+    vpot = ManagedVPot(index=0)
+    turn(vpot, 1, 1, 1, -1, 2)
+
+    assert vpot.apply()
+    assert vpot.value == pytest.approx(0.04)
+    assert vpot.changes == 1
+    assert not vpot.apply()
+
+
+def test_value_is_clamped_to_range():
+    vpot = ManagedVPot(index=0, minimum=-1.0, maximum=1.0, step=0.5)
+    turn(vpot, 10)
+    vpot.apply()
+
+    assert vpot.value == 1.0
+    turn(vpot, 1)
+    assert not vpot.apply()
+
+
+def test_acceleration_curves():
+    fine = ManagedVPot(index=0, acceleration=VPOT_ACCEL_NONE)
+    fast = ManagedVPot(index=1, acceleration=VPOT_ACCEL_POWER)
+    turn(fine, 4)
+    turn(fast, 4)
+    fine.apply()
+    fast.apply()
+
+    assert fine.value == pytest.approx(0.01)
+    assert fast.value == pytest.approx(0.08)
+
+
+@pytest.mark.parametrize("mode", list(RING_POSITIONS))
+def test_ring_table_matches_set_vpot_led(mode):
+    for position, ring in enumerate(ring_table(mode, True)):
+        assert ring == SetVPotLED(index=0, mode=mode, value=position, extra=True).encode()[2]
+
+
+def test_ring_is_off_by_default():
+    vpot = ManagedVPot(index=0, value=0.5)
+
+    assert vpot.render() is None
+
+
+def test_ring_only_rendered_when_it_changes():
+    vpot = ManagedVPot(index=0, show_ring=True, mode=RING_MODE_FILL_LEFT)
+
+    assert vpot.render() == ring_table(RING_MODE_FILL_LEFT, False)[1]
+    vpot.set_value(0.01)
+    assert vpot.render() is None
+    vpot.set_value(1.0)
+    assert vpot.render() == ring_table(RING_MODE_FILL_LEFT, False)[RING_POSITIONS[RING_MODE_FILL_LEFT]]
+
+
+def test_ring_style_change_rerenders():
+    vpot = ManagedVPot(index=0, show_ring=True, value=1.0)
+    vpot.render()
+    vpot.set_ring_style(RING_MODE_WIDTH)
+
+    assert vpot.render() == ring_table(RING_MODE_WIDTH, False)[RING_POSITIONS[RING_MODE_WIDTH]]
+
+
+def test_device_rings_are_opt_in(run_device):
+    async def scenario(surface, device):
+        rings = []
+        surface.on_receive = lambda message: rings.append(message[1] & 0x0F) if message[0] == 0xB0 and 0x30 <= message[1] < 0x38 else None
+        changes = []
+        device.on_managed_vpot_event = lambda vpot: changes.append(vpot.index)
+
+        device.configure_vpot(1, mode=RING_MODE_SINGLE)
+        for _ in range(20):
+            surface.turn_vpot(0, 1)
+            surface.turn_vpot(1, 1)
+        await asyncio.sleep(0.05)
+        return rings, changes
+
+    rings, changes = run_device(scenario, connect=True)
+    # Pot 0 isn't configured, so only pot 1 draws: once when configured, once after the spin
+    assert rings == [1, 1]
+    assert sorted(changes) == [0, 1]
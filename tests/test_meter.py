@@ -0,0 +1,132 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pymcu.messages import meter
+from pymcu.messages.meter import UpdateMeter, MeterFrameEncoder, METER_LUT, METER_LUT_FLOOR, meter_nibble
+from pymcu.messages.meter_audio import block_meter_levels, block_levels, METER_MODE_RMS
+from pymcu.messages.meter_ballistics import METER_FLOOR_DB
+
+# Whole and fractional dB across the scale, plus the overload codes and values around them
+LEVELS = [float("nan"), -200.0, -61.0, -60.5, -60.0, -45.25, -14.0, -13.9, -2.0, -0.5, 0.0, 1e-9, 3.0, 253.5, 254.0, 254.5, 255.0, 300.0]
+
+
+def test_lut_matches_thresholds():
+    for db in range(METER_LUT_FLOOR, 1):
+        expected = next(nibble for nibble, condition in UpdateMeter.METER_THRESHOLDS.items() if condition(db))
+        assert METER_LUT[db - METER_LUT_FLOOR] == expected
+
+
+@pytest.mark.parametrize("level", LEVELS)
+def test_vectorised_encoder_matches_meter_nibble(level):
+    encoder = MeterFrameEncoder(1)
+
+    assert encoder.encode(np.array([level])) == bytes([meter_nibble(level)])
+
+
+def test_fallback_encoder_matches_vectorised(monkeypatch):
+    levels = LEVELS[:8]
+    vectorised = MeterFrameEncoder().encode(levels)
+
+    monkeypatch.setattr(meter, "np", None)
+    assert MeterFrameEncoder().encode(levels) == vectorised
+
+
+def test_nan_is_silence_on_both_paths(monkeypatch):
+    assert meter_nibble(float("nan")) == 0x00
+    assert MeterFrameEncoder(2).encode([float("nan"), 0.0]) == bytes([0x00, 1 << 4 | 0x0C])
+
+    monkeypatch.setattr(meter, "np", None)
+    assert MeterFrameEncoder(2).encode([float("nan"), 0.0]) == bytes([0x00, 1 << 4 | 0x0C])
+
+
+def test_unchanged_strips_are_skipped():
+    encoder = MeterFrameEncoder()
+    encoder.encode([-10.0] * 8)
+
+    assert encoder.encode([-10.0] * 7 + [0.0]) == bytes([7 << 4 | 0x0C])
+
+
+def test_fewer_levels_update_the_first_strips():
+    encoder = MeterFrameEncoder()
+    encoder.encode([-61.0] * 8)
+
+    assert encoder.encode([0.0, 0.0]) == bytes([0x0C, 1 << 4 | 0x0C])
+
+
+def test_too_many_levels_raise():
+    with pytest.raises(ValueError):
+        MeterFrameEncoder(2).encode([0.0] * 3)
+
+
+def test_stereo_block_levels():
+    block = np.zeros((256, 2), dtype=np.float32)
+    block[:, 0] = 1.0
+    block[:, 1] = 0.5
+
+    levels = block_meter_levels(block, n_channels=2)
+
+    assert levels.shape == (2,)
+    assert MeterFrameEncoder().encode(levels) == bytes([0x0C, 1 << 4 | meter_nibble(levels[1])])
+
+
+def test_device_sends_encoded_meter_bytes(run_device):
+    async def scenario(surface, device):
+        sent = []
+        surface.on_receive = lambda message: sent.append(list(message)) if message[0] == 0xD0 else None
+
+        device.update_meters(np.array([0.0, -10.0, 254.0]))
+        device.update_meters(np.array([0.0, -20.0, 254.0]))
+        await asyncio.sleep(0.02)
+        return surface, sent
+
+    surface, sent = run_device(scenario, require_connection=False)
+    # The second frame only changes strip 1, which replaces the pending first value
+    assert sent == [[0xD0, 0x0C], [0xD0, 0x15], [0xD0, 0x2E]]
+    assert list(surface.surface.meters[:2]) == [0x0C, 0x05]
+    assert surface.surface.meter_overloads[2]
+
+
+def test_block_shape_sets_the_channel_count():
+    block = np.zeros((256, 2), dtype=np.float32)
+    block[:, 0] = 0.5
+
+    interleaved = block_meter_levels(block)
+    planar = block_meter_levels(block.T.copy(), interleaved=False)
+
+    assert interleaved.shape == planar.shape == (2,)
+    assert interleaved == pytest.approx(planar)
+    assert interleaved[1] == pytest.approx(METER_FLOOR_DB)
+
+
+def test_block_shape_mismatch_raises():
+    with pytest.raises(ValueError):
+        block_meter_levels(np.zeros((256, 2)), n_channels=8)
+    with pytest.raises(ValueError):
+        block_meter_levels(np.zeros((2, 256)), n_channels=2)
+    with pytest.raises(ValueError):
+        block_meter_levels(np.zeros((2, 2, 2)))
+
+
+def test_flat_block_is_split_into_channels():
+    block = np.tile(np.array([1.0, 0.0, 0.5], dtype=np.float32), 64)
+
+    levels = block_meter_levels(block, n_channels=3)
+
+    assert levels[0] == pytest.approx(0.0)
+    assert levels[1] == pytest.approx(METER_FLOOR_DB)
+    assert levels[2] == pytest.approx(20 * np.log10(0.5))
+
+
+def test_rms_mode_and_integer_pcm():
+    block = np.full((128, 1), 2 ** 14, dtype=np.int16)
+
+    peak, rms = block_levels(block)
+
+    assert block_meter_levels(block, mode=METER_MODE_RMS) == pytest.approx(rms)
+    assert peak == pytest.approx(rms)
+    assert rms[0] == pytest.approx(20 * np.log10(0.5))
+    with pytest.raises(ValueError):
+        block_meter_levels(block, mode="loudness")
@@ -0,0 +1,94 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from pymcu.messages.meter import meter_nibble
+from pymcu.messages.meter_ballistics import MeterBallistics, METER_FLOOR_DB, METER_OVERLOAD_SET, METER_OVERLOAD_CLEAR
+
+
+def levels_by_strip(messages) -> dict[int, int]:
+    return {message.index: message.data_byte & 0x0F for message in messages}
+
+
+def test_instant_attack_shows_the_peak_at_once():
+    ballistics = MeterBallistics(n_channels=2, attack=0.0)
+    ballistics.push([-10.0, -30.0])
+    ballistics.push([-20.0, -5.0])
+
+    messages = ballistics.frame(now=0.0)
+
+    assert ballistics.level.tolist() == [-10.0, -5.0]
+    assert levels_by_strip(messages) == {0: meter_nibble(-10.0), 1: meter_nibble(-5.0)}
+
+
+def test_slow_attack_rises_gradually():
+    ballistics = MeterBallistics(n_channels=1, attack=0.1, frame_rate=100)
+    ballistics.frame(now=0.0)
+
+    ballistics.push([0.0])
+    ballistics.frame(now=0.01)
+    first = ballistics.level[0]
+    ballistics.push([0.0])
+    ballistics.frame(now=0.02)
+
+    expected = METER_FLOOR_DB * np.exp(-0.1)
+    assert first == pytest.approx(expected)
+    assert first < ballistics.level[0] < 0.0
+
+
+def test_peak_is_held_then_released():
+    ballistics = MeterBallistics(n_channels=1, peak_hold=0.5, release=0.1)
+    ballistics.push([-6.0])
+    ballistics.frame(now=0.0)
+
+    # Silence during the hold leaves the level where it was
+    assert ballistics.frame(now=0.4) == []
+    assert ballistics.level[0] == -6.0
+
+    ballistics.frame(now=0.6)
+    released = ballistics.level[0]
+    assert released == pytest.approx(-6.0 + (METER_FLOOR_DB + 6.0) * (1 - np.exp(-2.0)))
+
+    ballistics.frame(now=2.0)
+    assert ballistics.level[0] < released
+
+
+def test_new_peak_restarts_the_hold():
+    ballistics = MeterBallistics(n_channels=1, peak_hold=0.5, release=0.1)
+    ballistics.push([-6.0])
+    ballistics.frame(now=0.0)
+    ballistics.push([-6.0])
+    ballistics.frame(now=0.4)
+
+    ballistics.frame(now=0.8)
+
+    assert ballistics.level[0] == -6.0
+
+
+def test_overload_set_then_cleared_after_hold():
+    ballistics = MeterBallistics(n_channels=1, overload_threshold=0.0, overload_hold=1.0)
+    ballistics.push([3.0])
+    messages = ballistics.frame(now=0.0)
+
+    assert messages[0].data_byte == meter_nibble(METER_OVERLOAD_SET)
+    # The level itself never encodes as an overload code
+    assert messages[1].data_byte == meter_nibble(1.0)
+
+    assert all(message.data_byte & 0x0F < 0x0E for message in ballistics.frame(now=0.5))
+    overloads = [message for message in ballistics.frame(now=1.5) if message.data_byte & 0x0F >= 0x0E]
+    assert [message.data_byte for message in overloads] == [meter_nibble(METER_OVERLOAD_CLEAR)]
+    assert not ballistics.overload[0]
+
+
+def test_unchanged_frames_send_nothing():
+    ballistics = MeterBallistics(n_channels=8, release=0.0, peak_hold=0.0)
+    ballistics.push([-10.0] * 8)
+    ballistics.frame(now=0.0)
+    ballistics.push([-10.0] * 8)
+
+    assert ballistics.frame(now=0.1) == []
+
+
+def test_push_meter_levels_without_ballistics(device):
+    with pytest.raises(RuntimeError):
+        device.push_meter_levels([0.0] * 8)
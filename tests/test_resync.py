@@ -0,0 +1,48 @@
+import asyncio
+
+from pymcu.helpers.tx_scheduler import MIDI_DIN_BYTES_PER_SECOND
+from pymcu.messages.sysex import UpdateLCD
+
+
+def test_resync_restores_a_blank_surface(run_device):
+    async def scenario(surface, device):
+        device.set_led(0x10, 1)
+        device.set_fader(2, 0x1000)
+        device.set_vpot_led(3, mode=1, value=5)
+        device.update_lcd_raw("Hello")
+        device.update_timecode("12")
+        await asyncio.sleep(0.05)
+
+        surface.unplug()
+        surface.plug()
+        device.resync_surface()
+        await asyncio.sleep(0.05)
+        return surface, device
+
+    surface, device = run_device(scenario, connect=True)
+    assert surface.surface.leds[0x10] == 1
+    assert surface.surface.faders[2] == 0x1000
+    assert surface.surface.vpot_rings[3] == 0x15
+    assert surface.surface.lcd_line(0).startswith("Hello")
+    assert surface.surface.timecode == device.timecode.cells
+    assert any(surface.surface.timecode)
+    assert device.resync_count == 2
+    assert device.last_resync_time is not None
+
+
+def test_resync_time_excludes_traffic_queued_after_it(run_device):
+    async def scenario(surface, device):
+        # Let the resync from connecting drain at DIN rate first
+        await asyncio.sleep(0.15)
+
+        device.last_resync_time = None
+        device.resync_surface()
+        # About a second of display traffic at DIN rate, queued right behind the resync
+        for _ in range(50):
+            device.tx_queue.put_nowait(UpdateLCD(display_offset=0, text="x" * 56))
+        await asyncio.sleep(0.3)
+        return device
+
+    device = run_device(scenario, connect=True, tx_bytes_per_second=MIDI_DIN_BYTES_PER_SECOND)
+    assert device.last_resync_time is not None
+    assert device.last_resync_time < 0.3
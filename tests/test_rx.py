@@ -0,0 +1,63 @@
+import asyncio
+import threading
+
+
+class CountingEvent(asyncio.Event):
+    def __init__(self):
+        super().__init__()
+        self.sets = 0
+
+    def set(self):
+        self.sets += 1
+        super().set()
+
+
+def test_callback_thread_bursts_are_drained_in_order(run_device):
+    n_messages = 2000
+
+    async def scenario(surface, device):
+        device._rx_ready = CountingEvent()
+        deltas = []
+        device.on_vpot_event = lambda event: deltas.append(event.delta)
+        await asyncio.sleep(0.01)
+
+        # rtmidi calls back on its own thread, not the event loop's
+        def midi_thread():
+            for i in range(n_messages):
+                surface.midi_in.deliver([0xB0, 0x10, 1 + i % 15])
+
+        thread = threading.Thread(target=midi_thread)
+        thread.start()
+        while thread.is_alive() or device.rx_buffer:
+            await asyncio.sleep(0.001)
+        thread.join()
+        await asyncio.sleep(0.01)
+        return deltas, device._rx_ready.sets
+
+    deltas, wakeups = run_device(scenario, require_connection=False)
+    assert deltas == [1 + i % 15 for i in range(n_messages)]
+    # A wakeup already on its way covers everything buffered behind it
+    assert 1 <= wakeups < n_messages
+
+
+def test_failing_callback_does_not_stop_the_receive_loop(run_device, caplog):
+    async def scenario(surface, device):
+        presses = []
+
+        def on_button(event):
+            if event.index == 0x10:
+                raise RuntimeError("broken callback")
+            presses.append(event.index)
+
+        device.on_button_event = on_button
+        await asyncio.sleep(0.01)
+        surface.press(0x10)
+        surface.press(0x18)
+        await asyncio.sleep(0.02)
+        return device, presses
+
+    device, presses = run_device(scenario, require_connection=False)
+    assert presses == [0x18]
+    assert device.rx_handler_errors == 1
+    assert isinstance(device.last_rx_error, RuntimeError)
+    assert "ButtonPressEvent" in caplog.text
@@ -0,0 +1,104 @@
+import pytest
+
+from pymcu.helpers.scroll_wheel import (
+    ScrollWheel, WHEEL_ACCEL_NONE, WHEEL_ACCEL_LINEAR, WHEEL_ACCEL_QUADRATIC,
+    WHEEL_ACCEL_REFERENCE, WHEEL_IDLE_TIMEOUT
+)
+from pymcu.messages.vpot import ScrollWheelMoveEvent, SCROLL_WHEEL_CC
+
+CLOCKWISE = ScrollWheelMoveEvent.from_midi([0xB0, SCROLL_WHEEL_CC, 0x01])
+ANTICLOCKWISE = ScrollWheelMoveEvent.from_midi([0xB0, SCROLL_WHEEL_CC, 0x41])
+
+
+def spin(wheel: ScrollWheel, event: ScrollWheelMoveEvent, rate: float, count: int, start: float = 0.0) -> float:
+    """
+    Feed `count` detents at `rate` per second, returning the time of the last one
+    """
+    now = start
+    for n in range(count):
+        now = start + n / rate
+        wheel.feed(event, now=now)
+    return now
+
+
+def test_steady_speed_without_smoothing():
+    wheel = ScrollWheel(smoothing=0)
+    spin(wheel, CLOCKWISE, rate=100, count=5)
+
+    assert wheel.velocity == pytest.approx(100)
+
+
+def test_smoothing_converges_on_the_speed():
+    wheel = ScrollWheel(smoothing=0.05)
+    spin(wheel, CLOCKWISE, rate=100, count=3)
+    early = wheel.velocity
+    spin(wheel, CLOCKWISE, rate=100, count=50, start=0.03)
+
+    assert early < 100
+    assert wheel.velocity == pytest.approx(100, rel=0.01)
+
+
+def test_reversing_restarts_the_estimate():
+    wheel = ScrollWheel(smoothing=0)
+    last = spin(wheel, CLOCKWISE, rate=100, count=5)
+
+    wheel.feed(ANTICLOCKWISE, now=last + 0.01)
+
+    assert wheel.velocity == pytest.approx(-1 / WHEEL_IDLE_TIMEOUT)
+
+
+@pytest.mark.parametrize("acceleration, multiplier", [
+    (WHEEL_ACCEL_NONE, 1.0),
+    (WHEEL_ACCEL_LINEAR, 2.0),
+    (WHEEL_ACCEL_QUADRATIC, 2.0),
+])
+def test_acceleration_at_the_reference_speed(acceleration, multiplier):
+    wheel = ScrollWheel(smoothing=0, acceleration=acceleration)
+    last = spin(wheel, CLOCKWISE, rate=WHEEL_ACCEL_REFERENCE, count=4)
+
+    scrub = wheel.frame(now=last)
+
+    assert scrub.detents == 4
+    assert scrub.velocity == pytest.approx(WHEEL_ACCEL_REFERENCE)
+    assert scrub.delta == pytest.approx(4 * multiplier)
+    assert scrub.position == scrub.delta
+
+
+def test_quadratic_outgrows_linear_above_the_reference():
+    scrubs = {}
+    for acceleration in (WHEEL_ACCEL_LINEAR, WHEEL_ACCEL_QUADRATIC):
+        wheel = ScrollWheel(smoothing=0, acceleration=acceleration)
+        last = spin(wheel, CLOCKWISE, rate=2 * WHEEL_ACCEL_REFERENCE, count=4)
+        scrubs[acceleration] = wheel.frame(now=last)
+
+    assert scrubs[WHEEL_ACCEL_LINEAR].delta == pytest.approx(4 * 3.0)
+    assert scrubs[WHEEL_ACCEL_QUADRATIC].delta == pytest.approx(4 * 5.0)
+
+
+def test_sensitivity_scales_every_detent():
+    wheel = ScrollWheel(smoothing=0, acceleration=WHEEL_ACCEL_NONE, sensitivity=0.5)
+    last = spin(wheel, ANTICLOCKWISE, rate=100, count=4)
+
+    assert wheel.frame(now=last).delta == pytest.approx(-2.0)
+
+
+def test_overdue_detent_slows_then_stops():
+    wheel = ScrollWheel(smoothing=0)
+    last = spin(wheel, CLOCKWISE, rate=100, count=5)
+    wheel.frame(now=last)
+
+    slowed = wheel.frame(now=last + 0.1)
+    stopped = wheel.frame(now=last + WHEEL_IDLE_TIMEOUT + 0.01)
+
+    assert slowed.velocity == pytest.approx(10)
+    assert slowed.detents == 0 and slowed.delta == 0
+    assert stopped.velocity == 0
+    assert not wheel.moving
+    assert wheel.frame(now=last + 1.0) is None
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        ScrollWheel(rate=0)
+    with pytest.raises(ValueError):
+        ScrollWheel(acceleration="exponential")
@@ -0,0 +1,221 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from pymcu.helpers import session_log
+from pymcu.helpers.session_log import (
+    SessionRecorder, SessionLog, SessionReplayer, DIRECTION_RX, DIRECTION_TX,
+    INDEX_SUFFIX, LOG_HEADER, RECORD_HEADER, MAX_RECORD_DELTA
+)
+from pymcu.messages.sysex import HostConnectionError, MCU_HEADER, SOX, EOX
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """
+    Session clock for the recorder, set `clock.now` in seconds
+    """
+    clock = SimpleNamespace(now=0.0)
+    monkeypatch.setattr(session_log, "time", SimpleNamespace(perf_counter=lambda: clock.now, time=time.time))
+    return clock
+
+
+def record_session(path: str, clock, messages, index_interval: float = 1.0) -> None:
+    with SessionRecorder(path, index_interval=index_interval) as recorder:
+        for at, direction, message in messages:
+            clock.now = at
+            recorder.record(direction, message)
+
+
+SESSION = [
+    (0.0, DIRECTION_TX, [0xF0, 0x00, 0x00, 0x66, 0x14, 0x00, 0xF7]),
+    (0.5, DIRECTION_RX, [0x90, 0x10, 0x7F]),
+    (1.5, DIRECTION_RX, [0xE0, 0x00, 0x40]),
+    (2.5, DIRECTION_TX, [0x90, 0x10, 0x01]),
+    (3.5, DIRECTION_RX, [0xB0, 0x10, 0x41]),
+    (4.0, DIRECTION_RX, [0x90, 0x10, 0x00]),
+]
+
+
+def test_round_trip(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+
+    with SessionLog(path) as log:
+        records = [(t, d, list(data)) for t, d, data in log.records()]
+        duration = log.duration()
+
+    assert records == SESSION
+    assert duration == 4.0
+    # Header + one 7 byte record header per message, then the raw bytes
+    expected_size = LOG_HEADER.size + sum(RECORD_HEADER.size + len(m) for _, _, m in SESSION)
+    assert os.path.getsize(path) == expected_size
+
+
+def test_direction_filter(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+
+    with SessionLog(path) as log:
+        inbound = [list(data) for _, _, data in log.records(directions=(DIRECTION_RX,))]
+
+    assert inbound == [m for _, d, m in SESSION if d == DIRECTION_RX]
+
+
+@pytest.mark.parametrize("start, end", [(0.0, None), (1.5, None), (1.0, 3.0), (2.6, 3.5), (5.0, None)])
+def test_seek_matches_full_scan(tmp_path, clock, start, end):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+
+    with SessionLog(path) as log:
+        window = list(log.records(start, end))
+        assert len(log._index_times) > 1
+
+    expected = [
+        (t, d, bytes(m)) for t, d, m in SESSION
+        if t >= start and (end is None or t <= end)
+    ]
+    assert window == expected
+
+
+def test_index_is_rebuilt_without_sidecar(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+
+    with SessionLog(path) as log:
+        times, offsets = log._index_times.tolist(), log._index_offsets.tolist()
+        expected = list(log.records(1.0))
+
+    os.remove(path + INDEX_SUFFIX)
+    with SessionLog(path) as log:
+        assert log._index_times.tolist() == times
+        assert log._index_offsets.tolist() == offsets
+        assert list(log.records(1.0)) == expected
+
+
+def test_long_silence_is_bridged_by_gap_records(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    late = (MAX_RECORD_DELTA + 5_000_000) / 1e6
+    record_session(path, clock, [(0.0, DIRECTION_RX, [0x90, 0x10, 0x7F]), (late, DIRECTION_RX, [0x90, 0x10, 0x00])])
+
+    with SessionLog(path) as log:
+        records = list(log.records())
+
+    assert [t for t, _, _ in records] == [0.0, pytest.approx(late)]
+
+
+def test_truncated_final_record_is_ignored(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+    with open(path, "r+b") as f:
+        f.truncate(os.path.getsize(path) - 1)
+
+    with SessionLog(path) as log:
+        assert len(list(log.records())) == len(SESSION) - 1
+
+
+def test_not_a_session_log(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"\x00" * 64)
+
+    with pytest.raises(ValueError):
+        SessionLog(str(path))
+
+
+def test_replay_keeps_session_timing(tmp_path, clock, monkeypatch):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+    # The recorder's clock is faked, replay runs on the real one
+    monkeypatch.setattr(session_log, "time", time)
+
+    async def scenario():
+        arrivals = []
+        start = time.perf_counter()
+
+        async def handle(message):
+            arrivals.append((time.perf_counter() - start, message))
+
+        with SessionLog(path) as log:
+            replayer = SessionReplayer(log, handle, speed=10.0)
+            count = await replayer.run()
+        return count, arrivals, replayer
+
+    count, arrivals, replayer = asyncio.run(scenario())
+    inbound = [(t, m) for t, d, m in SESSION if d == DIRECTION_RX]
+
+    assert count == replayer.replayed == len(inbound)
+    assert [m for _, m in arrivals] == [m for _, m in inbound]
+    for (arrived, _), (at, _) in zip(arrivals, inbound):
+        assert arrived == pytest.approx(at / 10.0, abs=0.03)
+
+
+def test_replay_window_as_fast_as_possible(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+
+    async def scenario():
+        seen = []
+
+        async def handle(message):
+            seen.append(message)
+
+        with SessionLog(path) as log:
+            await SessionReplayer(log, handle, speed=None).run(start=1.0, end=3.5, directions=(DIRECTION_RX, DIRECTION_TX))
+        return seen
+
+    assert asyncio.run(scenario()) == [m for t, _, m in SESSION if 1.0 <= t <= 3.5]
+
+
+def test_replay_speed_must_be_positive(tmp_path, clock):
+    path = str(tmp_path / "session.log")
+    record_session(path, clock, SESSION)
+
+    with SessionLog(path) as log:
+        with pytest.raises(ValueError):
+            SessionReplayer(log, None, speed=0)
+
+
+def test_replay_leaves_the_live_connection_alone(tmp_path, run_device):
+    recorded = str(tmp_path / "recorded.log")
+    rerecorded = str(tmp_path / "rerecorded.log")
+
+    async def record(surface, device):
+        # Handshake, a button press, then the surface refusing the host
+        device.start_recording(recorded)
+        while not device.connected_status:
+            await asyncio.sleep(0.001)
+        surface.press(0x18)
+        surface.send(SOX + MCU_HEADER + [HostConnectionError.command] + [ord(x) for x in surface.serial_number] + EOX)
+        await asyncio.sleep(0.01)
+
+    run_device(record)
+
+    async def replay(surface, device):
+        device.start_recording(rerecorded)
+        presses = []
+        device.on_button_event = lambda event: presses.append(event.index)
+        sent = []
+        surface.on_receive = lambda message: sent.append(list(message))
+        before = device.connection.stats(), device.connection.last_heard
+
+        count = await device.replay_session(recorded, speed=None)
+        await asyncio.sleep(0.05)
+        device.stop_recording()
+        return count, presses, sent, before, (device.connection.stats(), device.connection.last_heard)
+
+    count, presses, sent, before, after = run_device(replay, connect=True)
+
+    with SessionLog(recorded) as log:
+        sysex = [data for _, _, data in log.records(directions=(DIRECTION_RX,)) if data[0] == 0xF0]
+    with SessionLog(rerecorded) as log:
+        inbound = list(log.records(directions=(DIRECTION_RX,)))
+
+    assert len(sysex) >= 3
+    assert count == len(sysex) + 1
+    assert presses == [0x18]
+    assert sent == []
+    assert after == before
+    assert inbound == []
@@ -0,0 +1,79 @@
+import asyncio
+
+from pymcu.helpers.surface_model import MCUSurfaceModel
+from pymcu.messages.sysex import UpdateLCD, UpdateLCDColour, LCD_RED
+from pymcu.messages.button import SetLED
+from pymcu.messages.vpot import SetVPotLED
+from pymcu.messages.fader import FaderMoveEvent
+
+
+def test_outbound_updates_host_state():
+    model = MCUSurfaceModel()
+
+    model.update(SetLED(index=0x10, state=2).encode())
+    model.update(FaderMoveEvent(index=3, position=0x207F).encode())
+    model.update(SetVPotLED(index=5, mode=1, value=6, extra=False).encode())
+    model.update([0xD0, 0x2E])
+    model.update([0xD0, 0x27])
+    model.update(UpdateLCD(display_offset=0, text="Hello").encode())
+    model.update(UpdateLCDColour(colours=[LCD_RED] * 8).encode())
+
+    assert model.leds[0x10] == 2
+    assert model.buttons[0x10] == 0
+    assert model.faders[3] == 0x207F
+    assert model.vpot_rings[5] == 0x16
+    assert (model.meters[2], model.meter_overloads[2]) == (7, 1)
+    assert model.lcd_line(0).startswith("Hello")
+    assert list(model.lcd_colours) == [LCD_RED] * 8
+    assert model.messages_applied == 7
+
+
+def test_inbound_updates_buttons_not_leds():
+    model = MCUSurfaceModel()
+
+    model.update([0x90, 0x10, 0x7F], outbound=False)
+    model.update([0xB0, 0x10, 0x41], outbound=False)
+
+    assert model.buttons[0x10] == 0x7F
+    assert model.leds[0x10] == 0
+    assert not any(model.vpot_rings)
+
+
+def test_truncated_messages_are_ignored():
+    model = MCUSurfaceModel()
+
+    for message in ([0x90, 0x10], [0xB0, 0x30], [0xD0], [0xE0, 0x7F], [0xF0, 0x00, 0xF7]):
+        model.update(message, outbound=False)
+        model.update(message)
+
+    assert model == MCUSurfaceModel()
+
+
+def test_copy_and_diff():
+    model = MCUSurfaceModel()
+    model.update(SetLED(index=0x10, state=1).encode())
+    snapshot = model.copy()
+
+    model.update(SetLED(index=0x18, state=1).encode())
+    model.update(FaderMoveEvent(index=0, position=100).encode())
+
+    assert snapshot.leds[0x18] == 0
+    assert model.diff(snapshot) == {"leds": [0x18], "faders": [0]}
+    assert snapshot.diff(snapshot.copy()) == {}
+    assert model != snapshot
+
+
+def test_truncated_inbound_message_does_not_stop_the_receive_loop(run_device):
+    async def scenario(surface, device):
+        presses = []
+        device.on_button_event = lambda event: presses.append(event.index)
+
+        await asyncio.sleep(0.01)
+        surface.send([0x90, 0x10])
+        surface.press(0x18)
+        await asyncio.sleep(0.02)
+        return device, presses
+
+    device, presses = run_device(scenario, require_connection=False)
+    assert presses == [0x18]
+    assert device.rx_decode_errors == 1
@@ -0,0 +1,55 @@
+import pytest
+
+from pymcu.helpers.surface_model import MCUSurfaceModel
+from pymcu.helpers.timecode import (
+    TimecodeDisplay, TimecodeDriver, TimecodeClock, SMPTEClock, WallClock, segment_codes, N_TIMECODE_CELLS, N_TIMECODE_DIGITS
+)
+
+
+def test_only_changed_cells_are_sent():
+    display = TimecodeDisplay()
+    assert len(display.write_text(0, "12")) == 2
+
+    messages = display.write_text(0, "13")
+
+    assert [(m.display_offset, m.raw_char) for m in messages] == [(N_TIMECODE_CELLS - 2, segment_codes("3")[0])]
+    assert display.messages_saved == 1
+
+
+def test_shares_the_surface_model_shadow():
+    surface = MCUSurfaceModel()
+    display = TimecodeDisplay(surface.timecode)
+
+    for message in display.write_text(0, "AB"):
+        surface.update(message.encode())
+
+    assert display.cells is surface.timecode
+    assert display.text().startswith("ab")
+    assert display.write_text(0, "AB") == []
+
+
+def test_driver_sends_only_the_frames_digits():
+    display = TimecodeDisplay()
+    driver = TimecodeDriver(display, SMPTEClock(fps=30))
+    driver.clock.start(now=0.0)
+
+    first = driver.frame(now=0.0)
+    second = driver.frame(now=1 / 30)
+
+    assert len(first) > len(second) >= 1
+    assert all(message.display_offset < 3 for message in second)
+
+
+def test_clock_without_digits_fails_on_creation():
+    class Incomplete(TimecodeClock):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_wall_clock_fills_the_digits():
+    digits = WallClock().digits()
+
+    assert len(digits) == N_TIMECODE_DIGITS
+    assert digits.startswith("  ") and digits[2:].isdigit()
@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from pymcu.helpers import tx_scheduler
+from pymcu.helpers.tx_scheduler import (
+    TxScheduler, TokenBucket, LANE_CONNECTION, LANE_FADER, LANE_LED, LANE_METER, LANE_DISPLAY,
+    SCHEDULE_WEIGHTED,
+)
+from pymcu.messages.sysex import DeviceQuery, UpdateLCD
+from pymcu.messages.fader import FaderMoveEvent
+from pymcu.messages.button import SetLED
+from pymcu.messages.meter import UpdateMeter
+
+
+def drain(scheduler: TxScheduler) -> list:
+    items = []
+    while not scheduler.empty():
+        items.append(scheduler.get_nowait())
+        scheduler.task_done()
+    return items
+
+
+def test_lane_chosen_by_message_type():
+    scheduler = TxScheduler()
+    scheduler.put_nowait(UpdateLCD(display_offset=0, text="hi"))
+    scheduler.put_nowait(UpdateMeter(index=0, value=-10))
+    scheduler.put_nowait(SetLED(index=0x10, state=1))
+    scheduler.put_nowait(FaderMoveEvent(index=0, position=100))
+    scheduler.put_nowait(DeviceQuery())
+
+    assert [lane.qsize() for lane in scheduler.lanes] == [1, 1, 1, 1, 1]
+
+
+def test_strict_priority_order():
+    scheduler = TxScheduler()
+    for lane in (LANE_DISPLAY, LANE_METER, LANE_LED, LANE_FADER, LANE_CONNECTION):
+        scheduler.put_nowait(f"{lane}a", lane=lane)
+        scheduler.put_nowait(f"{lane}b", lane=lane)
+
+    assert drain(scheduler) == [f"{lane}{n}" for lane in range(5) for n in "ab"]
+
+
+def test_late_high_priority_jumps_the_queue():
+    scheduler = TxScheduler()
+    for n in range(3):
+        scheduler.put_nowait(n, lane=LANE_DISPLAY)
+    assert scheduler.get_nowait() == 0
+    scheduler.put_nowait("reply", lane=LANE_CONNECTION)
+
+    assert drain(scheduler) == ["reply", 1, 2]
+
+
+def test_weighted_round_robin_shares_by_weight():
+    scheduler = TxScheduler(policy=SCHEDULE_WEIGHTED, weights=(1, 1, 1, 2, 1))
+    for n in range(6):
+        scheduler.put_nowait(("meter", n), lane=LANE_METER)
+        scheduler.put_nowait(("display", n), lane=LANE_DISPLAY)
+
+    order = [kind for kind, _ in drain(scheduler)[:6]]
+    # 2:1 in favour of meters while both lanes are backlogged, without starving the display
+    assert order == ["meter", "display", "meter", "meter", "display", "meter"]
+
+
+def test_keyed_updates_coalesce_per_lane():
+    scheduler = TxScheduler()
+    scheduler.put_nowait(FaderMoveEvent(index=0, position=1), key=("fader", 0))
+    scheduler.put_nowait(FaderMoveEvent(index=0, position=2), key=("fader", 0))
+
+    assert [msg.position for msg in drain(scheduler)] == [2]
+    assert scheduler.stats()["lanes"]["fader"]["collapsed"] == 1
+    assert scheduler.stats()["lanes"]["fader"]["sent"] == 1
+
+
+def test_replacement_keeps_the_original_wait(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(tx_scheduler, "time", SimpleNamespace(perf_counter=lambda: now[0]))
+    scheduler = TxScheduler()
+
+    scheduler.put_nowait(FaderMoveEvent(index=0, position=1), key=("fader", 0))
+    now[0] = 0.03
+    scheduler.put_nowait(FaderMoveEvent(index=0, position=2), key=("fader", 0))
+    now[0] = 0.05
+    drain(scheduler)
+
+    # Waiting since the first value was queued, not since it was replaced
+    assert scheduler.stats()["lanes"]["fader"]["max_wait"] == pytest.approx(0.05)
+
+
+def test_bad_configuration():
+    with pytest.raises(ValueError):
+        TxScheduler(policy="random")
+    with pytest.raises(ValueError):
+        TxScheduler(weights=(1, 1))
+
+
+def test_token_bucket_waits_for_budget():
+    async def scenario():
+        bucket = TokenBucket(bytes_per_second=1000, burst=10)
+        await bucket.acquire(10)
+        await bucket.acquire(10)
+        return bucket.throttled_time
+
+    # The second 10 bytes had to wait for ~10 ms of refill
+    assert asyncio.run(scenario()) == pytest.approx(0.01, abs=0.005)
+
+
+def test_sent_through_mark_ignores_later_traffic():
+    scheduler = TxScheduler()
+    scheduler.put_nowait(SetLED(index=0x10, state=1), key=("led", 0x10))
+    scheduler.put_nowait(SetLED(index=0x11, state=1), key=("led", 0x11))
+    mark = scheduler.mark()
+
+    # Replaces a pending slot, then queues behind the mark
+    scheduler.put_nowait(SetLED(index=0x10, state=2), key=("led", 0x10))
+    scheduler.put_nowait(SetLED(index=0x12, state=1), key=("led", 0x12))
+
+    scheduler.get_nowait()
+    assert not scheduler.sent_through(mark)
+    scheduler.get_nowait()
+    assert scheduler.sent_through(mark)
+    assert scheduler.qsize() == 1
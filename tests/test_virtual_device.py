@@ -0,0 +1,17 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymcu.helpers import virtual_device
+from pymcu.helpers.virtual_device import VirtualMCU
+
+
+def test_generate_catch_up_stops_at_the_duration(monkeypatch):
+    surface = VirtualMCU(seed=1)
+    # The first reading starts the run, every later one is long past its end, like after a stall
+    readings = iter([0.0])
+    monkeypatch.setattr(virtual_device, "time", SimpleNamespace(perf_counter=lambda: next(readings, 10.0)))
+
+    generated = asyncio.run(surface.generate(rate=100, duration=1.0))
+
+    assert generated == 100
+    assert surface.messages_sent >= 100